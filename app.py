@@ -14,6 +14,8 @@ from streamlit_option_menu import option_menu
 import base64
 from core.utils import load_svg_logo
 from core.utils import chf_format
+from logic.aggregation import get_cube
+from logic.ledger import get_ledger, forecast_balance
 from views import datenimport, planung, editor, analyse, simulation, fixkosten, mitarbeiter, reset, login, admin
 from datetime import date, timedelta
 from core.auth import initialisiere_auth_state, prüfe_session_gültigkeit, log_user_activity
@@ -318,7 +320,43 @@ elif selected == "Start":
             today = date.today()
             default_end = today + timedelta(days=270)  # 9 Monate
             st.info(f"**Standardplanungszeitraum:** {today.strftime('%d.%m.%Y')} bis {default_end.strftime('%d.%m.%Y')}")
-            
+
+            # Prognose aus dem gemeinsamen Aggregationswürfel (wie in der Analyse)
+            try:
+                base_df = st.session_state.edited_df if "edited_df" in st.session_state else None
+                ledger_df, _, version = get_ledger(
+                    today, default_end, cache=st.session_state.setdefault("ledger_cache", {}),
+                    user_id=st.session_state.user.id, base_df=base_df
+                )
+                cube = get_cube(
+                    ledger_df, version, today, default_end, st.session_state.start_balance,
+                    cache=st.session_state.setdefault("cube_cache", {})
+                )
+                monthly = cube["M"]
+                
+                # Kontostände als Präfixsummen über den Fenwick-Baum des Ledgers (bleibt nach
+                # Änderungen im Editor oder in der Simulation ohne Neuaufbau aktuell)
+                ledger_cache = st.session_state.ledger_cache
+                monatsende = date(today.year + today.month // 12, today.month % 12 + 1, 1) - timedelta(days=1)
+                kontostand_monatsende = forecast_balance(
+                    ledger_cache, version, today, st.session_state.start_balance, monatsende
+                )
+                kontostand_ende = forecast_balance(
+                    ledger_cache, version, today, st.session_state.start_balance, default_end
+                )
+                if kontostand_monatsende is None:
+                    kontostand_monatsende = monthly["end_balance"][0]
+                    kontostand_ende = monthly["end_balance"][-1]
+                saldo_monat = kontostand_monatsende - st.session_state.start_balance
+                
+                st.info(f"**Saldo {monthly['labels'][0]} (ab heute):** {chf_format(saldo_monat)} · "
+                        f"**Kontostand Monatsende:** {chf_format(kontostand_monatsende)}")
+                st.info(f"**Prognose Kontostand per {default_end.strftime('%d.%m.%Y')}:** {chf_format(kontostand_ende)}")
+                analyse.show_kpi_strip(cube)
+            except Exception as e:
+                st.error(f"Fehler bei der Prognose für die Startseite: {e}")
+                st.info("Überspringe die Kennzahlen der Startseite.")
+
             # Weitere hilfreiche Informationen
             st.subheader("Tipps")
             st.markdown("""
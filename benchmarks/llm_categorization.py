@@ -0,0 +1,60 @@
+"""
+Benchmark: Klassifikation eines grossen Imports über den lokalen Stub-Server.
+
+Zeigt, wie viele Anfragen nach Deduplizierung und Stapelung nötig sind und dass ein zweiter Import
+mit gefülltem Cache keine Anfragen mehr auslöst.
+
+Aufruf aus dem Projektverzeichnis (benötigt das Paket openai):
+    python -m benchmarks.llm_categorization --rows 10000
+"""
+import argparse
+import time
+import numpy as np
+import pandas as pd
+from benchmarks.llm_stub import start_stub_server
+from logic.llm_kategorien import LLM_DEFAULTS, OpenAI, normalize_for_classification, classify_texts
+
+EMPFAENGER = ["Swisscom AG", "Migros Genossenschaft", "Die Post", "SBB CFF FFS", "Helsana Versicherungen",
+              "Axa Winterthur", "Sunrise UPC", "Coop Genossenschaft", "Elektrizitätswerk Zürich", "Galaxus AG",
+              "Bürobedarf Müller", "Treuhand Meier", "Reinigung Blitzblank", "Werbeagentur Kreativ"]
+KATEGORIEN = ["Telekommunikation", "Versicherungen", "Verpflegung", "Energie", "Büromaterial", "Werbung"]
+
+def synthetic_details(n, seed=0):
+    """Erzeugt n Buchungstexte mit Empfänger, Filiale und Referenznummer."""
+    rng = np.random.default_rng(seed)
+    empfaenger = rng.choice(EMPFAENGER, n)
+    filialen = rng.choice(["Zürich", "Bern", "Basel", "Luzern", "St. Gallen", "Winterthur"], n)
+    referenzen = rng.integers(10 ** 9, 10 ** 10, n)
+    return pd.Series([f"{e} {f} Rechnung {r}" for e, f, r in zip(empfaenger, filialen, referenzen)])
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=10_000, help="Zeilen des Imports")
+    parser.add_argument("--batch-size", type=int, default=LLM_DEFAULTS["batch_size"])
+    parser.add_argument("--concurrency", type=int, default=LLM_DEFAULTS["max_concurrency"])
+    args = parser.parse_args()
+    if OpenAI is None:
+        parser.error("Das Paket openai ist nicht installiert")
+
+    server = start_stub_server()
+    config = {**LLM_DEFAULTS, "enabled": True, "base_url": server.base_url, "api_key": "stub",
+              "batch_size": args.batch_size, "max_concurrency": args.concurrency, "requests_per_minute": 0}
+    cache = {}
+
+    for lauf in [1, 2]:
+        details = synthetic_details(args.rows, seed=lauf)
+        start = time.perf_counter()
+        keys = normalize_for_classification(details)
+        fehlend = [k for k in keys.unique() if k and k not in cache]
+        neu, anfragen = classify_texts(fehlend, KATEGORIEN, config=config)
+        cache.update(neu)
+        kategorien = keys.map(cache).fillna("Standard")
+        dauer = time.perf_counter() - start
+        print(f"Import {lauf}: {len(details)} Zeilen, {keys.nunique()} eindeutige Texte, "
+              f"{anfragen} Anfragen ({server.anfragen} insgesamt), {dauer:.2f} s, "
+              f"{(kategorien != 'Standard').mean():.0%} kategorisiert")
+
+    server.shutdown()
+
+if __name__ == "__main__":
+    main()
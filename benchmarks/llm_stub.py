@@ -0,0 +1,93 @@
+"""
+Lokaler Stub-Server mit OpenAI-kompatiblem Endpunkt /v1/chat/completions für Tests der Klassifikation.
+
+Ordnet jeden Text der ersten Kategorie zu, deren Name (ersten vier Buchstaben) im Text vorkommt,
+sonst "Standard", und zählt die eingegangenen Anfragen.
+
+Aufruf aus dem Projektverzeichnis:
+    python -m benchmarks.llm_stub --port 8765
+    LLM_BASE_URL=http://127.0.0.1:8765/v1 streamlit run app.py
+"""
+import argparse
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from logic.kategorien import STANDARD_KATEGORIE
+
+def stub_kategorie(text, kategorien):
+    """Deterministische Zuordnung anhand des Kategorienamens."""
+    for kategorie in kategorien:
+        if kategorie.lower()[:4] in text.lower():
+            return kategorie
+    return STANDARD_KATEGORIE
+
+class StubHandler(BaseHTTPRequestHandler):
+    def do_POST(self):
+        if not self.path.rstrip("/").endswith("/chat/completions"):
+            self.send_error(404)
+            return
+        body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+        anfrage = json.loads(body["messages"][-1]["content"])
+        antwort = {
+            str(t["nr"]): stub_kategorie(t["text"], anfrage.get("kategorien", []))
+            for t in anfrage.get("texte", [])
+        }
+        with self.server.lock:
+            self.server.anfragen += 1
+
+        daten = json.dumps({
+            "id": f"stub-{self.server.anfragen}",
+            "object": "chat.completion",
+            "created": 0,
+            "model": body.get("model", "stub"),
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": json.dumps(antwort, ensure_ascii=False)},
+                "finish_reason": "stop"
+            }],
+            "usage": {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0}
+        }).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(daten)))
+        self.end_headers()
+        self.wfile.write(daten)
+
+    def log_message(self, format, *args):
+        pass
+
+def start_stub_server(host="127.0.0.1", port=0):
+    """
+    Startet den Stub-Server in einem Hintergrund-Thread.
+
+    Args:
+        host (str): Adresse
+        port (int): Port (0 = freier Port)
+
+    Returns:
+        ThreadingHTTPServer: Server mit Attribut anfragen (Anzahl Anfragen) und base_url
+    """
+    server = ThreadingHTTPServer((host, port), StubHandler)
+    server.anfragen = 0
+    server.lock = threading.Lock()
+    server.base_url = f"http://{host}:{server.server_address[1]}/v1"
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+
+    server = ThreadingHTTPServer((args.host, args.port), StubHandler)
+    server.anfragen = 0
+    server.lock = threading.Lock()
+    print(f"Stub-Server läuft auf http://{args.host}:{args.port}/v1")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print(f"{server.anfragen} Anfragen beantwortet")
+
+if __name__ == "__main__":
+    main()
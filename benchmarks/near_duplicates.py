@@ -0,0 +1,73 @@
+"""
+Benchmark: unscharfe Duplikatsuche mit Blocking gegenüber dem naiven Vergleich aller Paare.
+
+Aufruf aus dem Projektverzeichnis:
+    python -m benchmarks.near_duplicates --rows 100000 --naive-rows 2000
+"""
+import argparse
+import time
+import numpy as np
+import pandas as pd
+from logic.matching import find_near_duplicates, normalize_details, _token_set_similarity
+
+FIRMEN = ["Swisscom AG", "Migros Genossenschaft", "Die Post", "SBB CFF FFS", "Helsana Versicherungen",
+          "Axa Winterthur", "Sunrise UPC", "Coop Genossenschaft", "Elektrizitätswerk Zürich", "Galaxus AG"]
+
+def synthetic_ledger(n, duplicate_share=0.02, seed=0):
+    """Erzeugt n Buchungen, davon ein Anteil leicht abgewandelter Duplikate (Leerzeichen, gekürzte Referenz)."""
+    rng = np.random.default_rng(seed)
+    firmen = rng.choice(FIRMEN, n)
+    referenzen = rng.integers(10 ** 9, 10 ** 10, n).astype(str)
+    df = pd.DataFrame({
+        "Date": pd.Timestamp("2025-01-01") + pd.to_timedelta(rng.integers(0, 730, n), unit="D"),
+        "Details": [f"{f} Rechnung {r}" for f, r in zip(firmen, referenzen)],
+        "Amount": np.round(rng.uniform(20, 20000, n), 2),
+        "Direction": rng.choice(["Incoming", "Outgoing"], n)
+    })
+    dup = rng.choice(n, int(n * duplicate_share), replace=False)
+    kopien = df.loc[dup].copy()
+    kopien["Details"] = kopien["Details"].str.replace(" ", "  ", n=1).str[:-3]
+    kopien["Date"] = kopien["Date"] + pd.to_timedelta(rng.integers(0, 3, len(kopien)), unit="D")
+    return pd.concat([df, kopien], ignore_index=True)
+
+def naive_near_duplicates(df, threshold=0.8, amount_bucket=1.0):
+    """Referenz: vergleicht alle Paare mit gleicher Richtung und Betragsklasse."""
+    tokens = [frozenset(t.split()) for t in normalize_details(df["Details"])]
+    betrag = (df["Amount"].abs() / amount_bucket).round().to_numpy()
+    richtung = df["Direction"].to_numpy()
+    paare = []
+    for i in range(len(df)):
+        for j in range(i + 1, len(df)):
+            if richtung[i] == richtung[j] and betrag[i] == betrag[j] \
+                    and _token_set_similarity(tokens[i], tokens[j]) >= threshold:
+                paare.append((i, j))
+    return paare
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=100_000, help="Zeilen für die Suche mit Blocking")
+    parser.add_argument("--naive-rows", type=int, default=2000, help="Zeilen für den naiven Vergleich")
+    args = parser.parse_args()
+
+    klein = synthetic_ledger(args.naive_rows)
+    start = time.perf_counter()
+    naive = naive_near_duplicates(klein)
+    t_naive = time.perf_counter() - start
+    start = time.perf_counter()
+    blocked = find_near_duplicates(klein)
+    t_blocked_klein = time.perf_counter() - start
+    gefunden = set(zip(blocked["index"], blocked["other_index"]))
+    recall = len(gefunden & set(naive)) / max(len(naive), 1)
+    print(f"{len(klein)} Zeilen: naiv {t_naive:.2f} s ({len(naive)} Paare), "
+          f"Blocking {t_blocked_klein:.3f} s ({len(blocked)} Paare, Recall {recall:.0%})")
+
+    gross = synthetic_ledger(args.rows)
+    start = time.perf_counter()
+    blocked = find_near_duplicates(gross)
+    t_blocked = time.perf_counter() - start
+    hochrechnung = t_naive * (len(gross) / len(klein)) ** 2
+    print(f"{len(gross)} Zeilen: Blocking {t_blocked:.2f} s ({len(blocked)} Paare), "
+          f"naiv hochgerechnet {hochrechnung / 3600:.1f} h")
+
+if __name__ == "__main__":
+    main()
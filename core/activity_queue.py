@@ -0,0 +1,193 @@
+import atexit
+import hashlib
+import os
+import queue
+import random
+import re
+import threading
+import time
+from core.storage import service_client
+
+# Maximale Anzahl Aktivitäten je Sammel-Insert
+ACTIVITY_BATCH_SIZE = int(os.getenv("ACTIVITY_BATCH_SIZE", 100))
+
+# Spätestens nach so vielen Sekunden werden gepufferte Aktivitäten geschrieben
+ACTIVITY_FLUSH_INTERVAL = float(os.getenv("ACTIVITY_FLUSH_INTERVAL", 5))
+
+# Obergrenze des Puffers; weitere Aktivitäten werden verworfen, statt die App zu blockieren
+ACTIVITY_MAX_QUEUE = int(os.getenv("ACTIVITY_MAX_QUEUE", 10000))
+
+# Wiederholungen eines fehlgeschlagenen Sammel-Inserts (mit wachsender Wartezeit)
+ACTIVITY_MAX_RETRIES = 3
+
+# Gleiche Aktivitäten (Benutzer, Aktion, Details) innerhalb dieses Zeitfensters (Sekunden)
+# werden zu einer Zeile mit event_count zusammengefasst
+ACTIVITY_COALESCE_WINDOW = float(os.getenv("ACTIVITY_COALESCE_WINDOW", 60))
+
+# Stichprobenraten je Aktion (regulärer Ausdruck -> Anteil, erste passende Regel gilt).
+# Ansichts-Ereignisse entstehen bei jedem Rerun und werden nur anteilig erfasst;
+# event_count wird mit dem Kehrwert der Rate gewichtet, damit die Summen erwartungstreu bleiben.
+ACTIVITY_SAMPLING_RULES = [
+    (re.compile(r"angesehen$"), 0.2),
+    (re.compile(r"(aufgerufen|geöffnet)$"), 0.5)
+]
+
+_queue = queue.Queue(maxsize=ACTIVITY_MAX_QUEUE)
+_flush_requested = threading.Event()
+_stopped = threading.Event()
+_writer = None
+_writer_lock = threading.Lock()
+
+# Offene Zusammenfassungen: (user_id, action, Details-Hash) -> (Beginn des Fensters, Aktivität)
+_pending = {}
+_pending_lock = threading.Lock()
+
+def _sampling_rate(action):
+    """Stichprobenrate der ersten passenden Regel (1.0 = jede Aktivität erfassen)."""
+    for muster, rate in ACTIVITY_SAMPLING_RULES:
+        if muster.search(action or ""):
+            return rate
+    return 1.0
+
+def _release_pending(alle=False):
+    """Übergibt abgelaufene (oder alle) Zusammenfassungen an den Schreibpuffer."""
+    jetzt = time.monotonic()
+    with _pending_lock:
+        fertig = [key for key, (beginn, _) in _pending.items() if alle or jetzt - beginn >= ACTIVITY_COALESCE_WINDOW]
+        aktivitaeten = [_pending.pop(key)[1] for key in fertig]
+    for activity in aktivitaeten:
+        try:
+            _queue.put_nowait(activity)
+        except queue.Full:
+            print("Aktivitätspuffer voll, Aktivität wird verworfen")
+
+def _insert(client, activities):
+    """Schreibt Aktivitäten mit einer Anfrage; wiederholt bei vorübergehenden Fehlern."""
+    for versuch in range(ACTIVITY_MAX_RETRIES + 1):
+        try:
+            client.rpc('insert_user_activities', {'activities': activities}).execute()
+            return True
+        except Exception as e:
+            if versuch == ACTIVITY_MAX_RETRIES:
+                print(f"{len(activities)} Benutzeraktivitäten konnten nicht gespeichert werden: {e}")
+                return False
+            time.sleep(0.5 * 2 ** versuch)
+
+def _write_batch(batch):
+    """
+    Schreibt einen Stapel Aktivitäten.
+
+    Mit Service-Role (SUPABASE_SERVICE_KEY) in einer Anfrage für alle Benutzer; sonst je Session
+    mit deren Client, sodass die Datenbank den Benutzer aus dem Token (auth.uid()) übernimmt.
+
+    Returns:
+        int: Anzahl geschriebener Aktivitäten
+    """
+    gruppen = {}
+    for activity in batch:
+        client = service_client if service_client is not None else activity.get("_client")
+        if client is None:
+            print("Benutzeraktivität ohne Session-Client wird verworfen")
+            continue
+        record = {k: v for k, v in activity.items() if k != "_client"}
+        gruppen.setdefault(id(client), (client, []))[1].append(record)
+    return sum(len(records) for client, records in gruppen.values() if _insert(client, records))
+
+def _drain(max_items):
+    """Entnimmt bis zu max_items Aktivitäten, ohne zu warten."""
+    batch = []
+    while len(batch) < max_items:
+        try:
+            batch.append(_queue.get_nowait())
+        except queue.Empty:
+            break
+    return batch
+
+def _run():
+    """Hintergrund-Thread: schreibt nach Grösse oder Zeit, bis der Prozess endet."""
+    while not _stopped.is_set():
+        _flush_requested.wait(ACTIVITY_FLUSH_INTERVAL)
+        _flush_requested.clear()
+        # Volle Zusammenfassung (Grössen-Trigger): alle offenen Aktivitäten mitschreiben
+        _release_pending(alle=len(_pending) >= ACTIVITY_BATCH_SIZE)
+        while True:
+            batch = _drain(ACTIVITY_BATCH_SIZE)
+            if not batch:
+                break
+            _write_batch(batch)
+
+def _ensure_writer():
+    global _writer
+    with _writer_lock:
+        if _writer is None or not _writer.is_alive():
+            _writer = threading.Thread(target=_run, name="activity-writer", daemon=True)
+            _writer.start()
+
+def enqueue_activity(activity, client=None):
+    """
+    Erfasst eine Aktivität; der Aufruf blockiert nicht.
+
+    Jede Aktivität wird mit gleichen Aktivitäten (Benutzer, Aktion, Details) im Zeitfenster
+    ACTIVITY_COALESCE_WINDOW zu einer Zeile mit event_count zusammengefasst. Aktionen mit
+    Stichprobenregel werden vorher zusätzlich nur anteilig erfasst. Sobald ACTIVITY_BATCH_SIZE
+    Zusammenfassungen offen sind, wird sofort geschrieben.
+
+    Args:
+        activity (dict): user_id, action, details (JSON-String oder None) und created_at
+        client (Client, optional): Supabase-Client der Session des Benutzers (für das Schreiben
+                                   ohne Service-Role)
+
+    Returns:
+        bool: True, wenn die Aktivität erfasst (oder durch die Stichprobe bewusst ausgelassen) wurde,
+              False bei vollem Puffer
+    """
+    _ensure_writer()
+    # Optionale Stichprobe (Rate 1.0 ohne passende Regel: jede Aktivität zählt einfach)
+    rate = _sampling_rate(activity.get("action"))
+    if rate < 1.0 and random.random() >= rate:
+        return True
+    gewicht = max(1, round(1 / rate))
+
+    details_hash = hashlib.sha1(str(activity.get("details")).encode("utf-8")).hexdigest()
+    key = (activity.get("user_id"), activity.get("action"), details_hash)
+    with _pending_lock:
+        if key in _pending:
+            _, offen = _pending[key]
+            offen["event_count"] += gewicht
+            offen["last_seen_at"] = activity.get("created_at")
+            return True
+        if len(_pending) >= ACTIVITY_MAX_QUEUE:
+            print("Aktivitätspuffer voll, Aktivität wird verworfen")
+            return False
+        _pending[key] = (time.monotonic(), {
+            **activity,
+            "_client": client,
+            "event_count": gewicht,
+            "last_seen_at": activity.get("created_at")
+        })
+        voll = len(_pending) >= ACTIVITY_BATCH_SIZE
+    if voll:
+        _flush_requested.set()
+    return True
+
+def flush_activities():
+    """
+    Schreibt alle gepufferten und offenen zusammengefassten Aktivitäten sofort im aufrufenden Thread.
+
+    Returns:
+        int: Anzahl geschriebener Zeilen
+    """
+    _release_pending(alle=True)
+    geschrieben = 0
+    while True:
+        batch = _drain(ACTIVITY_BATCH_SIZE)
+        if not batch:
+            return geschrieben
+        geschrieben += _write_batch(batch)
+
+def _shutdown():
+    _stopped.set()
+    _flush_requested.set()
+    flush_activities()
+
+atexit.register(_shutdown)
@@ -1,6 +1,7 @@
 import streamlit as st
 import json
 import time
+import threading
 from core.storage import supabase
 from datetime import datetime, timedelta
 
@@ -19,6 +20,16 @@ except ImportError:
     def clear_auth_cookie():
         pass
 
+# Gültigkeitsdauer der zwischengespeicherten Identität (Rolle, Profil, Einstellungen) in Sekunden
+IDENTITY_TTL = 300
+
+# Session-State-Schlüssel für lokal wiederhergestellte Sessions: Refresh-Token und Ablauf des Zugriffstokens
+TOKEN_REFRESH_KEY = "token_refresh"
+
+# Prozessweiter Cache: Benutzer-ID -> Identität (neue Browser-Sessions ohne Datenbankabfrage)
+_identitaeten = {}
+_identitaeten_lock = threading.Lock()
+
 # ----------------------------------
 # 🔐 Authentifizierungsfunktionen
 # ----------------------------------
@@ -52,6 +63,49 @@ def initialisiere_auth_state():
             "secondary_color": "#111",
             "background_color": "#FFFFFF"
         }
+    erneuere_token_bei_bedarf()
+
+def erneuere_token_bei_bedarf():
+    """
+    Erneuert das Zugriffstoken einer lokal wiederhergestellten Session kurz vor dessen Ablauf.
+    
+    Bei der Wiederherstellung aus dem Cookie ohne Anfrage an den Auth-Server erhält GoTrue kein
+    Refresh-Token und erneuert das Token nicht selbst. Deshalb wird bei jedem Rerun geprüft, ob die
+    Restlaufzeit unter JWT_REFRESH_MARGIN liegt; dann wird die Session über das Refresh-Token erneuert,
+    GoTrue übernimmt sie (inklusive automatischer Erneuerung) und das Cookie wird aktualisiert.
+    
+    Returns:
+        bool: False, wenn das Token abgelaufen ist und nicht erneuert werden konnte, sonst True
+    """
+    tokens = st.session_state.get(TOKEN_REFRESH_KEY)
+    if not tokens or not st.session_state.get("is_authenticated"):
+        return True
+    from core.jwt_validation import JWT_REFRESH_MARGIN
+    if time.time() < tokens["exp"] - JWT_REFRESH_MARGIN:
+        return True
+    
+    try:
+        response = supabase.auth.refresh_session(tokens["refresh_token"])
+        if response and response.session:
+            st.session_state.pop(TOKEN_REFRESH_KEY, None)
+            st.session_state.user = response.user or st.session_state.user
+            try:
+                from core.auth_cookie import save_auth_to_cookie
+                save_auth_to_cookie(st.session_state.user, response.session, st.session_state.get("stay_logged_in", False))
+            except Exception as e:
+                print(f"Fehler beim Speichern des Cookies: {e}")
+            return True
+    except Exception as e:
+        print(f"Fehler beim Erneuern des Zugriffstokens: {e}")
+    
+    # Noch gültiges Token: beim nächsten Rerun erneut versuchen; abgelaufenes Token: abmelden
+    if time.time() >= tokens["exp"]:
+        abmelden()
+        st.session_state.auth_message = "Sitzung abgelaufen, bitte erneut anmelden."
+        st.session_state.auth_message_type = "info"
+        return False
+    return True
+
 def anmelden(email, password, stay_logged_in=False):
     """
     Benutzeranmeldung über Supabase
@@ -62,52 +116,10 @@ def anmelden(email, password, stay_logged_in=False):
         
         # Wenn erfolgreich, Benutzerinformationen speichern
         if response.user:
-            st.session_state.user = response.user
-            st.session_state.is_authenticated = True
-            st.session_state.stay_logged_in = stay_logged_in
-            st.session_state.last_activity = datetime.now()
-            
-            # Benutzerrolle überprüfen
-            user_id = str(response.user.id)
-            
-            # Direktes SQL-Statement verwenden, um Caching-Probleme zu vermeiden
-            admin_check = supabase.rpc(
-                'check_user_is_admin',
-                { 'user_id_param': user_id }
-            ).execute()
-            
-            st.write("Admin-Check Ergebnis:", admin_check.data)  # Debug
-            
-            if admin_check.data and admin_check.data == True:
-                st.session_state.is_admin = True
-                print(f"Admin-Status gesetzt für Benutzer {user_id}")
-            else:
-                # Fallback zur alten Methode
-                user_data = supabase.table('profiles').select('*').eq('id', user_id).execute()
-                
-                print(f"Profildaten für {user_id}:", user_data.data)  # Debug
-                
-                if user_data.data and user_data.data[0].get('role', '').lower() == 'admin':
-                    st.session_state.is_admin = True
-                    print(f"Admin-Status gesetzt für Benutzer {user_id} (Fallback-Methode)")
-                else:
-                    st.session_state.is_admin = False
-                    print(f"Kein Admin-Status für Benutzer {user_id}")
+            uebernehme_anmeldung(response.user, response.session, stay_logged_in)
             
             st.session_state.auth_message = "Erfolgreich angemeldet!"
             st.session_state.auth_message_type = "success"
-            
-            # Benutzereinstellungen laden
-            lade_benutzereinstellungen(response.user.id)
-            
-            # Cookie speichern, falls aktiviert
-            if st.session_state.stay_logged_in:
-                try:
-                    from core.auth_cookie import save_auth_to_cookie
-                    save_auth_to_cookie(response.user, response.session, stay_logged_in)
-                except Exception as e:
-                    print(f"Fehler beim Speichern des Cookies: {e}")
-            
             return True
             
     except Exception as e:
@@ -117,6 +129,47 @@ def anmelden(email, password, stay_logged_in=False):
     return False
     return False
 
+def uebernehme_anmeldung(user, session, stay_logged_in=False, cookie_token=None):
+    """
+    Gemeinsamer Anmeldepfad für Passwort-Login und Cookie-Wiederherstellung.
+    
+    Setzt den Session-State, lädt die Identität in einer Abfrage (session_bootstrap) und
+    schreibt das Cookie nur, wenn sich das Zugriffstoken geändert hat.
+    
+    Args:
+        user: Der Benutzer aus Supabase
+        session: Die Session aus Supabase
+        stay_logged_in (bool): Ob der Benutzer eingeloggt bleiben möchte
+        cookie_token (str, optional): Zugriffstoken aus dem Cookie (bei Wiederherstellung)
+        
+    Returns:
+        dict: Identität des Benutzers
+    """
+    st.session_state.user = user
+    st.session_state.is_authenticated = True
+    st.session_state.stay_logged_in = stay_logged_in
+    st.session_state.last_activity = datetime.now()
+    if session is not None:
+        # GoTrue verwaltet die Session und erneuert das Token selbst
+        st.session_state.pop(TOKEN_REFRESH_KEY, None)
+    
+    identity = lade_identitaet(str(user.id))
+    
+    # Cookie bei Anmeldung mit "Eingeloggt bleiben" bzw. nach einer Token-Erneuerung speichern
+    neues_token = getattr(session, "access_token", None)
+    if cookie_token is None:
+        speichern = stay_logged_in
+    else:
+        speichern = neues_token is not None and neues_token != cookie_token
+    if speichern and session is not None:
+        try:
+            from core.auth_cookie import save_auth_to_cookie
+            save_auth_to_cookie(user, session, stay_logged_in)
+        except Exception as e:
+            print(f"Fehler beim Speichern des Cookies: {e}")
+    
+    return identity
+
 def debug_user_roles():
     """
     Debug-Funktion zur Anzeige aller Benutzerrollen
@@ -210,6 +263,143 @@ def magic_link_anmelden(email):
     
     return False
 
+def _bootstrap_identitaet(user_id):
+    """Lädt Rolle, Profil und Einstellungen über die Datenbankfunktion session_bootstrap (eine Anfrage)."""
+    try:
+        response = supabase.rpc('session_bootstrap', {'user_id_param': user_id}).execute()
+    except Exception as e:
+        print(f"session_bootstrap nicht verfügbar: {e}")
+        return None
+    
+    data = response.data[0] if isinstance(response.data, list) and response.data else response.data
+    if not isinstance(data, dict) or not data:
+        return None
+    
+    design_settings = st.session_state.design_settings
+    if data.get('settings'):
+        try:
+            settings = data['settings']
+            design_settings = json.loads(settings) if isinstance(settings, str) else settings
+        except Exception as e:
+            print(f"Fehler beim Lesen der Benutzereinstellungen: {e}")
+    return {
+        "role": data.get('role'),
+        "is_admin": bool(data.get('is_admin')),
+        "profile": data.get('profile') or {},
+        "design_settings": design_settings
+    }
+
+def _lade_identitaet_einzeln(user_id):
+    """Lädt Profil, Rolle, Admin-Status und Einstellungen mit einzelnen Abfragen (ohne session_bootstrap)."""
+    profile = {}
+    role = None
+    try:
+        user_data = supabase.table('profiles').select('*').eq('id', user_id).execute()
+        if user_data.data:
+            profile = user_data.data[0]
+            role = profile.get('role')
+    except Exception as e:
+        print(f"Fehler beim Laden des Profils: {e}")
+    
+    if role is None:
+        # Direkter SQL-Zugriff, falls das Profil nicht gelesen werden kann
+        try:
+            role_data = supabase.rpc('get_user_role', {'user_id_param': user_id}).execute()
+            if role_data.data:
+                role = role_data.data[0] if isinstance(role_data.data, list) else role_data.data
+        except Exception as e:
+            print(f"Fehler beim Laden der Benutzerrolle: {e}")
+    
+    is_admin = str(role or '').lower() == 'admin'
+    if not is_admin:
+        try:
+            admin_check = supabase.rpc('check_user_is_admin', {'user_id_param': user_id}).execute()
+            is_admin = admin_check.data == True
+        except Exception as e:
+            print(f"Fehler bei der Admin-Prüfung: {e}")
+    
+    return {
+        "role": role,
+        "is_admin": is_admin,
+        "profile": profile,
+        "design_settings": lade_benutzereinstellungen(user_id)
+    }
+
+def lade_identitaet(user_id, erzwingen=False):
+    """
+    Lädt Rolle, Admin-Status, Profil und Designeinstellungen des Benutzers und legt sie
+    als Identität im Session-State ab.
+    
+    Verwendet die Datenbankfunktion session_bootstrap (eine Anfrage); ist sie nicht verfügbar,
+    werden Profil, Rolle und Einstellungen einzeln geladen. Identitäten werden zusätzlich
+    prozessweit für IDENTITY_TTL Sekunden gehalten, sodass eine neue Browser-Session desselben
+    Benutzers ohne Datenbankabfrage auskommt.
+    
+    Args:
+        user_id (str): ID des angemeldeten Benutzers
+        erzwingen (bool): Prozessweiten Cache übergehen und neu laden
+        
+    Returns:
+        dict: Identität mit user_id, role, is_admin, profile, design_settings und geladen
+    """
+    user_id = str(user_id)
+    with _identitaeten_lock:
+        identity = _identitaeten.get(user_id)
+    if erzwingen or identity is None or time.monotonic() - identity["geladen"] > IDENTITY_TTL:
+        daten = _bootstrap_identitaet(user_id)
+        if daten is None:
+            daten = _lade_identitaet_einzeln(user_id)
+        identity = {"user_id": user_id, **daten, "geladen": time.monotonic()}
+        with _identitaeten_lock:
+            _identitaeten[user_id] = identity
+    
+    st.session_state.is_admin = identity["is_admin"]
+    st.session_state.design_settings = identity["design_settings"]
+    st.session_state.identity = dict(identity)
+    return st.session_state.identity
+
+def verwerfe_identitaet(user_id):
+    """
+    Verwirft die prozessweit zwischengespeicherte Identität eines Benutzers (z.B. nach einer Rollenänderung).
+    
+    Args:
+        user_id (str): ID des Benutzers
+    """
+    with _identitaeten_lock:
+        _identitaeten.pop(str(user_id), None)
+
+def get_identitaet(refresh=False):
+    """
+    Liefert die Identität des angemeldeten Benutzers aus dem Session-State.
+    
+    Die Identität wird nur neu geladen, wenn sie fehlt, zu einem anderen Benutzer gehört,
+    älter als IDENTITY_TTL ist oder refresh gesetzt ist.
+    
+    Args:
+        refresh (bool): Identität unabhängig vom Alter neu laden
+        
+    Returns:
+        dict: Identität oder None, wenn niemand angemeldet ist
+    """
+    if not st.session_state.get("is_authenticated") or not st.session_state.get("user"):
+        return None
+    
+    user_id = str(st.session_state.user.id)
+    identity = st.session_state.get("identity")
+    if (refresh or identity is None or identity["user_id"] != user_id
+            or time.monotonic() - identity["geladen"] > IDENTITY_TTL):
+        identity = lade_identitaet(user_id, erzwingen=refresh)
+    return identity
+
+def aktualisiere_identitaet():
+    """
+    Lädt Rolle, Profil und Einstellungen sofort neu (z.B. nach einer Rollenänderung).
+    
+    Returns:
+        dict: Identität oder None, wenn niemand angemeldet ist
+    """
+    return get_identitaet(refresh=True)
+
 def is_read_only():
     """
     Überprüft, ob der aktuelle Benutzer nur Leserechte hat.
@@ -217,24 +407,10 @@ def is_read_only():
     Returns:
         bool: True, wenn der Benutzer read_only ist, sonst False
     """
-    if not st.session_state.is_authenticated or not st.session_state.user:
-        return False
-    
-    try:
-        # Direkter SQL-Zugriff statt über die API
-        user_id = st.session_state.user.id
-        user_data = supabase.rpc(
-            'get_user_role', 
-            {'user_id_param': user_id}
-        ).execute()
-        
-        if not user_data.data:
-            return False
-            
-        return user_data.data[0] == 'read_only'
-    except Exception as e:
-        print(f"Fehler bei der Überprüfung der Read-Only-Rechte: {e}")
+    identity = get_identitaet()
+    if identity is None:
         return False
+    return identity["role"] == 'read_only'
 
 def registrieren(email, password, name, role='user'):
     """
@@ -366,6 +542,11 @@ def benutzer_bearbeiten(user_id, data):
         
         if response.error:
             raise Exception(f"RPC-Fehler: {response.error}")
+        
+        # Geänderte Rolle gilt sofort, eigene Identität neu laden
+        verwerfe_identitaet(user_id)
+        if str(user_id) == str(st.session_state.user.id):
+            aktualisiere_identitaet()
             
         st.session_state.auth_message = "Benutzerdaten erfolgreich aktualisiert."
         st.session_state.auth_message_type = "success"
@@ -442,6 +623,9 @@ def speichere_benutzereinstellungen(design_settings):
             
         # Session-State aktualisieren
         st.session_state.design_settings = design_settings
+        if st.session_state.get("identity"):
+            st.session_state.identity["design_settings"] = design_settings
+        verwerfe_identitaet(user_id)
         return True
         
     except Exception as e:
@@ -490,48 +674,42 @@ def prüfe_session_gültigkeit():
             st.session_state.auth_message_type = "info"
             return False
     
+    # Lokal wiederhergestellte Session: Zugriffstoken vor Ablauf erneuern
+    if not erneuere_token_bei_bedarf():
+        return False
+    
     # Session ist aktiv, Zeit aktualisieren
     st.session_state.last_activity = datetime.now()
     return True
 
 
 def log_user_activity(activity_name, details=None):
-    """Benutzeraktivität protokollieren, mit Fehlerbehandlung für Rekursionsprobleme"""
+    """
+    Benutzeraktivität protokollieren, ohne die Seite zu blockieren.
+    
+    Die Aktivität wird gepuffert und im Hintergrund gesammelt geschrieben (core.activity_queue).
+    
+    Args:
+        activity_name (str): Bezeichnung der Aktivität
+        details (dict, optional): Zusätzliche Angaben
+        
+    Returns:
+        bool: True, wenn die Aktivität gepuffert wurde, sonst False
+    """
     try:
         # Wenn keine Session oder kein Benutzer existiert, einfach zurückkehren ohne Fehler
-        if not hasattr(st, 'session_state') or not hasattr(st.session_state, 'user'):
+        if not hasattr(st, 'session_state') or not getattr(st.session_state, 'user', None):
             return False
-            
-        # Verhindere Datenbankfehler durch Rekursion
-        import json
-        from datetime import datetime
-        from core.storage import supabase
         
-        # Direkte Einfügung ohne RLS-Richtlinien zu aktivieren (umgeht die Rekursion)
-        try:
-            activity_data = {
-                "user_id": st.session_state.user.id,
-                "action": activity_name,
-                "details": json.dumps(details) if details else None,
-                "created_at": datetime.now().isoformat()
-            }
-            
-            # INSERT mit rpc anstelle von direkter Tabelleneinfügung
-            # Dies umgeht die RLS-Richtlinien, die die Rekursion verursachen
-            supabase.rpc('insert_user_activity', {
-                'user_id_param': activity_data["user_id"],
-                'action_param': activity_data["action"],
-                'details_param': activity_data["details"],
-                'created_at_param': activity_data["created_at"]
-            }).execute()
-            
-            return True
-        except Exception as inner_e:
-            # Stille Ausnahmebehandlung für Datenbankfehler
-            print(f"Stille Fehlerbehandlung bei Benutzeraktivität: {str(inner_e)}")
-            return False
-            
+        from core.activity_queue import enqueue_activity
+        from core.storage import get_client
+        return enqueue_activity({
+            "user_id": str(st.session_state.user.id),
+            "action": activity_name,
+            "details": json.dumps(details, default=str) if details else None,
+            "created_at": datetime.now().isoformat()
+        }, client=get_client())
     except Exception as e:
         # Allgemeine Ausnahmebehandlung
         print(f"Fehler beim Protokollieren der Benutzeraktivität: {str(e)}")
-        return False
\ No newline at end of file
+        return False
@@ -3,6 +3,7 @@ import extra_streamlit_components as stx
 from datetime import datetime, timedelta
 import json
 from core.storage import supabase
+from core.jwt_validation import validate_access_token, needs_refresh, user_from_claims
 
 def get_cookie_manager():
     """
@@ -75,7 +76,26 @@ def load_auth_from_cookie():
         # Parse den JSON-String
         auth_data = json.loads(auth_data_str)
         
-        # Stelle die Session mit den gespeicherten Tokens wieder her
+        # Gültiges Token lokal bestätigen (Signatur und Ablauf), ohne Anfrage an den Auth-Server
+        claims = validate_access_token(auth_data["access_token"])
+        if claims and claims.get("sub") == str(auth_data["user_id"]) and not needs_refresh(claims):
+            try:
+                # Token für Datenbankabfragen setzen (lokal, ohne Netzwerk)
+                supabase.postgrest.auth(auth_data["access_token"])
+            except Exception as e:
+                print(f"Fehler beim Setzen des Zugriffstokens: {e}")
+            from core.auth import uebernehme_anmeldung, TOKEN_REFRESH_KEY
+            uebernehme_anmeldung(user_from_claims(claims), None, auth_data["stay_logged_in"],
+                                 cookie_token=auth_data["access_token"])
+            # GoTrue kennt diese Session nicht: das Refresh-Token merken, damit das Zugriffstoken
+            # vor Ablauf erneuert wird (core.auth.erneuere_token_bei_bedarf)
+            st.session_state[TOKEN_REFRESH_KEY] = {
+                "refresh_token": auth_data["refresh_token"],
+                "exp": float(claims["exp"])
+            }
+            return True
+        
+        # Token abgelaufen, bald ablaufend oder nicht lokal prüfbar: Session über den Auth-Server erneuern
         session = {
             "access_token": auth_data["access_token"],
             "refresh_token": auth_data["refresh_token"]
@@ -84,30 +104,10 @@ def load_auth_from_cookie():
         response = supabase.auth.set_session(session)
         
         if response and response.user:
-            # Session erfolgreich wiederhergestellt, aktualisiere die Session-State-Variablen
-            st.session_state.user = response.user
-            st.session_state.is_authenticated = True
-            st.session_state.stay_logged_in = auth_data["stay_logged_in"]
-            st.session_state.last_activity = datetime.now()
-            
-            # Aktualisierte Token im Cookie speichern
-            save_auth_to_cookie(response.user, response.session, auth_data["stay_logged_in"])
-            
-            # Benutzerrolle überprüfen
-            user_data = supabase.table('profiles').select('*').eq('id', response.user.id).execute()
-            
-            print(f"Cookie-Auth: Benutzerrolle überprüft: {user_data.data}")  # Debugging
-            
-            if user_data.data and user_data.data[0].get('role') == 'admin':
-                st.session_state.is_admin = True
-                print("Cookie-Auth: Admin-Status gesetzt")  # Debugging
-            else:
-                st.session_state.is_admin = False
-            
-            from core.auth import lade_benutzereinstellungen
-            # Benutzereinstellungen laden
-            lade_benutzereinstellungen(response.user.id)
-            
+            # Gleicher Anmeldepfad wie beim Passwort-Login; Cookie nur bei erneuertem Token schreiben
+            from core.auth import uebernehme_anmeldung
+            uebernehme_anmeldung(response.user, response.session, auth_data["stay_logged_in"],
+                                 cookie_token=auth_data["access_token"])
             return True
     except Exception as e:
         print(f"Fehler beim Laden der Authentifizierungsdaten aus dem Cookie: {e}")
@@ -0,0 +1,136 @@
+import json
+import numpy as np
+
+# ----------------------------------
+# 📊 ECharts-Optionen aus Spaltendaten erzeugen
+# ----------------------------------
+def _column_values(values, decimals=2):
+    """Wandelt eine Spalte (Liste, np.ndarray, pd.Series) in eine kompakte JSON-fähige Liste um."""
+    array = np.asarray(values)
+    if array.dtype.kind in "fc":
+        return np.round(array.astype(float), decimals).tolist()
+    if array.dtype.kind in "iub":
+        return array.tolist()
+    return [str(v) for v in array.tolist()]
+
+def dataset_chart(columns, x, series, x_type="category", zoom=None, extra=None):
+    """
+    Erzeugt ECharts-Optionen mit einem spaltenbasierten dataset statt Datenlisten pro Serie.
+
+    Args:
+        columns (dict): Spaltenname -> Werte (Liste oder np.ndarray)
+        x (str): Spalte für die x-Achse
+        series (list): Serien-Definitionen; "name" verweist auf die Spalte mit den y-Werten
+        x_type (str): Typ der x-Achse ("category" oder "time")
+        zoom (tuple, optional): Sichtbarer Bereich (start, end) in Prozent, aktiviert dataZoom und Toolbox
+        extra (dict, optional): Zusätzliche Optionen, die übernommen werden
+
+    Returns:
+        dict: ECharts-Optionen
+    """
+    options = {
+        "dataset": {"source": {name: _column_values(values) for name, values in columns.items()}},
+        "tooltip": {"trigger": "axis"},
+        "legend": {"data": [s["name"] for s in series]},
+        "xAxis": {"type": x_type},
+        "yAxis": {"type": "value"},
+        "series": [
+            {**s, "encode": {"x": x, "y": s["name"]}, "datasetIndex": 0}
+            for s in series
+        ]
+    }
+
+    if zoom is not None:
+        start, end = zoom
+        options["toolbox"] = {
+            "feature": {
+                "dataZoom": {"yAxisIndex": "none"},
+                "restore": {},
+                "saveAsImage": {}
+            }
+        }
+        options["dataZoom"] = [
+            {"type": "inside", "start": start, "end": end},
+            {"start": start, "end": end}
+        ]
+
+    if extra:
+        options.update(extra)
+    return options
+
+def dataset_pie(names, values, series_name, label_formatter="{b}: {c} CHF"):
+    """
+    Erzeugt ein Ringdiagramm mit dataset-Quelle.
+
+    Args:
+        names (list): Beschriftungen der Segmente
+        values (list): Werte der Segmente
+        series_name (str): Name der Serie (für den Tooltip)
+        label_formatter (str): Formatierung der Segmentbeschriftung
+
+    Returns:
+        dict: ECharts-Optionen
+    """
+    return {
+        "dataset": {"source": {"name": _column_values(names), "value": _column_values(values)}},
+        "tooltip": {
+            "trigger": "item",
+            "formatter": "{a} <br/>{b}: {c} CHF ({d}%)"
+        },
+        "legend": {
+            "orient": "vertical",
+            "left": "left"
+        },
+        "series": [
+            {
+                "name": series_name,
+                "type": "pie",
+                "radius": ["30%", "70%"],
+                "avoidLabelOverlap": False,
+                "encode": {"itemName": "name", "value": "value"},
+                "label": {
+                    "show": True,
+                    "formatter": label_formatter
+                },
+                "emphasis": {
+                    "label": {
+                        "show": True,
+                        "fontSize": "18",
+                        "fontWeight": "bold"
+                    }
+                },
+                "labelLine": {"show": True}
+            }
+        ]
+    }
+
+# ----------------------------------
+# 🗄️ Diagramm-Optionen zwischenspeichern
+# ----------------------------------
+def cached_chart(cache, version, chart_name, params, builder, max_entries=32):
+    """
+    Liefert die Optionen eines Diagramms aus dem Cache oder baut sie einmal pro Ledger-Version.
+
+    Bei unveränderten Daten wird dasselbe, bereits serialisierbare Options-Objekt wiederverwendet,
+    sodass das Diagramm weder neu aufgebaut noch mit abweichendem Inhalt übertragen wird.
+
+    Args:
+        cache (dict): Cache-Speicher, z.B. aus dem Session-State
+        version (str): Version des Ledgers
+        chart_name (str): Eindeutiger Name des Diagramms
+        params (dict): Parameter, die das Diagramm beeinflussen (Zeitraum, Zoom, Optionen, ...)
+        builder (callable): Funktion ohne Argumente, die die Optionen erzeugt
+
+    Returns:
+        dict: ECharts-Optionen
+    """
+    key = (version, chart_name, json.dumps(params, sort_keys=True, default=str))
+    if key in cache:
+        return cache[key]
+
+    # Älteste Einträge verwerfen, damit der Session-State klein bleibt
+    while len(cache) >= max_entries:
+        cache.pop(next(iter(cache)))
+
+    cache[key] = builder()
+    return cache[key]
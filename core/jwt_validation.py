@@ -0,0 +1,136 @@
+import base64
+import hashlib
+import hmac
+import json
+import os
+import threading
+import time
+from types import SimpleNamespace
+
+try:
+    import jwt
+except ImportError:
+    # Ohne PyJWT werden nur HS256-Tokens (gemeinsames Secret) lokal geprüft
+    jwt = None
+
+# Token mit weniger Restlaufzeit (Sekunden) werden über das Netzwerk erneuert
+JWT_REFRESH_MARGIN = 300
+
+# Gültigkeitsdauer des zwischengespeicherten JWKS in Sekunden
+JWKS_TTL = 3600
+
+# Zulässige Algorithmen asymmetrisch signierter Tokens (nie aus dem ungeprüften Header übernehmen)
+JWT_ASYMMETRIC_ALGORITHMS = ["RS256", "ES256"]
+
+# Erwartete Audience der Supabase-Zugriffstoken
+JWT_AUDIENCE = "authenticated"
+
+# Prozessweiter Cache des JWKS-Clients (lädt und speichert die öffentlichen Schlüssel)
+_jwks_client = {}
+_lock = threading.Lock()
+
+def _b64decode(teil):
+    return base64.urlsafe_b64decode(teil + "=" * (-len(teil) % 4))
+
+def _decode_hs256(token, secret):
+    """Prüft Signatur eines HS256-Tokens ohne externe Bibliothek und liefert die Claims."""
+    header_b64, payload_b64, signatur_b64 = token.split(".")
+    header = json.loads(_b64decode(header_b64))
+    if header.get("alg") != "HS256":
+        raise ValueError(f"Nicht unterstützter Algorithmus {header.get('alg')}")
+    erwartet = hmac.new(secret.encode("utf-8"), f"{header_b64}.{payload_b64}".encode("ascii"), hashlib.sha256).digest()
+    if not hmac.compare_digest(erwartet, _b64decode(signatur_b64)):
+        raise ValueError("Ungültige Signatur")
+    return json.loads(_b64decode(payload_b64))
+
+def _get_jwks_client(url):
+    """JWKS-Client je URL; die Schlüssel werden von PyJWT für JWKS_TTL zwischengespeichert."""
+    with _lock:
+        if url not in _jwks_client:
+            _jwks_client[url] = jwt.PyJWKClient(url, cache_keys=True, lifespan=JWKS_TTL)
+        return _jwks_client[url]
+
+def validate_access_token(token, secret=None, supabase_url=None):
+    """
+    Prüft ein Supabase-Zugriffstoken lokal (Signatur, Ablauf und Audience).
+
+    HS256-Tokens werden mit dem gemeinsamen Secret (SUPABASE_JWT_SECRET) geprüft, asymmetrisch
+    signierte Tokens mit den öffentlichen Schlüsseln aus dem JWKS des Projekts (nur mit PyJWT).
+
+    Args:
+        token (str): Zugriffstoken
+        secret (str, optional): JWT-Secret (Standard: SUPABASE_JWT_SECRET)
+        supabase_url (str, optional): Projekt-URL für das JWKS (Standard: SUPABASE_URL)
+
+    Returns:
+        dict: Claims des Tokens oder None, wenn es nicht lokal bestätigt werden kann
+    """
+    if not token:
+        return None
+    secret = secret if secret is not None else os.getenv("SUPABASE_JWT_SECRET")
+    supabase_url = supabase_url if supabase_url is not None else os.getenv("SUPABASE_URL")
+
+    try:
+        header = json.loads(_b64decode(token.split(".")[0]))
+        alg = header.get("alg")
+        if alg == "HS256":
+            if not secret:
+                return None
+            if jwt is not None:
+                claims = jwt.decode(token, secret, algorithms=["HS256"], audience=JWT_AUDIENCE)
+            else:
+                claims = _decode_hs256(token, secret)
+        elif alg in JWT_ASYMMETRIC_ALGORITHMS:
+            if jwt is None or not supabase_url:
+                return None
+            signing_key = _get_jwks_client(f"{supabase_url.rstrip('/')}/auth/v1/.well-known/jwks.json") \
+                .get_signing_key_from_jwt(token)
+            # Algorithmus des Schlüssels aus dem JWKS, falls angegeben, sonst die Allowlist
+            algorithms = [signing_key.algorithm_name] if getattr(signing_key, "algorithm_name", None) \
+                in JWT_ASYMMETRIC_ALGORITHMS else JWT_ASYMMETRIC_ALGORITHMS
+            claims = jwt.decode(token, signing_key.key, algorithms=algorithms, audience=JWT_AUDIENCE)
+        else:
+            print(f"Token mit nicht zugelassenem Algorithmus {alg} wird nicht lokal geprüft")
+            return None
+    except Exception as e:
+        print(f"Token konnte nicht lokal geprüft werden: {e}")
+        return None
+
+    # Ablauf und Audience auch ohne PyJWT prüfen
+    if float(claims.get("exp", 0)) <= time.time():
+        return None
+    audience = claims.get("aud")
+    if audience is not None and JWT_AUDIENCE not in (audience if isinstance(audience, list) else [audience]):
+        return None
+    return claims
+
+def needs_refresh(claims, margin=JWT_REFRESH_MARGIN):
+    """
+    Prüft, ob ein Token bald abläuft und über das Netzwerk erneuert werden sollte.
+
+    Args:
+        claims (dict): Claims aus validate_access_token
+        margin (int): Minimale Restlaufzeit in Sekunden
+
+    Returns:
+        bool: True, wenn die Restlaufzeit kleiner als margin ist
+    """
+    return float(claims.get("exp", 0)) - time.time() < margin
+
+def user_from_claims(claims):
+    """
+    Baut aus den Claims ein Benutzerobjekt mit den in der App verwendeten Attributen.
+
+    Args:
+        claims (dict): Claims aus validate_access_token
+
+    Returns:
+        SimpleNamespace: Benutzer mit id, email, role, user_metadata und app_metadata
+    """
+    return SimpleNamespace(
+        id=claims["sub"],
+        email=claims.get("email"),
+        role=claims.get("role"),
+        user_metadata=claims.get("user_metadata") or {},
+        app_metadata=claims.get("app_metadata") or {}
+    )
@@ -1,12 +1,108 @@
 import os
+import threading
+import httpx
 from dotenv import load_dotenv
 from supabase import create_client, Client
 
+try:
+    from supabase import ClientOptions
+except ImportError:
+    # Ältere supabase-Versionen: kein gemeinsamer HTTP-Client, jede Session mit eigenem Pool
+    ClientOptions = None
+
 load_dotenv()
 
 SUPABASE_URL = os.getenv("SUPABASE_URL")
 SUPABASE_KEY = os.getenv("SUPABASE_KEY")
+# Optionaler Service-Role-Schlüssel für serverseitige Schreibvorgänge ohne Benutzersession
+# (z.B. Sammel-Insert der Benutzeraktivitäten); darf nie an den Browser gelangen
+SUPABASE_SERVICE_KEY = os.getenv("SUPABASE_SERVICE_KEY")
+
+# Grösse des gemeinsamen Verbindungspools (alle Sessions des Prozesses)
+SUPABASE_MAX_CONNECTIONS = int(os.getenv("SUPABASE_MAX_CONNECTIONS", 20))
+SUPABASE_MAX_KEEPALIVE = int(os.getenv("SUPABASE_MAX_KEEPALIVE", 10))
+
+# Schlüssel des Session-Clients im Streamlit-Session-State
+SESSION_CLIENT_KEY = "_supabase_client"
+
+class _SharedTransport(httpx.HTTPTransport):
+    """Verbindungspool des Prozesses; wird beim Schliessen eines Session-Clients nicht mitgeschlossen."""
+
+    def close(self):
+        pass
+
+# Gemeinsamer Verbindungspool: Verbindungen und Keep-Alive werden von allen Session-Clients geteilt.
+# Jeder Session-Client erhält darüber einen eigenen httpx.Client, da postgrest/storage3 den
+# übergebenen Client als ihre Session behandeln (base_url, Header, Authorization)
+_transport = _SharedTransport(
+    limits=httpx.Limits(max_connections=SUPABASE_MAX_CONNECTIONS, max_keepalive_connections=SUPABASE_MAX_KEEPALIVE)
+)
+_lock = threading.Lock()
+
+def create_session_client(key=None):
+    """
+    Erstellt einen leichten Supabase-Client mit eigenem Auth-Zustand auf dem gemeinsamen Verbindungspool.
+
+    Args:
+        key (str, optional): API-Schlüssel (Standard: SUPABASE_KEY)
+
+    Returns:
+        Client: Supabase-Client
+    """
+    key = key or SUPABASE_KEY
+    if ClientOptions is None:
+        return create_client(SUPABASE_URL, key)
+    http_client = httpx.Client(transport=_transport, timeout=httpx.Timeout(30.0), follow_redirects=True)
+    try:
+        options = ClientOptions(httpx_client=http_client, persist_session=False)
+    except TypeError:
+        options = ClientOptions(persist_session=False)
+    return create_client(SUPABASE_URL, key, options=options)
+
+# Client ohne Benutzersession (Hintergrund-Threads, Skripte)
+base_client: Client = create_session_client()
+
+# Client mit Service-Role (nur serverseitig, None ohne SUPABASE_SERVICE_KEY)
+service_client: Client = create_session_client(SUPABASE_SERVICE_KEY) if SUPABASE_SERVICE_KEY else None
+
+def _session_state():
+    """Session-State der laufenden Streamlit-Session oder None ausserhalb einer Session."""
+    try:
+        from streamlit.runtime.scriptrunner import get_script_run_ctx
+        if get_script_run_ctx() is None:
+            return None
+        import streamlit as st
+        return st.session_state
+    except Exception:
+        return None
+
+def get_client():
+    """
+    Liefert den Supabase-Client der aktuellen Browser-Session.
+
+    Jede Streamlit-Session erhält beim ersten Zugriff einen eigenen Client, sodass An- und
+    Abmeldungen paralleler Benutzer sich nicht gegenseitig überschreiben. Ausserhalb einer
+    Session (Hintergrund-Threads, Skripte) wird der gemeinsame Client ohne Benutzersession verwendet.
+
+    Returns:
+        Client: Supabase-Client
+    """
+    state = _session_state()
+    if state is None:
+        return base_client
+    client = state.get(SESSION_CLIENT_KEY)
+    if client is None:
+        with _lock:
+            client = state.get(SESSION_CLIENT_KEY)
+            if client is None:
+                client = create_session_client()
+                state[SESSION_CLIENT_KEY] = client
+    return client
+
+class _SessionClientProxy:
+    """Leitet jeden Zugriff (table, rpc, auth, ...) an den Client der aktuellen Session weiter."""
 
-print("🔐 Geladener SUPABASE_KEY beginnt mit:", SUPABASE_KEY[:15])  # Das reicht für Kontrolle
+    def __getattr__(self, name):
+        return getattr(get_client(), name)
 
-supabase: Client = create_client(SUPABASE_URL, SUPABASE_KEY)
\ No newline at end of file
+supabase: Client = _SessionClientProxy()
@@ -0,0 +1,177 @@
+import numpy as np
+import pandas as pd
+
+# Feste Reihenfolge der Richtungen und Kategorien im Würfel
+DIRECTIONS = ["incoming", "outgoing"]
+STANDARD_KATEGORIEN = ["Standard", "Fixkosten", "Simulation", "Lohn"]
+
+# Granularitäten des Würfels mit Periodenfrequenz und Beschriftungsformat
+GRANULARITIES = {
+    "D": ("D", "%Y-%m-%d"),
+    "W": ("W-SUN", "%G-W%V"),
+    "M": ("M", "%Y-%m")
+}
+
+def build_cube(df, start_date, end_date, start_balance=0.0):
+    """
+    Aggregiert das Ledger einmalig zu einem Würfel Periode × Richtung × Kategorie
+    für die Granularitäten Tag, Woche und Monat.
+
+    Die Tageswerte werden in einem einzigen bincount-Durchgang berechnet, Wochen und
+    Monate entstehen daraus per np.add.reduceat über die zusammenhängenden Tage.
+
+    Args:
+        df (pd.DataFrame): Ledger mit Date, Amount (vorzeichenbehaftet), Direction und optional Kategorie
+        start_date (date): Erster Tag des Zeitraums
+        end_date (date): Letzter Tag des Zeitraums
+        start_balance (float): Kontostand vor dem ersten Tag
+
+    Returns:
+        dict: Je Granularität ("D", "W", "M") ein dict mit labels, period_start, directions, kategorien,
+              sums und counts (Perioden × Richtungen × Kategorien) sowie end_balance (Kontostand am Periodenende)
+    """
+    days = pd.date_range(start=pd.Timestamp(start_date), end=pd.Timestamp(end_date), freq="D")
+    n_days = len(days)
+
+    dates = pd.to_datetime(df["Date"], errors="coerce").dt.normalize()
+    amounts = pd.to_numeric(df["Amount"], errors="coerce").fillna(0).to_numpy(dtype=float)
+
+    # Tagesindex relativ zum Startdatum (außerhalb des Zeitraums: -1)
+    day_codes = (dates - pd.Timestamp(start_date)).dt.days.fillna(-1).to_numpy(dtype=np.int64)
+    day_codes = np.where((day_codes >= 0) & (day_codes < n_days), day_codes, -1)
+
+    # Richtung nur einmal pro Spalte klein schreiben (unbekannte Richtungen ergeben -1)
+    direction_codes = pd.Index(DIRECTIONS).get_indexer(df["Direction"].astype(str).str.lower())
+
+    # Bekannte Kategorien zuerst, weitere in alphabetischer Reihenfolge anhängen
+    if "Kategorie" in df.columns:
+        kategorie_values = df["Kategorie"].fillna("Standard").astype(str)
+    else:
+        kategorie_values = pd.Series("Standard", index=df.index)
+    extra = sorted(set(kategorie_values.unique()) - set(STANDARD_KATEGORIEN))
+    kategorien = STANDARD_KATEGORIEN + extra
+    kategorie_codes = pd.Categorical(kategorie_values, categories=kategorien).codes
+
+    n_dirs, n_kats = len(DIRECTIONS), len(kategorien)
+    size = n_days * n_dirs * n_kats
+
+    # Ein bincount über den kombinierten Index liefert Summen und Anzahlen pro Tag
+    valid = (day_codes >= 0) & (direction_codes >= 0)
+    flat = (day_codes[valid] * n_dirs + direction_codes[valid]) * n_kats + kategorie_codes[valid]
+    day_sums = np.bincount(flat, weights=amounts[valid], minlength=size).reshape(n_days, n_dirs, n_kats)
+    day_counts = np.bincount(flat, minlength=size).reshape(n_days, n_dirs, n_kats)
+
+    # Kontostand am Tagesende: alle Beträge des Tages, unabhängig von der Richtung
+    dated = day_codes >= 0
+    day_totals = np.bincount(day_codes[dated], weights=amounts[dated], minlength=n_days)
+    day_balance = start_balance + np.cumsum(day_totals)
+
+    cube = {}
+    for key, (freq, label_format) in GRANULARITIES.items():
+        if key == "D":
+            starts = np.arange(n_days)
+            sums, counts = day_sums, day_counts
+        else:
+            # Erster Tag jeder Periode; die Tage sind zusammenhängend und sortiert
+            period_codes = days.to_period(freq).asi8
+            starts = np.flatnonzero(np.r_[True, period_codes[1:] != period_codes[:-1]]) if n_days else np.arange(0)
+            sums = np.add.reduceat(day_sums, starts, axis=0) if n_days else day_sums
+            counts = np.add.reduceat(day_counts, starts, axis=0) if n_days else day_counts
+        ends = np.r_[starts[1:] - 1, n_days - 1] if n_days else starts
+        period_start = days[starts]
+
+        cube[key] = {
+            "labels": [d.strftime(label_format) for d in period_start],
+            "period_start": period_start,
+            "directions": list(DIRECTIONS),
+            "kategorien": kategorien,
+            "sums": sums,
+            "counts": counts,
+            "end_balance": day_balance[ends]
+        }
+
+    return cube
+
+def patch_cube(cube, start_date, entfernt, hinzu):
+    """
+    Überträgt entfernte und hinzugefügte Ledger-Zeilen in einen bestehenden Würfel, ohne ihn neu aufzubauen.
+
+    Args:
+        cube (dict): Würfel aus build_cube
+        start_date (date): Erster Tag des Würfels
+        entfernt (pd.DataFrame): Aus dem Ledger entfernte Zeilen
+        hinzu (pd.DataFrame): Ins Ledger eingefügte Zeilen
+
+    Returns:
+        dict: Neuer Würfel oder None, wenn eine Zeile eine im Würfel unbekannte Kategorie hat
+              (dann muss der Würfel neu aufgebaut werden)
+    """
+    cube = {key: {**ebene, "sums": ebene["sums"].copy(), "counts": ebene["counts"].copy(),
+                  "end_balance": ebene["end_balance"].copy()}
+            for key, ebene in cube.items()}
+    n_days = len(cube["D"]["period_start"])
+    kategorien = cube["D"]["kategorien"]
+
+    # Alle Zeilen in einem Rahmen, entfernte mit negativem Vorzeichen
+    teile = [(z, v) for z, v in [(entfernt, -1.0), (hinzu, 1.0)] if z is not None and not z.empty]
+    if not teile:
+        return cube
+    zeilen = pd.concat([z for z, _ in teile], ignore_index=True)
+    vorzeichen = np.concatenate([np.full(len(z), v) for z, v in teile])
+
+    dates = pd.to_datetime(zeilen["Date"], errors="coerce").dt.normalize()
+    day_codes = (dates - pd.Timestamp(start_date)).dt.days.fillna(-1).to_numpy(dtype=np.int64)
+    im_zeitraum = (day_codes >= 0) & (day_codes < n_days)
+    betraege = vorzeichen * pd.to_numeric(zeilen["Amount"], errors="coerce").fillna(0).to_numpy(dtype=float)
+    direction_codes = pd.Index(DIRECTIONS).get_indexer(zeilen["Direction"].astype(str).str.lower())
+    if "Kategorie" in zeilen.columns:
+        kategorie_values = zeilen["Kategorie"].fillna("Standard").astype(str)
+    else:
+        kategorie_values = pd.Series("Standard", index=zeilen.index)
+    # Unbekannte Werte ergeben -1
+    kategorie_codes = pd.Index(kategorien).get_indexer(kategorie_values)
+
+    # Unbekannte Kategorie: der Würfel muss neu aufgebaut werden
+    gerichtet = im_zeitraum & (direction_codes >= 0)
+    if (kategorie_codes[gerichtet] < 0).any():
+        return None
+
+    for key, ebene in cube.items():
+        # Erster Tag jeder Periode als Tagesindex
+        period_days = (ebene["period_start"] - pd.Timestamp(start_date)).days.to_numpy()
+        perioden = np.searchsorted(period_days, day_codes, side="right") - 1
+        # Kontostand: alle Beträge, unabhängig von der Richtung (wie in build_cube)
+        delta = np.bincount(perioden[im_zeitraum], weights=betraege[im_zeitraum], minlength=len(period_days))
+        ebene["end_balance"] += np.cumsum(delta)
+        index = (perioden[gerichtet], direction_codes[gerichtet], kategorie_codes[gerichtet])
+        np.add.at(ebene["sums"], index, betraege[gerichtet])
+        np.add.at(ebene["counts"], index, vorzeichen[gerichtet].astype(ebene["counts"].dtype))
+
+    return cube
+
+def get_cube(df, version, start_date, end_date, start_balance, cache, max_entries=8):
+    """
+    Liefert den Aggregationswürfel aus dem Cache oder berechnet ihn einmal pro Ledger-Version.
+
+    Args:
+        df (pd.DataFrame): Ledger aus build_ledger
+        version (str): Version des Ledgers (siehe logic.ledger.ledger_version)
+        start_date (date): Erster Tag des Zeitraums
+        end_date (date): Letzter Tag des Zeitraums
+        start_balance (float): Kontostand vor dem ersten Tag
+        cache (dict): Cache-Speicher, z.B. aus dem Session-State
+        max_entries (int): Maximale Anzahl gespeicherter Würfel
+
+    Returns:
+        dict: Würfel wie von build_cube
+    """
+    key = (version, str(start_date), str(end_date), float(start_balance))
+    if key in cache:
+        return cache[key]
+
+    # Älteste Einträge verwerfen, damit der Session-State klein bleibt
+    while len(cache) >= max_entries:
+        cache.pop(next(iter(cache)))
+
+    cache[key] = build_cube(df, start_date, end_date, start_balance)
+    return cache[key]
@@ -0,0 +1,102 @@
+import numpy as np
+import pandas as pd
+
+def _runway(balances, floor):
+    """Tage bis zur ersten Unterschreitung von floor je Zeile (-1, wenn der Zeitraum ausreicht)."""
+    below = balances < floor
+    return np.where(below.any(axis=1), below.argmax(axis=1), -1)
+
+def item_flows(ledger, start_date, end_date):
+    """
+    Baut die täglichen Zahlungsflüsse je Fixkosten-Vertrag und Mitarbeiter als Matrix auf.
+
+    Fixkosten werden über Fixkosten_id zusammengefasst, Löhne über die Details ("Lohn {name}").
+
+    Args:
+        ledger (pd.DataFrame): Ledger aus build_ledger (Amount vorzeichenbehaftet)
+        start_date (date): Erster Tag des Zeitraums
+        end_date (date): Letzter Tag des Zeitraums
+
+    Returns:
+        tuple: (pd.DataFrame mit Posten und Art je Zeile, np.ndarray Zahlungsflüsse Posten × Tage)
+    """
+    n_days = (pd.Timestamp(end_date) - pd.Timestamp(start_date)).days + 1
+    day_codes = (pd.to_datetime(ledger["Date"], errors="coerce").dt.normalize() - pd.Timestamp(start_date)).dt.days
+    day_codes = day_codes.fillna(-1).to_numpy(dtype=np.int64)
+    in_range = (day_codes >= 0) & (day_codes < n_days)
+
+    details = ledger["Details"].astype(str)
+    is_fix = (ledger["Kategorie"] == "Fixkosten").to_numpy()
+    if "Fixkosten_id" in ledger.columns:
+        is_fix = is_fix & ledger["Fixkosten_id"].notna().to_numpy()
+    else:
+        is_fix = np.zeros(len(ledger), dtype=bool)
+    is_lohn = (ledger["Kategorie"] == "Lohn").to_numpy()
+
+    # Schlüssel je Zeile: Fixkosten-ID bzw. Lohn-Details, übrige Zeilen bleiben leer
+    keys = pd.Series(None, index=ledger.index, dtype=object)
+    if is_fix.any():
+        keys[is_fix] = "fix:" + ledger.loc[is_fix, "Fixkosten_id"].astype(str)
+    keys[is_lohn] = "lohn:" + details[is_lohn]
+    mask = keys.notna().to_numpy() & in_range
+    if not mask.any():
+        return pd.DataFrame(columns=["Posten", "Art"]), np.zeros((0, n_days))
+
+    codes, uniques = pd.factorize(keys[mask])
+    # Anzeigename: Fixkosten ohne Rhythmus-Präfix ("Quartalsfixkosten: Miete" -> "Miete")
+    names = details[mask].str.replace(r"^[^:]*:\s*", "", regex=True).where(~is_lohn[mask], details[mask])
+    posten = pd.DataFrame({
+        "Posten": names.groupby(codes).first().to_numpy(),
+        "Art": ["Lohn" if key.startswith("lohn:") else "Fixkosten" for key in uniques]
+    })
+
+    amounts = pd.to_numeric(ledger["Amount"], errors="coerce").fillna(0).to_numpy(dtype=float)
+    flat = codes.astype(np.int64) * n_days + day_codes[mask]
+    flows = np.bincount(flat, weights=amounts[mask], minlength=len(uniques) * n_days).reshape(len(uniques), n_days)
+    return posten, flows
+
+def removal_impact(ledger, start_date, end_date, base_balance, floor=0.0):
+    """
+    Berechnet für jeden Fixkosten-Vertrag und Mitarbeiter, wie sich ein Wegfall auf Tiefststand und Runway auswirkt.
+
+    Alle Gegenszenarien werden in einer Matrixoperation ausgewertet: Die kumulierten Zahlungsflüsse
+    je Posten werden vom Basis-Kontostand abgezogen (Posten × Tage).
+
+    Args:
+        ledger (pd.DataFrame): Ledger aus build_ledger
+        start_date (date): Erster Tag des Zeitraums
+        end_date (date): Letzter Tag des Zeitraums
+        base_balance (np.ndarray): Kontostand am Tagesende (z.B. cube["D"]["end_balance"])
+        floor (float): Schwelle für die Runway
+
+    Returns:
+        pd.DataFrame: Posten, Art, Summe, Tiefststand ohne Posten, Verbesserung, Runway ohne Posten und
+                      Runway-Gewinn, absteigend nach Verbesserung des Tiefststands
+    """
+    posten, flows = item_flows(ledger, start_date, end_date)
+    base = np.asarray(base_balance, dtype=float)
+    if posten.empty or not len(base):
+        return pd.DataFrame(columns=["Posten", "Art", "Summe", "Tiefststand ohne", "Verbesserung",
+                                     "Runway ohne", "Runway-Gewinn"])
+
+    balances = base[None, :] - np.cumsum(flows, axis=1)
+    base_min = base.min()
+    base_runway = _runway(base[None, :], floor)[0]
+    runway = _runway(balances, floor)
+
+    # Runway-Gewinn nur, wenn die Basis den Zeitraum nicht ohnehin übersteht
+    if base_runway < 0:
+        gewinn = np.zeros(len(runway))
+    else:
+        gewinn = np.where(runway < 0, len(base), runway) - base_runway
+
+    result = posten.assign(
+        Summe=-flows.sum(axis=1),
+        **{
+            "Tiefststand ohne": balances.min(axis=1),
+            "Verbesserung": balances.min(axis=1) - base_min,
+            "Runway ohne": pd.Series(runway).where(runway >= 0).astype("Int64"),
+            "Runway-Gewinn": gewinn.astype(int)
+        }
+    )
+    return result.sort_values(["Verbesserung", "Summe"], ascending=False, kind="stable").reset_index(drop=True)
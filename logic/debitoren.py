@@ -0,0 +1,146 @@
+import hashlib
+import numpy as np
+import pandas as pd
+
+# Gewicht des Durchschnitts aller Kunden bei Kunden mit wenigen Zahlungen (in Anzahl Zahlungen)
+VERZUG_GLAETTUNG = 3
+# Grenzen für einzelne Verzugswerte in Tagen, damit Ausreisser das Modell nicht verzerren
+VERZUG_GRENZEN = (-30, 180)
+
+def kundennummer_aus_details(details):
+    """
+    Liest die Kundennummer aus den Details einer Einnahme ("Kunde Kundennummer").
+
+    Args:
+        details (pd.Series): Details-Spalte
+
+    Returns:
+        pd.Series: Kundennummer als Text (letztes Wort der Details)
+    """
+    return details.astype(str).str.strip().str.rsplit(" ", n=1).str[-1]
+
+# Mögliche Spalten mit der Rechnungsnummer im Rechnungsexport
+RECHNUNGSNUMMER_SPALTEN = ["Rechnungsnummer", "Rechnungsnr", "Rechnung", "Belegnummer", "Beleg"]
+
+def rechnung_keys(zahlungen):
+    """
+    Bildet einen stabilen Schlüssel je bezahlter Rechnung, damit wiederholte Importe nicht doppelt zählen.
+
+    Mit Rechnungsnummer: Kundennummer und Rechnungsnummer; sonst ein Hash aus Kundennummer,
+    Fälligkeit, Betrag und Zahlungsdatum.
+
+    Args:
+        zahlungen (pd.DataFrame): Rechnungen mit Kundennummer, Zahlbar bis, Bezahlt am und optional Brutto
+
+    Returns:
+        pd.Series: Schlüssel je Rechnung
+    """
+    kunde = zahlungen["Kundennummer"].astype(str)
+    nummer = next((c for c in RECHNUNGSNUMMER_SPALTEN if c in zahlungen.columns), None)
+    if nummer is not None:
+        return kunde + ":" + zahlungen[nummer].astype(str).str.strip()
+
+    def datum(spalte):
+        return pd.to_datetime(zahlungen[spalte], errors="coerce").dt.strftime("%Y-%m-%d").fillna("")
+
+    betrag = pd.to_numeric(zahlungen.get("Brutto", pd.Series(index=zahlungen.index, dtype=float)), errors="coerce")
+    teile = kunde + "|" + datum("Zahlbar bis") + "|" + betrag.round(2).astype(str) + "|" + datum("Bezahlt am")
+    return teile.map(lambda t: hashlib.sha1(t.encode("utf-8")).hexdigest())
+
+def verzug_je_rechnung(zahlungen):
+    """
+    Berechnet den Verzug jeder bezahlten Rechnung.
+
+    Args:
+        zahlungen (pd.DataFrame): Rechnungen mit Kundennummer, Zahlbar bis und Bezahlt am
+
+    Returns:
+        pd.DataFrame: rechnung_key, kundennummer und verzug (Tage) je auswertbarer Rechnung
+    """
+    faellig = pd.to_datetime(zahlungen["Zahlbar bis"], errors="coerce")
+    bezahlt = pd.to_datetime(zahlungen["Bezahlt am"], errors="coerce")
+    verzug = (bezahlt - faellig).dt.days.clip(*VERZUG_GRENZEN)
+    valid = verzug.notna() & zahlungen["Kundennummer"].notna()
+    return pd.DataFrame({
+        "rechnung_key": rechnung_keys(zahlungen[valid]),
+        "kundennummer": zahlungen.loc[valid, "Kundennummer"].astype(str),
+        "verzug": verzug[valid].astype(float)
+    })
+
+def verzug_statistik(zahlungen):
+    """
+    Fasst bezahlte Rechnungen zu suffizienten Statistiken je Kundennummer zusammen.
+
+    Args:
+        zahlungen (pd.DataFrame): Rechnungen mit Kundennummer, Zahlbar bis und Bezahlt am
+                                  oder Ergebnis von verzug_je_rechnung
+
+    Returns:
+        pd.DataFrame: kundennummer, anzahl, summe_verzug und summe_quadrate
+    """
+    daten = zahlungen if "verzug" in zahlungen.columns else verzug_je_rechnung(zahlungen)
+    return daten.groupby("kundennummer", as_index=False).agg(
+        anzahl=("verzug", "size"),
+        summe_verzug=("verzug", "sum"),
+        summe_quadrate=("verzug", lambda v: float((v ** 2).sum()))
+    )
+
+def merge_verzug(bestehend, neu):
+    """
+    Ergänzt bestehende Statistiken um neue Zahlungen und berechnet den erwarteten Verzug je Kunde.
+
+    Der erwartete Verzug ist der Mittelwert des Kunden, geglättet zum Mittelwert aller Kunden
+    (Kunden mit wenigen Zahlungen liegen näher am Durchschnitt).
+
+    Args:
+        bestehend (pd.DataFrame): Gespeicherte Statistiken (kann leer sein)
+        neu (pd.DataFrame): Statistiken aus verzug_statistik
+
+    Returns:
+        pd.DataFrame: kundennummer, anzahl, summe_verzug, summe_quadrate und verzug_tage
+    """
+    spalten = ["kundennummer", "anzahl", "summe_verzug", "summe_quadrate"]
+    frames = [f[spalten] for f in [bestehend, neu] if f is not None and not f.empty]
+    if not frames:
+        return pd.DataFrame(columns=spalten + ["verzug_tage"])
+    gesamt = pd.concat(frames, ignore_index=True).groupby("kundennummer", as_index=False)[spalten[1:]].sum()
+    global_mittel = gesamt["summe_verzug"].sum() / max(gesamt["anzahl"].sum(), 1)
+    gesamt["verzug_tage"] = (
+        (gesamt["summe_verzug"] + VERZUG_GLAETTUNG * global_mittel) / (gesamt["anzahl"] + VERZUG_GLAETTUNG)
+    ).round(1)
+    return gesamt
+
+def apply_verzug(df, verzug, ab=None):
+    """
+    Verschiebt offene Einnahmen auf den erwarteten Zahlungstag des Kunden.
+
+    Das ursprüngliche Fälligkeitsdatum bleibt in Original_date erhalten. Kunden ohne
+    Zahlungshistorie behalten ihr Fälligkeitsdatum.
+
+    Args:
+        df (pd.DataFrame): Buchungen mit Date, Details und Direction
+        verzug (dict): Kundennummer -> erwarteter Verzug in Tagen
+        ab (date, optional): Nur Einnahmen ab diesem Tag verschieben (Standard: heute)
+
+    Returns:
+        pd.DataFrame: Buchungen mit angepasstem Date und Original_date
+    """
+    df = df.copy()
+    dates = pd.to_datetime(df["Date"], errors="coerce")
+    if "Original_date" not in df.columns:
+        df["Original_date"] = pd.NaT
+    if not verzug or df.empty:
+        return df
+
+    ab = pd.Timestamp(ab) if ab is not None else pd.Timestamp.today().normalize()
+    offen = (df["Direction"].astype(str).str.lower() == "incoming").to_numpy() & (dates >= ab).to_numpy()
+    tage = kundennummer_aus_details(df["Details"]).map(verzug).to_numpy(dtype=float)
+    betroffen = offen & ~np.isnan(tage) & (tage != 0)
+    if not betroffen.any():
+        return df
+
+    neu = dates[betroffen] + pd.to_timedelta(np.round(tage[betroffen]), unit="D")
+    # Erwartete Zahlung frühestens am ursprünglichen Stichtag (ab), nie in der Vergangenheit
+    df.loc[betroffen, "Original_date"] = dates[betroffen]
+    df.loc[betroffen, "Date"] = neu.where(neu >= ab, ab)
+    return df
@@ -0,0 +1,139 @@
+import numpy as np
+
+def lttb_indices(y, n_out, x=None):
+    """
+    Wählt mit Largest-Triangle-Three-Buckets die n_out repräsentativsten Punkte einer Reihe aus.
+
+    Args:
+        y (np.ndarray): Werte der Reihe
+        n_out (int): Anzahl der auszuwählenden Punkte (mindestens 3)
+        x (np.ndarray, optional): Aufsteigende x-Werte, standardmässig die Positionen 0..n-1
+
+    Returns:
+        np.ndarray: Sortierte Indizes der ausgewählten Punkte (erster und letzter Punkt immer enthalten)
+    """
+    y = np.asarray(y, dtype=float)
+    n = len(y)
+    if n_out >= n or n <= 2:
+        return np.arange(n)
+    n_out = max(n_out, 3)
+    x = np.arange(n, dtype=float) if x is None else np.asarray(x, dtype=float)
+
+    # Innere Punkte 1..n-2 in n_out-2 Buckets aufteilen
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    selected = np.empty(n_out, dtype=np.int64)
+    selected[0] = 0
+    selected[-1] = n - 1
+
+    a = 0
+    for i in range(n_out - 2):
+        lo, hi = edges[i], edges[i + 1]
+
+        # Durchschnittspunkt des nächsten Buckets (beim letzten Bucket: der Endpunkt)
+        if i + 2 < len(edges):
+            next_lo, next_hi = edges[i + 1], edges[i + 2]
+            x_c, y_c = x[next_lo:next_hi].mean(), y[next_lo:next_hi].mean()
+        else:
+            x_c, y_c = x[-1], y[-1]
+
+        # Punkt mit der grössten Dreiecksfläche zum vorherigen Punkt und zum Durchschnitt
+        areas = np.abs((x[a] - x_c) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (y_c - y[a]))
+        a = lo + int(np.argmax(areas))
+        selected[i + 1] = a
+
+    return selected
+
+def _tiefpunkte(y, floor, n_blocks):
+    """Minimum jedes Abschnitts unter floor, danach die Minima gleichmässiger Blöcke."""
+    n = len(y)
+
+    # Minimum je zusammenhängendem Abschnitt unterhalb der Schwelle
+    below = y < floor
+    run_ids = np.cumsum(np.r_[below[0], below[1:] & ~below[:-1]]) if n else np.arange(0)
+    below_idx = np.flatnonzero(below)
+    order = np.lexsort((y[below_idx], run_ids[below_idx]))
+    sorted_idx = below_idx[order]
+    first_of_run = np.r_[True, run_ids[sorted_idx][1:] != run_ids[sorted_idx][:-1]] if len(sorted_idx) else np.array([], dtype=bool)
+    run_minima = sorted_idx[first_of_run]
+    # Tiefste Abschnitte zuerst
+    run_minima = run_minima[np.argsort(y[run_minima], kind="stable")]
+
+    # Minima gleich grosser Blöcke, damit auch Tiefpunkte über der Schwelle erhalten bleiben
+    block_edges = np.linspace(0, n, n_blocks + 1).astype(np.int64)
+    block_minima = np.array(
+        [lo + int(np.argmin(y[lo:hi])) for lo, hi in zip(block_edges[:-1], block_edges[1:]) if hi > lo],
+        dtype=np.int64
+    )
+    block_minima = block_minima[np.argsort(y[block_minima], kind="stable")]
+
+    # Reihenfolge beibehalten und Duplikate entfernen
+    candidates = np.r_[run_minima, block_minima]
+    _, first = np.unique(candidates, return_index=True)
+    return candidates[np.sort(first)]
+
+def downsample(y, budget, x=None, floor=0.0, minima_share=0.25):
+    """
+    Reduziert eine Reihe auf höchstens budget Punkte und erhält dabei die Tiefpunkte.
+
+    Ein Teil des Budgets ist für Minima reserviert: zuerst das Minimum jedes Abschnitts
+    unterhalb von floor (damit Unterschreitungen sichtbar bleiben), danach die Minima
+    gleichmässiger Blöcke. Der Rest wird per LTTB ausgewählt.
+
+    Args:
+        y (np.ndarray): Werte der Reihe
+        budget (int): Maximale Anzahl Punkte
+        x (np.ndarray, optional): Aufsteigende x-Werte für LTTB
+        floor (float): Schwelle, deren Unterschreitungen immer erhalten bleiben
+        minima_share (float): Anteil des Budgets für Minima
+
+    Returns:
+        np.ndarray: Sortierte Indizes der beibehaltenen Punkte
+    """
+    y = np.asarray(y, dtype=float)
+    n = len(y)
+    if n <= budget:
+        return np.arange(n)
+
+    n_reserve = max(1, int(budget * minima_share))
+    reserve = _tiefpunkte(y, floor, n_reserve)[:n_reserve]
+    selected = lttb_indices(y, budget - len(reserve), x=x)
+    return np.union1d(selected, reserve)
+
+def downsample_window(x, y, start_pct, end_pct, budget, context_share=0.2):
+    """
+    Dünnt eine Reihe für ein zoombares Diagramm aus: der sichtbare Bereich wird in voller
+    Auflösung geliefert (bzw. bis zum Budget), die Bereiche ausserhalb nur grob als Kontext.
+
+    Args:
+        x (np.ndarray): Aufsteigende x-Werte (z.B. Tagesindex)
+        y (np.ndarray): Werte der Reihe
+        start_pct (float): Beginn des sichtbaren Bereichs in Prozent der x-Spanne
+        end_pct (float): Ende des sichtbaren Bereichs in Prozent der x-Spanne
+        budget (int): Maximale Gesamtanzahl Punkte
+        context_share (float): Anteil des Budgets für die Bereiche ausserhalb des Zooms
+
+    Returns:
+        np.ndarray: Sortierte Indizes der beibehaltenen Punkte
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    n = len(y)
+    if n <= budget:
+        return np.arange(n)
+
+    # Sichtbaren Bereich in x-Werte umrechnen
+    span = x[-1] - x[0]
+    lo = x[0] + span * float(start_pct) / 100
+    hi = x[0] + span * float(end_pct) / 100
+    first, last = np.searchsorted(x, lo, side="left"), np.searchsorted(x, hi, side="right")
+
+    context_budget = max(3, int(budget * context_share) // 2)
+    parts = []
+    for part_lo, part_hi, part_budget in [
+        (0, first, context_budget),
+        (first, last, budget - 2 * context_budget),
+        (last, n, context_budget)
+    ]:
+        if part_hi > part_lo:
+            parts.append(part_lo + downsample(y[part_lo:part_hi], part_budget, x=x[part_lo:part_hi]))
+    return np.concatenate(parts) if parts else np.arange(0)
@@ -0,0 +1,56 @@
+import numpy as np
+
+def fenwick_build(values):
+    """
+    Baut einen Fenwick-Baum (Binary Indexed Tree) über eine Reihe in O(n) auf.
+
+    Args:
+        values (np.ndarray): Werte der Reihe (z.B. tägliche Zahlungsflüsse)
+
+    Returns:
+        np.ndarray: Baum mit n + 1 Einträgen (Index 0 wird nicht verwendet)
+    """
+    values = np.asarray(values, dtype=float)
+    n = len(values)
+    tree = np.zeros(n + 1)
+    tree[1:] = values
+    for i in range(1, n + 1):
+        parent = i + (i & -i)
+        if parent <= n:
+            tree[parent] += tree[i]
+    return tree
+
+def fenwick_add(tree, index, delta):
+    """
+    Addiert delta zum Wert an Position index in O(log n).
+
+    Args:
+        tree (np.ndarray): Baum aus fenwick_build (wird verändert)
+        index (int): Position in der ursprünglichen Reihe (0-basiert); negative Werte werden ignoriert
+        delta (float): Zu addierender Betrag
+    """
+    n = len(tree) - 1
+    i = int(index) + 1
+    if i < 1:
+        return
+    while i <= n:
+        tree[i] += delta
+        i += i & -i
+
+def fenwick_prefix(tree, index):
+    """
+    Liefert die Summe der Werte an den Positionen 0..index in O(log n).
+
+    Args:
+        tree (np.ndarray): Baum aus fenwick_build
+        index (int): Letzte Position (0-basiert, inklusive); negative Werte ergeben 0
+
+    Returns:
+        float: Präfixsumme
+    """
+    i = min(int(index), len(tree) - 2) + 1
+    total = 0.0
+    while i > 0:
+        total += tree[i]
+        i -= i & -i
+    return float(total)
@@ -0,0 +1,112 @@
+import hashlib
+import threading
+import time
+from core.storage import supabase
+
+# Tabellen, aus denen der Liquiditätsplan aufgebaut wird
+PLANUNGS_TABELLEN = ["buchungen", "fixkosten", "simulationen", "mitarbeiter", "loehne", "debitoren_verzug",
+                     "abgleich", "kategorie_regeln"]
+
+# Gültigkeitsdauer eines Tabellen-Fingerprints in Sekunden (Änderungen aus anderen Prozessen)
+FINGERPRINT_TTL = 30
+
+# Prozessweiter Cache: Tabelle -> (Zeitpunkt der Abfrage, Fingerprint)
+_fingerprints = {}
+_lock = threading.Lock()
+
+def _query_fingerprint(table):
+    """Fragt Anzahl Zeilen und neuesten updated_at-Wert einer Tabelle ab."""
+    count_response = supabase.table(table).select("id", count="exact").limit(1).execute()
+    latest_response = (
+        supabase.table(table)
+        .select("updated_at")
+        .not_.is_("updated_at", "null")
+        .order("updated_at", desc=True)
+        .limit(1)
+        .execute()
+    )
+    latest = latest_response.data[0]["updated_at"] if latest_response.data else None
+    return f"{table}:{count_response.count}:{latest}"
+
+def table_fingerprint(table, ttl=FINGERPRINT_TTL):
+    """
+    Liefert den Fingerprint einer Tabelle (Zeilenanzahl und neuester updated_at-Wert).
+
+    Schlägt die Abfrage fehl, wird für die Dauer der TTL eine eindeutige Ersatz-Version geliefert
+    und zwischengespeichert, damit nicht jeder Rerun die Tabellen erneut abfragt und neu aufbaut.
+
+    Args:
+        table (str): Name der Tabelle
+        ttl (int): Maximales Alter eines zwischengespeicherten Fingerprints in Sekunden
+
+    Returns:
+        str: Fingerprint bzw. Ersatz-Version nach einem Fehler
+    """
+    now = time.monotonic()
+    with _lock:
+        cached = _fingerprints.get(table)
+    if cached and now - cached[0] < ttl:
+        return cached[1]
+
+    try:
+        fingerprint = _query_fingerprint(table)
+    except Exception as e:
+        print(f"Fehler beim Ermitteln des Fingerprints für {table}: {e}")
+        fingerprint = f"{table}:unbekannt:{time.time_ns()}"
+
+    with _lock:
+        _fingerprints[table] = (now, fingerprint)
+    return fingerprint
+
+def table_fingerprints(tables=None, ttl=FINGERPRINT_TTL):
+    """
+    Liefert die Fingerprints der einzelnen Planungstabellen.
+
+    Args:
+        tables (list, optional): Tabellen, standardmässig PLANUNGS_TABELLEN
+        ttl (int): Maximales Alter der Tabellen-Fingerprints in Sekunden
+
+    Returns:
+        dict: Tabelle -> Fingerprint
+    """
+    return {table: table_fingerprint(table, ttl=ttl) for table in (tables or PLANUNGS_TABELLEN)}
+
+def combine_fingerprints(parts):
+    """
+    Fasst Tabellen-Fingerprints zu einem Hash zusammen.
+
+    Args:
+        parts (dict): Tabelle -> Fingerprint aus table_fingerprints
+
+    Returns:
+        str: Hex-Hash oder None, wenn ein Fingerprint fehlt
+    """
+    if any(part is None for part in parts.values()):
+        return None
+    return hashlib.sha1("|".join(parts.values()).encode("utf-8")).hexdigest()
+
+def planning_fingerprint(tables=None, ttl=FINGERPRINT_TTL):
+    """
+    Fasst die Fingerprints aller Planungstabellen zu einem Hash zusammen.
+
+    Args:
+        tables (list, optional): Tabellen, standardmässig PLANUNGS_TABELLEN
+        ttl (int): Maximales Alter der Tabellen-Fingerprints in Sekunden
+
+    Returns:
+        str: Hex-Hash oder None, wenn eine Tabelle nicht abgefragt werden konnte
+    """
+    return combine_fingerprints(table_fingerprints(tables, ttl=ttl))
+
+def invalidate_fingerprint(*tables):
+    """
+    Verwirft zwischengespeicherte Fingerprints nach einer Schreiboperation.
+
+    Args:
+        *tables (str): Geänderte Tabellen; ohne Angabe werden alle verworfen
+    """
+    with _lock:
+        if not tables:
+            _fingerprints.clear()
+        for table in tables:
+            _fingerprints.pop(table, None)
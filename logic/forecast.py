@@ -0,0 +1,161 @@
+import numpy as np
+import pandas as pd
+
+PROGNOSE_KATEGORIE = "Prognose"
+PROGNOSE_RICHTUNGEN = {"Incoming": "Prognose Einnahmen", "Outgoing": "Prognose Ausgaben"}
+
+def new_forecast_state(alpha=0.05, gamma=0.1, beta=0.05):
+    """
+    Legt einen leeren Modellzustand für die Prognose an.
+
+    Args:
+        alpha (float): Glättungsfaktor des Niveaus
+        gamma (float): Glättungsfaktor der Saisonkomponenten (Wochentag, Tag im Monat)
+        beta (float): Glättungsfaktor der Fehlervarianz
+
+    Returns:
+        dict: Modellzustand für update_forecast_state
+    """
+    return {
+        "alpha": alpha,
+        "gamma": gamma,
+        "beta": beta,
+        "last_date": None,
+        "checksum": None,
+        "modelle": {}
+    }
+
+def _new_model():
+    return {"level": 0.0, "wochentag": np.zeros(7), "monatstag": np.zeros(31), "var": 0.0, "n": 0}
+
+def _history_checksum(dates, amounts, directions, last_date):
+    """Anzahl und Summe der bereits gelernten Buchungen, um nachträgliche Änderungen zu erkennen."""
+    mask = (dates <= last_date).to_numpy()
+    outgoing = directions[mask] == "outgoing"
+    return (int(mask.sum()), round(float(amounts[mask][outgoing].sum()), 2),
+            round(float(amounts[mask][~outgoing].sum()), 2))
+
+def _fit(model, values, days, alpha, gamma, beta):
+    """Aktualisiert ein Modell Tag für Tag (additives Holt-Winters mit zwei Saisonkomponenten)."""
+    wochentag, monatstag = model["wochentag"], model["monatstag"]
+    level, var, n = model["level"], model["var"], model["n"]
+    for value, wt, mt in zip(values, days.dayofweek, days.day - 1):
+        if n == 0:
+            level = value
+        fehler = value - (level + wochentag[wt] + monatstag[mt])
+        level += alpha * fehler
+        wochentag[wt] += gamma * (1 - alpha) * fehler
+        monatstag[mt] += gamma * (1 - alpha) * fehler
+        var = (1 - beta) * var + beta * fehler * fehler
+        n += 1
+    model.update({"level": level, "var": var, "n": n})
+
+def update_forecast_state(state, buchungen, bis=None):
+    """
+    Lernt wiederkehrende Ein- und Auszahlungsmuster aus den historischen Buchungen.
+
+    Das Modell wird inkrementell fortgeschrieben: Es werden nur Tage nach dem zuletzt gelernten
+    Tag verarbeitet. Haben sich bereits gelernte Buchungen nachträglich geändert, wird das Modell
+    neu aufgebaut.
+
+    Args:
+        state (dict): Modellzustand aus new_forecast_state (wird verändert)
+        buchungen (pd.DataFrame): Buchungen mit Date, Amount und Direction
+        bis (date, optional): Letzter zu lernender Tag (Standard: gestern)
+
+    Returns:
+        dict: Aktualisierter Modellzustand
+    """
+    bis = pd.Timestamp(bis) if bis is not None else pd.Timestamp.today().normalize() - pd.Timedelta(days=1)
+    if buchungen is None or buchungen.empty:
+        return state
+
+    dates = pd.to_datetime(buchungen["Date"], errors="coerce").dt.normalize()
+    amounts = pd.to_numeric(buchungen["Amount"], errors="coerce").fillna(0).abs().to_numpy(dtype=float)
+    directions = buchungen["Direction"].astype(str).str.lower().to_numpy()
+    valid = dates.notna().to_numpy() & (dates <= bis).to_numpy()
+    if not valid.any():
+        return state
+
+    # Nachträgliche Änderungen an bereits gelernten Tagen erfordern einen Neuaufbau
+    if state["last_date"] is not None:
+        if _history_checksum(dates[valid], amounts[valid], directions[valid], state["last_date"]) != state["checksum"]:
+            state.update(new_forecast_state(state["alpha"], state["gamma"], state["beta"]))
+
+    erster = dates[valid].min() if state["last_date"] is None else state["last_date"] + pd.Timedelta(days=1)
+    if erster <= bis:
+        days = pd.date_range(start=erster, end=bis, freq="D")
+        neu = valid & (dates >= erster).to_numpy()
+        day_codes = (dates[neu] - erster).dt.days.to_numpy(dtype=np.int64)
+        for richtung in PROGNOSE_RICHTUNGEN:
+            mask = directions[neu] == richtung.lower()
+            values = np.bincount(day_codes[mask], weights=amounts[neu][mask], minlength=len(days))
+            _fit(state["modelle"].setdefault(richtung, _new_model()), values, days,
+                 state["alpha"], state["gamma"], state["beta"])
+        state["last_date"] = bis
+
+    state["checksum"] = _history_checksum(dates[valid], amounts[valid], directions[valid], state["last_date"])
+    return state
+
+def forecast_rows(state, start_date, end_date, z=1.28):
+    """
+    Erzeugt tägliche Prognosezeilen für Einnahmen und Ausgaben mit Konfidenzband.
+
+    Args:
+        state (dict): Modellzustand aus update_forecast_state
+        start_date (date): Erster Prognosetag
+        end_date (date): Letzter Prognosetag
+        z (float): Quantil der Normalverteilung für das Band (1.28 ≈ 80 %)
+
+    Returns:
+        pd.DataFrame: Date, Details, Amount, Direction, Kategorie, Untergrenze und Obergrenze
+    """
+    columns = ["Date", "Details", "Amount", "Direction", "Kategorie", "Untergrenze", "Obergrenze"]
+    days = pd.date_range(start=pd.Timestamp(start_date), end=pd.Timestamp(end_date), freq="D")
+    if not len(days) or not state["modelle"]:
+        return pd.DataFrame(columns=columns)
+
+    frames = []
+    for richtung, details in PROGNOSE_RICHTUNGEN.items():
+        model = state["modelle"].get(richtung)
+        if model is None or model["n"] == 0:
+            continue
+        prognose = model["level"] + model["wochentag"][days.dayofweek] + model["monatstag"][days.day - 1]
+        band = z * np.sqrt(model["var"])
+        frames.append(pd.DataFrame({
+            "Date": days,
+            "Details": details,
+            "Amount": np.clip(prognose, 0, None),
+            "Direction": richtung,
+            "Kategorie": PROGNOSE_KATEGORIE,
+            "Untergrenze": np.clip(prognose - band, 0, None),
+            "Obergrenze": np.clip(prognose + band, 0, None)
+        }))
+
+    if not frames:
+        return pd.DataFrame(columns=columns)
+    result = pd.concat(frames, ignore_index=True)
+    return result[result["Amount"] > 0.005].reset_index(drop=True)
+
+def forecast_band(ledger, start_date, end_date):
+    """
+    Kumulierte Unsicherheit des Kontostands aus den Prognosezeilen eines Ledgers.
+
+    Die Tagesfehler werden als unabhängig angenommen, die Bandbreiten addieren sich daher quadratisch.
+
+    Args:
+        ledger (pd.DataFrame): Ledger mit Prognosezeilen (Untergrenze, Obergrenze)
+        start_date (date): Erster Tag des Zeitraums
+        end_date (date): Letzter Tag des Zeitraums
+
+    Returns:
+        np.ndarray: Halbe Bandbreite des Kontostands am Tagesende je Tag
+    """
+    n_days = (pd.Timestamp(end_date) - pd.Timestamp(start_date)).days + 1
+    if "Kategorie" not in ledger.columns or "Obergrenze" not in ledger.columns:
+        return np.zeros(n_days)
+    prognose = ledger[ledger["Kategorie"] == PROGNOSE_KATEGORIE]
+    day_codes = (pd.to_datetime(prognose["Date"]).dt.normalize() - pd.Timestamp(start_date)).dt.days.to_numpy()
+    valid = (day_codes >= 0) & (day_codes < n_days)
+    halb = ((prognose["Obergrenze"] - prognose["Untergrenze"]).to_numpy(dtype=float) / 2)[valid]
+    return np.sqrt(np.cumsum(np.bincount(day_codes[valid], weights=halb ** 2, minlength=n_days)))
@@ -0,0 +1,121 @@
+import numpy as np
+import pandas as pd
+from logic.rmq import range_min
+
+def zahltag_codes(zahltage, start_date, n_days):
+    """
+    Wandelt Lohnzahltage in Tagesindizes relativ zum Startdatum um.
+
+    Args:
+        zahltage (list): Zahltage wie von lohn_zahltage
+        start_date (date): Erster Tag des Zeitraums
+        n_days (int): Anzahl Tage im Zeitraum
+
+    Returns:
+        np.ndarray: Sortierte Tagesindizes innerhalb des Zeitraums
+    """
+    codes = np.array([(pd.Timestamp(tag) - pd.Timestamp(start_date)).days for tag in zahltage], dtype=np.int64)
+    return np.sort(codes[(codes >= 0) & (codes < n_days)])
+
+def _segment_minima(table, codes, erster):
+    """Minimum des Basis-Kontostands zwischen aufeinanderfolgenden Zahltagen ab Zahltag Nr. erster."""
+    n_days = len(table["values"])
+    grenzen = np.r_[codes[erster + 1:], n_days]
+    return np.array([range_min(table, lo, hi - 1)[0] for lo, hi in zip(codes[erster:], grenzen)])
+
+def is_affordable(table, codes, erster, betrag, floor=0.0):
+    """
+    Prüft, ob ein zusätzlicher Monatslohn ab Zahltag Nr. erster den Kontostand über floor hält.
+
+    Der Lohn wird nicht in den Plan eingerechnet, sondern als Differenz zur gecachten Basisreihe
+    ausgewertet: Zwischen zwei Zahltagen ist die Differenz konstant (k Zahlungen), daher genügt
+    je Abschnitt ein Bereichsminimum der Basisreihe.
+
+    Args:
+        table (dict): Minimum-Index über den Basis-Kontostand (balance_index)
+        codes (np.ndarray): Tagesindizes der Zahltage (zahltag_codes)
+        erster (int): Index des ersten Zahltags mit dem neuen Lohn
+        betrag (float): Zusätzlicher Monatslohn
+        floor (float): Mindestkontostand
+
+    Returns:
+        bool: True, wenn der Kontostand ab dem ersten Zahltag nie unter floor fällt
+    """
+    if erster >= len(codes):
+        return True
+    minima = _segment_minima(table, codes, erster)
+    k = np.arange(1, len(minima) + 1)
+    return bool(np.all(minima - betrag * k >= floor))
+
+def max_affordable_salary(table, codes, erster, floor=0.0, upper=None, tolerance=1.0):
+    """
+    Sucht per Bisektion den höchsten zusätzlichen Monatslohn, der den Kontostand über floor hält.
+
+    Args:
+        table (dict): Minimum-Index über den Basis-Kontostand (balance_index)
+        codes (np.ndarray): Tagesindizes der Zahltage (zahltag_codes)
+        erster (int): Index des ersten Zahltags mit dem neuen Lohn
+        floor (float): Mindestkontostand
+        upper (float, optional): Obergrenze der Suche (Standard: höchster Kontostand über floor)
+        tolerance (float): Genauigkeit in CHF
+
+    Returns:
+        float: Höchster tragbarer Monatslohn oder None, wenn bereits die Basis unter floor fällt
+    """
+    if erster >= len(codes):
+        return None
+    if not is_affordable(table, codes, erster, 0.0, floor):
+        return None
+    lo = 0.0
+    hi = float(upper) if upper is not None else max(float(np.max(table["values"])) - floor, 0.0)
+    if is_affordable(table, codes, erster, hi, floor):
+        return hi
+    while hi - lo > tolerance:
+        mid = (lo + hi) / 2
+        if is_affordable(table, codes, erster, mid, floor):
+            lo = mid
+        else:
+            hi = mid
+    return lo
+
+def earliest_start(table, codes, betrag, floor=0.0):
+    """
+    Sucht per Bisektion den frühesten Zahltag, ab dem ein zusätzlicher Monatslohn tragbar ist.
+
+    Ein späterer Start bedeutet an jedem Tag höchstens gleich viele Lohnzahlungen, die Tragbarkeit
+    ist also monoton in der Startposition.
+
+    Args:
+        table (dict): Minimum-Index über den Basis-Kontostand (balance_index)
+        codes (np.ndarray): Tagesindizes der Zahltage (zahltag_codes)
+        betrag (float): Zusätzlicher Monatslohn
+        floor (float): Mindestkontostand
+
+    Returns:
+        int: Index des frühesten Zahltags oder None, wenn der Lohn im Zeitraum nie tragbar ist
+    """
+    lo, hi = 0, len(codes)
+    while lo < hi:
+        mid = (lo + hi) // 2
+        if is_affordable(table, codes, mid, betrag, floor):
+            hi = mid
+        else:
+            lo = mid + 1
+    return lo if lo < len(codes) else None
+
+def hire_balance(base_balance, codes, erster, betrag):
+    """
+    Kontostand am Tagesende mit einem zusätzlichen Monatslohn ab Zahltag Nr. erster.
+
+    Args:
+        base_balance (np.ndarray): Basis-Kontostand am Tagesende
+        codes (np.ndarray): Tagesindizes der Zahltage (zahltag_codes)
+        erster (int): Index des ersten Zahltags mit dem neuen Lohn
+        betrag (float): Zusätzlicher Monatslohn
+
+    Returns:
+        np.ndarray: Kontostand am Tagesende
+    """
+    flows = np.zeros(len(base_balance))
+    flows[codes[erster:]] = -float(betrag)
+    return np.asarray(base_balance, dtype=float) + np.cumsum(flows)
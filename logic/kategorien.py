@@ -0,0 +1,287 @@
+import re
+import threading
+import numpy as np
+import pandas as pd
+from logic.forecast import PROGNOSE_KATEGORIE
+
+STANDARD_KATEGORIE = "Standard"
+
+# Kategorien der Ledger-Zeilen, die nicht aus der Buchungstabelle stammen (für Regeln gesperrt)
+ABGELEITETE_KATEGORIEN = ["Fixkosten", "Simulation", "Lohn", PROGNOSE_KATEGORIE]
+
+# Flags aller Regex-Regeln (Texte werden zusätzlich klein geschrieben)
+REGEX_FLAGS = re.IGNORECASE | re.MULTILINE
+
+# Regex-Regeln mit Inline-Flags oder nummerierten Rückverweisen lassen sich nicht in die
+# gemeinsame Alternative einbetten (Flags nur am Anfang, Gruppennummern verschieben sich)
+_EIGENSTAENDIG = re.compile(r"\\[1-9]|\(\?[aiLmsux]+\)")
+
+# Prozessweiter Cache der kompilierten Regeln: Fingerprint der Regeltabelle -> Matcher
+_compiled = {}
+_lock = threading.Lock()
+
+def _regel_pattern(regel):
+    """Regulärer Ausdruck einer Regel (Stichwort wörtlich, sonst als Regex)."""
+    muster = str(regel.get("muster", "")).strip()
+    return muster if regel.get("regex") else re.escape(muster.lower())
+
+def _trie_pattern(woerter):
+    """Baut aus Stichwörtern einen Ausdruck in Trie-Form (gemeinsame Präfixe nur einmal geprüft)."""
+    trie = {}
+    for wort in woerter:
+        knoten = trie
+        for zeichen in wort:
+            knoten = knoten.setdefault(zeichen, {})
+        knoten[""] = True
+
+    def _knoten(knoten):
+        ende = "" in knoten
+        zweige = [re.escape(z) + _knoten(k) for z, k in sorted(knoten.items()) if z]
+        if not zweige:
+            return ""
+        teil = zweige[0] if len(zweige) == 1 else "(?:" + "|".join(zweige) + ")"
+        if ende:
+            # Längere Stichwörter zuerst versuchen, das kürzere bleibt als Alternative
+            return "(?:" + teil + ")?"
+        return teil
+
+    return _knoten(trie)
+
+def compile_rules(regeln):
+    """
+    Kompiliert alle aktiven Regeln zu einem Matcher für ganze Textspalten.
+
+    Stichwörter werden zu einem einzigen Trie-Ausdruck zusammengefasst, Regex-Regeln zu einer
+    Alternative je Regel. Regeln mit Inline-Flags oder Rückverweisen (und alle Regex-Regeln, falls
+    die Alternative nicht kompiliert) werden einzeln angewendet. Die Regeln werden nach Priorität
+    sortiert; bei mehreren Treffern in einem Text gewinnt die Regel mit der höchsten Priorität.
+    Ungültige Ausdrücke werden übersprungen.
+
+    Args:
+        regeln (list): Regeln mit muster, kategorie, prioritaet, regex und aktiv
+
+    Returns:
+        dict: stichwoerter (Trie-Ausdruck oder None), beste_regel (Stichwort -> Regelnummer),
+              ausdruecke (Regex-Alternativen oder None), gruppen (Gruppennummer -> Regelnummer),
+              kombiniert und einzeln (je Liste von Ausdruck und Regelnummer), kategorien (je Regelnummer)
+              und regeln
+    """
+    aktive = [
+        r for r in regeln
+        if r.get("aktiv", True) and str(r.get("muster", "")).strip() and r.get("kategorie")
+        and r["kategorie"] not in ABGELEITETE_KATEGORIEN
+    ]
+    aktive.sort(key=lambda r: -int(r.get("prioritaet") or 0))
+
+    regel_nr, teile, gruppen, einzeln = {}, [], {}, []
+    gruppe = 1
+    for nr, regel in enumerate(aktive):
+        if not regel.get("regex"):
+            regel_nr.setdefault(str(regel["muster"]).strip().lower(), nr)
+            continue
+        pattern = _regel_pattern(regel)
+        try:
+            ausdruck = re.compile(pattern, REGEX_FLAGS)
+        except re.error as e:
+            print(f"Ungültige Kategorisierungsregel '{regel.get('muster')}': {e}")
+            continue
+        if _EIGENSTAENDIG.search(pattern):
+            # Inline-Flags und Rückverweise funktionieren nur als eigener Ausdruck
+            einzeln.append((ausdruck, nr))
+            continue
+        # Die äussere Gruppe jeder Alternative schliesst zuletzt und bestimmt die Regel
+        gruppen[gruppe] = nr
+        gruppe += 1 + ausdruck.groups
+        teile.append((f"({pattern})", ausdruck, nr))
+
+    # Lookaheads, damit auch überlappende Treffer gefunden werden
+    ausdruecke = None
+    if teile:
+        try:
+            ausdruecke = re.compile("(?=(?:" + "|".join(t[0] for t in teile) + "))", REGEX_FLAGS)
+        except re.error as e:
+            # Z.B. gleiche Gruppennamen in mehreren Regeln: jede Regel einzeln durchsuchen
+            print(f"Kategorisierungsregeln werden einzeln angewendet: {e}")
+            einzeln.extend((ausdruck, nr) for _, ausdruck, nr in teile)
+            gruppen = {}
+
+    # Der Trie liefert je Position das längste Stichwort; kürzere Präfix-Stichwörter an derselben
+    # Position werden über beste_regel berücksichtigt
+    beste_regel = {
+        wort: min(regel_nr[wort[:i]] for i in range(1, len(wort) + 1) if wort[:i] in regel_nr)
+        for wort in regel_nr
+    }
+
+    return {
+        "stichwoerter": re.compile(f"(?=({_trie_pattern(regel_nr)}))") if regel_nr else None,
+        "beste_regel": beste_regel,
+        "ausdruecke": ausdruecke,
+        "gruppen": gruppen,
+        "kombiniert": [(ausdruck, nr) for _, ausdruck, nr in teile] if ausdruecke is not None else [],
+        "einzeln": einzeln,
+        "kategorien": [r["kategorie"] for r in aktive],
+        "regeln": aktive
+    }
+
+def _text_treffer(ausdruck, gesamt, anfaenge, enden, texte=None):
+    """
+    Liefert die Nummern der Texte, in denen ein Ausdruck innerhalb des Textes passt.
+
+    Ohne Angabe von texte wird der Gesamttext durchsucht (je Text höchstens ein Treffer); ein
+    Treffer, der in den nächsten Text reicht, wird auf den eigenen Text beschränkt erneut geprüft.
+    """
+    if texte is not None:
+        return [t for t in texte if ausdruck.search(gesamt, int(anfaenge[t]), int(enden[t])) is not None]
+    treffer = []
+    pos = 0
+    while True:
+        m = ausdruck.search(gesamt, pos)
+        if m is None:
+            return treffer
+        text_nr = int(np.searchsorted(anfaenge, m.start(), side="right")) - 1
+        if m.end() <= enden[text_nr] or \
+                ausdruck.search(gesamt, int(anfaenge[text_nr]), int(enden[text_nr])) is not None:
+            treffer.append(text_nr)
+        if text_nr + 1 >= len(anfaenge):
+            return treffer
+        pos = int(anfaenge[text_nr + 1])
+
+def categorize(details, compiled, default=STANDARD_KATEGORIE):
+    """
+    Ordnet einer ganzen Spalte von Buchungstexten Kategorien zu.
+
+    Die unterschiedlichen Texte werden zu einem Gesamttext verbunden und in einem Durchlauf je
+    Ausdruck durchsucht; die Treffer werden über ihre Position den Texten zugeordnet. Treffer,
+    die über das Ende eines Textes in den nächsten reichen, zählen nicht; solche Texte werden
+    einzeln nachgeprüft.
+
+    Args:
+        details (pd.Series): Buchungstexte
+        compiled (dict): Ergebnis von compile_rules
+        default (str): Kategorie für Texte ohne Treffer
+
+    Returns:
+        pd.Series: Kategorie je Zeile
+    """
+    if details.empty or (compiled["stichwoerter"] is None and compiled["ausdruecke"] is None
+                         and not compiled["einzeln"]):
+        return pd.Series(default, index=details.index, dtype=object)
+
+    # Zeilenumbrüche trennen die Texte im Gesamttext und dürfen darin nicht vorkommen
+    texte = details.fillna("").astype(str).str.replace("\n", " ", regex=False).str.lower()
+    codes, uniques = pd.factorize(texte)
+    laengen = np.fromiter((len(t) + 1 for t in uniques), dtype=np.int64, count=len(uniques))
+    anfaenge = np.concatenate(([0], np.cumsum(laengen)[:-1]))
+    # Position des Trennzeichens nach jedem Text (Treffer dürfen höchstens bis hierhin reichen)
+    enden = anfaenge + laengen - 1
+    gesamt = "\n".join(uniques)
+
+    positionen, endpositionen, nummern = [], [], []
+    if compiled["stichwoerter"] is not None:
+        beste_regel = compiled["beste_regel"]
+        for m in compiled["stichwoerter"].finditer(gesamt):
+            positionen.append(m.start())
+            endpositionen.append(m.end(1))
+            nummern.append(beste_regel[m.group(1)])
+    if compiled["ausdruecke"] is not None:
+        gruppen = compiled["gruppen"]
+        for m in compiled["ausdruecke"].finditer(gesamt):
+            positionen.append(m.start())
+            endpositionen.append(m.end(m.lastindex))
+            nummern.append(gruppen[m.lastindex])
+
+    text_nr = np.searchsorted(anfaenge, np.asarray(positionen, dtype=np.int64), side="right") - 1
+    nummern = np.asarray(nummern, dtype=np.int64)
+    innerhalb = np.asarray(endpositionen, dtype=np.int64) <= enden[text_nr]
+    treffer_texte, treffer_nummern = [text_nr[innerhalb]], [nummern[innerhalb]]
+
+    # Texte mit Treffern über das Textende hinaus: die Regex-Regeln auf den Text beschränkt prüfen
+    # (ein solcher Treffer kann einen kürzeren Treffer innerhalb des Textes verdecken)
+    grenzfaelle = np.unique(text_nr[~innerhalb]).tolist()
+    pruefungen = [(ausdruck, nr, grenzfaelle) for ausdruck, nr in compiled["kombiniert"]] if grenzfaelle else []
+    pruefungen += [(ausdruck, nr, None) for ausdruck, nr in compiled["einzeln"]]
+    for ausdruck, nr, texte_nr in pruefungen:
+        gefunden = _text_treffer(ausdruck, gesamt, anfaenge, enden, texte_nr)
+        treffer_texte.append(np.asarray(gefunden, dtype=np.int64))
+        treffer_nummern.append(np.full(len(gefunden), nr, dtype=np.int64))
+
+    # Beste (kleinste) Regelnummer je Text, len(kategorien) steht für "kein Treffer"
+    kategorien = compiled["kategorien"]
+    beste = np.full(len(uniques), len(kategorien), dtype=np.int64)
+    np.minimum.at(beste, np.concatenate(treffer_texte), np.concatenate(treffer_nummern))
+    zuordnung = np.array(kategorien + [default], dtype=object)[beste]
+    return pd.Series(zuordnung[codes], index=details.index, dtype=object)
+
+def recategorize(alt_details, alt_kategorie, neu_details, compiled):
+    """
+    Bestimmt die Kategorie einer Buchung nach einer Änderung.
+
+    Nur ein geänderter Text wird neu kategorisiert. Trifft keine Regel, bleibt eine Kategorie
+    erhalten, die nicht von den Regeln stammt (Klassifikator oder manuell gesetzt).
+
+    Args:
+        alt_details (str): Bisheriger Buchungstext
+        alt_kategorie (str): Bisherige Kategorie (None, wenn keine gespeichert ist)
+        neu_details (str): Neuer Buchungstext
+        compiled (dict): Ergebnis von compile_rules
+
+    Returns:
+        str: Zu speichernde Kategorie
+    """
+    if str(neu_details or "") == str(alt_details or ""):
+        return alt_kategorie
+    neu = categorize(pd.Series([neu_details]), compiled, default=None).iloc[0]
+    if neu is not None:
+        return neu
+    if alt_kategorie and alt_kategorie != categorize(pd.Series([alt_details]), compiled).iloc[0]:
+        return alt_kategorie
+    return STANDARD_KATEGORIE
+
+def get_compiled_rules(fingerprint, loader):
+    """
+    Liefert die kompilierten Regeln aus dem prozessweiten Cache oder kompiliert sie neu.
+
+    Args:
+        fingerprint (str): Fingerprint der Regeltabelle (None = nicht zwischenspeichern)
+        loader (callable): Funktion, die die Regeln lädt
+
+    Returns:
+        dict: Ergebnis von compile_rules
+    """
+    with _lock:
+        if fingerprint is not None and fingerprint in _compiled:
+            return _compiled[fingerprint]
+    compiled = compile_rules(loader())
+    if fingerprint is not None:
+        with _lock:
+            _compiled.clear()
+            _compiled[fingerprint] = compiled
+    return compiled
+
+def affected_rows(details, kategorien, alt=None, neu=None):
+    """
+    Ermittelt die Zeilen, deren Kategorie sich durch eine Regeländerung ändern kann.
+
+    Betroffen sind Texte, auf die die alte oder neue Regel passt, sowie Zeilen, die bisher
+    die Kategorie der alten Regel tragen.
+
+    Args:
+        details (pd.Series): Buchungstexte
+        kategorien (pd.Series): Bisherige Kategorien
+        alt (dict, optional): Regel vor der Änderung (None bei neuer Regel)
+        neu (dict, optional): Regel nach der Änderung (None bei gelöschter Regel)
+
+    Returns:
+        pd.Series: Boolesche Maske der neu zu kategorisierenden Zeilen
+    """
+    maske = pd.Series(False, index=details.index)
+    texte = details.fillna("").astype(str)
+    for regel in [alt, neu]:
+        if regel and str(regel.get("muster", "")).strip():
+            try:
+                maske |= texte.str.contains(_regel_pattern(regel), case=False, regex=True)
+            except re.error:
+                continue
+    if alt and alt.get("kategorie"):
+        maske |= kategorien.fillna(STANDARD_KATEGORIE) == alt["kategorie"]
+    return maske
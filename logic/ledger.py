@@ -0,0 +1,482 @@
+import hashlib
+from datetime import date
+import numpy as np
+import pandas as pd
+from logic.storage_buchungen import load_buchungen
+from logic.storage_fixkosten import convert_fixkosten_to_buchungen
+from logic.storage_simulation import convert_simulationen_to_buchungen
+from logic.storage_mitarbeiter import convert_loehne_to_buchungen
+from logic.fingerprint import table_fingerprints, combine_fingerprints
+from logic.fenwick import fenwick_build, fenwick_add, fenwick_prefix
+from logic.aggregation import patch_cube
+from logic.forecast import update_forecast_state, forecast_rows
+from logic.storage_debitoren import load_verzug_lookup
+from logic.debitoren import apply_verzug
+from logic.storage_abgleich import load_erledigte_keys
+from logic.matching import plan_keys, match_transactions
+from logic.kategorien import ABGELEITETE_KATEGORIEN, STANDARD_KATEGORIE, categorize, recategorize
+from logic.storage_kategorien import get_kategorie_regeln
+
+# Kategorie der Ledger-Zeilen je Quelle, die patch_ledger punktuell aktualisieren kann
+PATCH_KATEGORIEN = {
+    "buchungen": STANDARD_KATEGORIE,
+    "simulationen": "Simulation"
+}
+
+def _filter_range(df, start_date, end_date):
+    """Filtert ein DataFrame mit Date-Spalte auf den Zeitraum [start_date, end_date]."""
+    df["Date"] = pd.to_datetime(df["Date"], errors="coerce")
+    return df[(df["Date"].dt.date >= start_date) & (df["Date"].dt.date <= end_date)]
+
+def wiederkehrende_zahlungen(history, user_id=None):
+    """
+    Erkennt historische Buchungen, die Fixkosten oder Löhne bezahlen.
+
+    Dazu werden die Fixkosten- und Lohnzahlungen für den Zeitraum der Historie erzeugt und den
+    Ausgaben per match_transactions (Betrag, Datum, Text) zugeordnet. Gespeicherte Kategorien
+    Fixkosten oder Lohn gelten ebenfalls als wiederkehrend.
+
+    Args:
+        history (pd.DataFrame): Buchungen mit Date, Details, Amount, Direction und optional Kategorie
+        user_id (str, optional): Benutzer-ID (wird nur für Audit-Trails verwendet, nicht zum Filtern)
+
+    Returns:
+        pd.Series: True für Buchungen, die aus dem Prognosemodell ausgeschlossen werden
+    """
+    maske = pd.Series(False, index=history.index)
+    if history.empty:
+        return maske
+    if "Kategorie" in history.columns:
+        maske |= history["Kategorie"].isin(["Fixkosten", "Lohn"])
+
+    datum = pd.to_datetime(history["Date"], errors="coerce").dt.normalize()
+    ausgaben = (history["Direction"].astype(str).str.lower() == "outgoing") & datum.notna() & ~maske
+    if not ausgaben.any():
+        return maske
+    von, bis = datum[ausgaben].min(), datum[ausgaben].max()
+
+    plan = []
+    for convert in [convert_fixkosten_to_buchungen, convert_loehne_to_buchungen]:
+        erzeugt = convert(von, bis, user_id=user_id)
+        if erzeugt is not None and not erzeugt.empty:
+            erzeugt.columns = erzeugt.columns.str.capitalize()
+            plan.append(erzeugt[["Date", "Details", "Amount"]])
+    if not plan:
+        return maske
+    plan = pd.concat(plan, ignore_index=True)
+    plan["Amount"] = -pd.to_numeric(plan["Amount"], errors="coerce").abs()
+
+    bank = pd.DataFrame({
+        "Date": datum[ausgaben],
+        "Details": history.loc[ausgaben, "Details"].fillna("").astype(str),
+        "Amount": -pd.to_numeric(history.loc[ausgaben, "Amount"], errors="coerce").abs()
+    }).dropna(subset=["Amount"])
+    treffer = match_transactions(bank, plan)
+    maske[maske.index.isin(treffer["bank_index"])] = True
+    return maske
+
+def build_ledger(start_date, end_date, show_fixkosten=True, show_simulationen=True, show_loehne=True,
+                 user_id=None, base_df=None, prognose_state=None, verzug=None, erledigt=None, regeln=None):
+    """
+    Führt Buchungen, Fixkosten, Simulationen und Löhne zu einem gemeinsamen Ledger zusammen.
+
+    Offene Einnahmen werden auf den erwarteten Zahlungstag des Kunden gelegt (Debitorenverzug),
+    das Fälligkeitsdatum bleibt in Original_date erhalten. Mit dem Kontoauszug abgeglichene
+    (bezahlte) Einträge werden nicht mehr geplant. Buchungen ohne gespeicherte Kategorie werden
+    über die Kategorisierungsregeln zugeordnet.
+
+    Args:
+        start_date (date): Beginn des Zeitraums
+        end_date (date): Ende des Zeitraums
+        show_fixkosten (bool): Fixkosten einbeziehen
+        show_simulationen (bool): Simulationen einbeziehen
+        show_loehne (bool): Lohnauszahlungen einbeziehen
+        user_id (str, optional): Benutzer-ID (wird nur für Audit-Trails verwendet, nicht zum Filtern)
+        base_df (pd.DataFrame, optional): Bereits geladene Buchungen (z.B. aus dem Editor)
+        prognose_state (dict, optional): Modellzustand der Prognose; wenn angegeben, wird das Modell
+                                         mit den historischen Buchungen ohne Fixkosten- und Lohnzahlungen
+                                         fortgeschrieben (diese werden separat geplant) und der Zeitraum
+                                         nach der letzten bekannten Buchung mit Prognosezeilen ergänzt
+        verzug (dict, optional): Kundennummer -> erwarteter Verzug in Tagen (Standard: aus der Datenbank)
+        erledigt (set, optional): Schlüssel abgeglichener Planeinträge (Standard: aus der Datenbank)
+        regeln (dict, optional): Kompilierte Kategorisierungsregeln (Standard: aus der Datenbank)
+
+    Returns:
+        tuple: (pd.DataFrame mit Date, Details, Amount (vorzeichenbehaftet), Direction, Kategorie,
+                dict mit Anzahl integrierter Einträge bzw. Fehlermeldung je Quelle)
+    """
+    if base_df is not None:
+        df = base_df.copy()
+    else:
+        df = load_buchungen()
+        if df is None or df.empty:
+            df = pd.DataFrame(columns=["date", "details", "amount", "direction"])
+
+    # Spaltennamen normalisieren (Großschreibung wie in der Analyse)
+    df = df.copy()
+    df.columns = df.columns.str.capitalize()
+
+    if not df.empty:
+        df["Amount"] = pd.to_numeric(df["Amount"], errors="coerce")
+        history = df.copy()
+        # Offene Rechnungen auf den erwarteten Zahlungstag des Kunden legen (Fälligkeit in Original_date)
+        df = apply_verzug(df, verzug if verzug is not None else load_verzug_lookup())
+        df = _filter_range(df, start_date, end_date)
+    else:
+        history = df
+
+    if "Kategorie" not in df.columns:
+        df["Kategorie"] = None
+    offen = df["Kategorie"].isna() | (df["Kategorie"].astype(str).str.strip() == "")
+    if offen.any():
+        df.loc[offen, "Kategorie"] = categorize(df.loc[offen, "Details"],
+                                                regeln if regeln is not None else get_kategorie_regeln())
+
+    frames = [df]
+    quellen = {}
+
+    if show_fixkosten:
+        try:
+            fixkosten_df = convert_fixkosten_to_buchungen(start_date, end_date, user_id=user_id)
+            if not fixkosten_df.empty:
+                fixkosten_df.columns = fixkosten_df.columns.str.capitalize()
+                if "Kategorie" not in fixkosten_df.columns:
+                    fixkosten_df["Kategorie"] = "Fixkosten"
+                # Fixkosten sind immer Ausgaben
+                fixkosten_df["Direction"] = "Outgoing"
+                frames.append(fixkosten_df)
+                quellen["Fixkosten"] = len(fixkosten_df)
+        except Exception as e:
+            quellen["Fixkosten"] = e
+
+    if show_simulationen:
+        try:
+            simulation_df = convert_simulationen_to_buchungen(user_id=user_id)
+            if not simulation_df.empty:
+                simulation_df.columns = simulation_df.columns.str.capitalize()
+                simulation_df = _filter_range(simulation_df, start_date, end_date)
+                if "Kategorie" not in simulation_df.columns:
+                    simulation_df["Kategorie"] = "Simulation"
+                frames.append(simulation_df)
+                quellen["Simulationen"] = len(simulation_df)
+        except Exception as e:
+            quellen["Simulationen"] = e
+
+    if show_loehne:
+        try:
+            lohn_df = convert_loehne_to_buchungen(start_date, end_date, user_id=user_id)
+            if not lohn_df.empty:
+                lohn_df.columns = lohn_df.columns.str.capitalize()
+                if "Kategorie" not in lohn_df.columns:
+                    lohn_df["Kategorie"] = "Lohn"
+                # Löhne sind immer Ausgaben
+                lohn_df["Direction"] = "Outgoing"
+                # Keine "modified"-Spalte bei Lohnbuchungen
+                lohn_df = lohn_df.drop(columns=["Modified"], errors="ignore")
+                frames.append(lohn_df)
+                quellen["Löhne"] = len(lohn_df)
+        except Exception as e:
+            quellen["Löhne"] = e
+
+    if prognose_state is not None:
+        try:
+            # Nur die übrigen Zahlungsflüsse lernen, Fixkosten und Löhne stehen bereits im Ledger
+            update_forecast_state(prognose_state, history[~wiederkehrende_zahlungen(history, user_id=user_id)])
+            # Prognose erst nach der letzten bekannten Buchung, damit nichts doppelt gezählt wird
+            letzte = pd.to_datetime(history["Date"], errors="coerce").max() if not history.empty else pd.NaT
+            prognose_ab = max(pd.Timestamp(date.today()), pd.Timestamp(start_date))
+            if pd.notna(letzte):
+                prognose_ab = max(prognose_ab, letzte.normalize() + pd.Timedelta(days=1))
+            prognose_df = forecast_rows(prognose_state, prognose_ab, end_date)
+            if not prognose_df.empty:
+                frames.append(prognose_df)
+            quellen["Prognose"] = len(prognose_df)
+        except Exception as e:
+            quellen["Prognose"] = e
+
+    frames = [f for f in frames if not f.empty]
+    if not frames:
+        return df.iloc[0:0], quellen
+
+    ledger = pd.concat(frames, ignore_index=True) if len(frames) > 1 else frames[0].copy()
+    ledger["Date"] = pd.to_datetime(ledger["Date"], errors="coerce")
+    ledger["Kategorie"] = ledger["Kategorie"].fillna(STANDARD_KATEGORIE)
+
+    # Bezahlte Einträge (Abgleich mit dem Kontoauszug) entfallen aus der Planung
+    erledigt = erledigt if erledigt is not None else load_erledigte_keys()
+    if erledigt:
+        ledger = ledger[~plan_keys(ledger).isin(erledigt)]
+
+    # Beträge entsprechend der Richtung vorzeichenbehaftet machen (Ausgaben negativ)
+    amounts = pd.to_numeric(ledger["Amount"], errors="coerce").abs()
+    outgoing = ledger["Direction"].astype(str).str.lower() == "outgoing"
+    ledger["Amount"] = np.where(outgoing, -amounts, amounts)
+
+    ledger = ledger.sort_values("Date", kind="stable").reset_index(drop=True)
+    return ledger, quellen
+
+def ledger_version(df):
+    """
+    Berechnet einen Inhalts-Hash über die für Aggregationen relevanten Ledger-Spalten.
+
+    Args:
+        df (pd.DataFrame): Ledger aus build_ledger
+
+    Returns:
+        str: Hex-Hash, der sich bei jeder inhaltlichen Änderung ändert
+    """
+    columns = [c for c in ["Date", "Amount", "Direction", "Kategorie"] if c in df.columns]
+    row_hashes = pd.util.hash_pandas_object(df[columns], index=False).to_numpy()
+    return hashlib.sha1(row_hashes.tobytes()).hexdigest()
+
+def _flows_tree(ledger, start_date, end_date):
+    """Fenwick-Baum über die täglichen Zahlungsflüsse des Ledgers."""
+    n_days = (pd.Timestamp(end_date) - pd.Timestamp(start_date)).days + 1
+    day_codes = (pd.to_datetime(ledger["Date"], errors="coerce").dt.normalize() - pd.Timestamp(start_date)).dt.days
+    day_codes = day_codes.fillna(-1).to_numpy(dtype=np.int64)
+    amounts = pd.to_numeric(ledger["Amount"], errors="coerce").fillna(0).to_numpy(dtype=float)
+    valid = (day_codes >= 0) & (day_codes < n_days)
+    return fenwick_build(np.bincount(day_codes[valid], weights=amounts[valid], minlength=n_days))
+
+def _frame_version(df):
+    """Inhalts-Hash eines DataFrames (None ohne DataFrame, "" wenn er nicht gehasht werden kann)."""
+    if df is None:
+        return None
+    try:
+        row_hashes = pd.util.hash_pandas_object(df, index=True).to_numpy()
+        return hashlib.sha1(row_hashes.tobytes() + repr(list(df.columns)).encode("utf-8")).hexdigest()
+    except TypeError:
+        return ""
+
+def get_ledger(start_date, end_date, cache, show_fixkosten=True, show_simulationen=True, show_loehne=True,
+               user_id=None, base_df=None, prognose_state=None, max_entries=8):
+    """
+    Liefert das Ledger aus dem Cache, solange sich weder die Planungstabellen noch die Parameter geändert haben.
+
+    Die Version des Ledgers setzt sich aus dem Fingerprint der Planungstabellen und den Parametern
+    zusammen und dient als Schlüssel für alle abgeleiteten Ergebnisse (Würfel, Diagramme, Exporte).
+    Übergebene Buchungen (base_df) gehen mit ihrem Inhalts-Hash in den Schlüssel ein.
+    Ist kein Fingerprint verfügbar, wird das Ledger neu aufgebaut und über seinen Inhalt versioniert.
+    Zu jedem gespeicherten Ledger wird ein Fenwick-Baum der täglichen Zahlungsflüsse gehalten,
+    der mit patch_ledger punktuell aktualisiert werden kann.
+
+    Args:
+        start_date (date): Beginn des Zeitraums
+        end_date (date): Ende des Zeitraums
+        cache (dict): Cache-Speicher, z.B. aus dem Session-State
+        show_fixkosten (bool): Fixkosten einbeziehen
+        show_simulationen (bool): Simulationen einbeziehen
+        show_loehne (bool): Lohnauszahlungen einbeziehen
+        user_id (str, optional): Benutzer-ID (wird nur für Audit-Trails verwendet, nicht zum Filtern)
+        base_df (pd.DataFrame, optional): Bereits geladene Buchungen (z.B. aus dem Editor)
+        prognose_state (dict, optional): Modellzustand der Prognose (siehe build_ledger)
+        max_entries (int): Maximale Anzahl gespeicherter Ledger
+
+    Returns:
+        tuple: (Ledger-DataFrame, dict mit Ergebnis je Quelle, Version als Hex-String)
+    """
+    tabellen = table_fingerprints()
+    fingerprint = combine_fingerprints(tabellen)
+    params = (str(start_date), str(end_date), show_fixkosten, show_simulationen, show_loehne, str(date.today()),
+              prognose_state is not None, _frame_version(base_df))
+    key = (fingerprint, params)
+    # Nicht hashbare Buchungen (z.B. Listen in Zellen) nicht zwischenspeichern
+    cachebar = fingerprint is not None and params[-1] != ""
+
+    if cachebar and key in cache:
+        entry = cache[key]
+        return entry["ledger"], entry["quellen"], entry["version"]
+
+    verzug = load_verzug_lookup()
+    regeln = get_kategorie_regeln()
+    erledigt = load_erledigte_keys()
+    ledger, quellen = build_ledger(
+        start_date, end_date,
+        show_fixkosten=show_fixkosten,
+        show_simulationen=show_simulationen,
+        show_loehne=show_loehne,
+        user_id=user_id,
+        base_df=base_df,
+        prognose_state=prognose_state,
+        verzug=verzug,
+        erledigt=erledigt,
+        regeln=regeln
+    )
+
+    # Ohne Fingerprint oder bei fehlerhaften Quellen nicht zwischenspeichern
+    if not cachebar or any(isinstance(e, Exception) for e in quellen.values()):
+        return ledger, quellen, ledger_version(ledger)
+
+    # Älteste Einträge verwerfen, damit der Session-State klein bleibt
+    while len(cache) >= max_entries:
+        cache.pop(next(iter(cache)))
+
+    cache[key] = {
+        "ledger": ledger,
+        "quellen": quellen,
+        "version": hashlib.sha1(repr(key).encode("utf-8")).hexdigest(),
+        "flows": _flows_tree(ledger, start_date, end_date),
+        "verzug": verzug,
+        "regeln": regeln,
+        "erledigt": erledigt,
+        "tabellen": tabellen
+    }
+    return ledger, quellen, cache[key]["version"]
+
+def _patch_entry(entry, params, kategorie, alt, neu):
+    """Wendet eine einzelne Änderung auf ein gespeichertes Ledger und seinen Fenwick-Baum an;
+    liefert den neuen Eintrag sowie die entfernten und hinzugefügten Ledger-Zeilen."""
+    start_date, end_date = pd.Timestamp(params[0]), pd.Timestamp(params[1])
+    ledger, flows = entry["ledger"], entry["flows"].copy()
+    entfernt = ledger.iloc[0:0]
+    hinzu = ledger.iloc[0:0]
+
+    def signed(row):
+        betrag = abs(float(row["amount"]))
+        return -betrag if str(row.get("direction", "")).lower() == "outgoing" else betrag
+
+    if alt is not None and "Id" in ledger.columns:
+        if kategorie == STANDARD_KATEGORIE:
+            # Buchungen sind alle Zeilen, die nicht aus Fixkosten, Simulationen, Löhnen oder der Prognose stammen
+            aus_quelle = ~ledger["Kategorie"].isin(ABGELEITETE_KATEGORIEN)
+        else:
+            aus_quelle = ledger["Kategorie"] == kategorie
+        treffer = (ledger["Id"].astype(str) == str(alt["id"])) & aus_quelle
+        entfernt = ledger[treffer]
+        tage = (entfernt["Date"].dt.normalize() - start_date).dt.days.dropna().astype(int).to_numpy()
+        betraege = entfernt.loc[entfernt["Date"].notna(), "Amount"].astype(float).to_numpy()
+        for tag, betrag in zip(tage, betraege):
+            fenwick_add(flows, tag, -betrag)
+        ledger = ledger[~treffer]
+
+    if neu is not None:
+        zeile = pd.DataFrame([{
+            "Id": neu.get("id"),
+            "Date": pd.Timestamp(neu["date"]).normalize(),
+            "Details": neu.get("details", ""),
+            "Amount": signed(neu),
+            "Direction": neu.get("direction", "Incoming"),
+            "Kategorie": neu.get("kategorie") or kategorie
+        }])
+        if kategorie == STANDARD_KATEGORIE:
+            if not neu.get("kategorie") and entry.get("regeln") is not None:
+                if entfernt.empty:
+                    zeile["Kategorie"] = categorize(zeile["Details"], entry["regeln"])
+                else:
+                    # Wie update_buchung_by_id: nur bei geändertem Text neu kategorisieren
+                    bisher = entfernt.iloc[0]
+                    zeile["Kategorie"] = recategorize(bisher["Details"], bisher["Kategorie"],
+                                                      zeile["Details"].iloc[0], entry["regeln"])
+            zeile = apply_verzug(zeile, entry.get("verzug"))
+        # Abgeglichene Einträge entfallen wie in build_ledger
+        erledigt = entry.get("erledigt")
+        ist_erledigt = bool(erledigt) and plan_keys(zeile).isin(erledigt).iloc[0]
+        datum = zeile["Date"].iloc[0]
+        if not ist_erledigt and start_date <= datum <= end_date:
+            # An der passenden Stelle einfügen, damit das Ledger nach Datum sortiert bleibt
+            pos = int(ledger["Date"].searchsorted(datum, side="right"))
+            ledger = pd.concat([ledger.iloc[:pos], zeile, ledger.iloc[pos:]], ignore_index=True)
+            fenwick_add(flows, (datum - start_date).days, signed(neu))
+            hinzu = zeile
+
+    return {**entry, "ledger": ledger.reset_index(drop=True), "flows": flows}, entfernt, hinzu
+
+def patch_ledger(cache, quelle, alt=None, neu=None, cube_cache=None):
+    """
+    Übernimmt eine einzelne Änderung (Einfügen, Ändern, Löschen) in alle gespeicherten Ledger,
+    ohne die Planungstabellen neu zu laden.
+
+    Die täglichen Zahlungsflüsse werden per Punkt-Update im Fenwick-Baum angepasst (O(log n))
+    und die Einträge unter dem neuen Fingerprint abgelegt, sodass der nächste Aufruf von
+    get_ledger das aktualisierte Ledger direkt aus dem Cache liefert. Das gilt nur, wenn sich
+    seit dem Aufbau ausschliesslich die Tabelle der Quelle geändert hat; hat sich zwischenzeitlich
+    eine andere Planungstabelle geändert (andere Session, Import), wird der Eintrag verworfen.
+    Zugehörige Aggregationswürfel werden auf dieselbe Weise fortgeschrieben.
+
+    Args:
+        cache (dict): Cache-Speicher von get_ledger
+        quelle (str): "buchungen" oder "simulationen"
+        alt (dict, optional): Bisheriger Eintrag mit id (bei Änderung oder Löschung)
+        neu (dict, optional): Neuer Eintrag mit id, date, details, amount und direction (bei Einfügen oder Änderung)
+        cube_cache (dict, optional): Cache-Speicher von logic.aggregation.get_cube
+    """
+    kategorie = PATCH_KATEGORIEN[quelle]
+    tabellen = table_fingerprints()
+    fingerprint = combine_fingerprints(tabellen)
+    if fingerprint is None:
+        cache.clear()
+        if cube_cache is not None:
+            cube_cache.clear()
+        return
+
+    for (alter_fingerprint, params), entry in list(cache.items()):
+        if alter_fingerprint == fingerprint:
+            continue
+        del cache[(alter_fingerprint, params)]
+        wuerfel = {}
+        if cube_cache is not None:
+            for cube_key in [k for k in cube_cache if k[0] == entry["version"]]:
+                wuerfel[cube_key] = cube_cache.pop(cube_key)
+
+        # Nur punktuell anpassen, wenn sich ausser der Quelle keine Tabelle geändert hat
+        geaendert = {t for t, fp in tabellen.items() if entry.get("tabellen", {}).get(t) != fp}
+        if not geaendert <= {quelle}:
+            continue
+
+        # Simulationen wirken sich nur aus, wenn sie im Ledger enthalten sind
+        betroffen = quelle != "simulationen" or params[3]
+        entfernt = hinzu = None
+        if betroffen:
+            entry, entfernt, hinzu = _patch_entry(entry, params, kategorie, alt, neu)
+
+        key = (fingerprint, params)
+        version = hashlib.sha1(repr(key).encode("utf-8")).hexdigest()
+        cache[key] = {**entry, "version": version, "tabellen": tabellen, "gepatcht": True}
+
+        for (_, start, ende, balance), cube in wuerfel.items():
+            if betroffen:
+                cube = patch_cube(cube, start, entfernt, hinzu)
+            if cube is not None:
+                cube_cache[(version, start, ende, balance)] = cube
+
+def rebase_ledger(cache, base_df):
+    """
+    Ordnet punktuell angepasste Ledger dem neu geladenen Buchungsstand zu.
+
+    Ledger, die mit übergebenen Buchungen (base_df) aufgebaut wurden, sind über deren Inhalts-Hash
+    versioniert. Nach dem Speichern lädt der Aufrufer die Buchungen neu; die mit patch_ledger
+    angepassten Ledger entsprechen diesem Stand und werden unter dem neuen Hash abgelegt,
+    statt beim nächsten Aufruf von get_ledger neu aufgebaut zu werden.
+
+    Args:
+        cache (dict): Cache-Speicher von get_ledger
+        base_df (pd.DataFrame): Neu geladene Buchungen
+    """
+    base_version = _frame_version(base_df)
+    if not base_version:
+        return
+    for (fingerprint, params), entry in list(cache.items()):
+        if entry.get("gepatcht") and params[-1]:
+            del cache[(fingerprint, params)]
+            # Version beibehalten, damit zugehörige Würfel gültig bleiben
+            cache[(fingerprint, params[:-1] + (base_version,))] = {**entry, "gepatcht": False}
+
+def forecast_balance(cache, version, start_date, start_balance, day):
+    """
+    Liefert den Kontostand am Ende eines Tages als Präfixsumme über den Fenwick-Baum.
+
+    Args:
+        cache (dict): Cache-Speicher von get_ledger
+        version (str): Version des Ledgers
+        start_date (date): Erster Tag des Ledgers
+        start_balance (float): Kontostand vor dem ersten Tag
+        day (date): Gewünschter Tag
+
+    Returns:
+        float: Kontostand oder None, wenn das Ledger nicht im Cache liegt
+    """
+    for entry in cache.values():
+        if entry["version"] == version:
+            offset = (pd.Timestamp(day) - pd.Timestamp(start_date)).days
+            return start_balance + fenwick_prefix(entry["flows"], offset)
+    return None
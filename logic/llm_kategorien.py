@@ -0,0 +1,182 @@
+import json
+import os
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from logic.kategorien import STANDARD_KATEGORIE
+
+try:
+    from openai import OpenAI
+except ImportError:
+    # Ohne openai-Paket bleibt die Klassifikation deaktiviert, die Regeln funktionieren weiterhin
+    OpenAI = None
+
+# Standardwerte, überschreibbar über Umgebungsvariablen (LLM_BASE_URL, LLM_MODEL, ...)
+LLM_DEFAULTS = {
+    "base_url": None,
+    "api_key": None,
+    "model": "gpt-4o-mini",
+    "batch_size": 250,
+    "max_concurrency": 4,
+    "requests_per_minute": 60,
+    "timeout": 60,
+    "max_retries": 3
+}
+
+SYSTEM_PROMPT = (
+    "Du ordnest Buchungstexte eines Schweizer KMU Kategorien zu. Verwende ausschliesslich die vorgegebenen "
+    "Kategorien oder \"" + STANDARD_KATEGORIE + "\", wenn keine passt. Antworte nur mit einem JSON-Objekt, "
+    "das jede Nummer auf ihre Kategorie abbildet, z.B. {\"1\": \"Miete\", \"2\": \"" + STANDARD_KATEGORIE + "\"}."
+)
+
+def llm_config():
+    """
+    Liest die Konfiguration der Klassifikation aus den Umgebungsvariablen.
+
+    Aktiv ist die Klassifikation, sobald ein API-Schlüssel (LLM_API_KEY oder OPENAI_API_KEY) oder eine
+    eigene Basis-URL (LLM_BASE_URL, z.B. ein lokaler Stub-Server) gesetzt ist.
+
+    Returns:
+        dict: Konfiguration mit enabled, base_url, api_key, model, batch_size, max_concurrency,
+              requests_per_minute, timeout und max_retries
+    """
+    config = dict(LLM_DEFAULTS)
+    config["base_url"] = os.getenv("LLM_BASE_URL") or None
+    config["api_key"] = os.getenv("LLM_API_KEY") or os.getenv("OPENAI_API_KEY") or None
+    config["model"] = os.getenv("LLM_MODEL") or config["model"]
+    for name, env in [("batch_size", "LLM_BATCH_SIZE"), ("max_concurrency", "LLM_MAX_CONCURRENCY"),
+                      ("requests_per_minute", "LLM_REQUESTS_PER_MINUTE"), ("timeout", "LLM_TIMEOUT"),
+                      ("max_retries", "LLM_MAX_RETRIES")]:
+        try:
+            config[name] = int(os.getenv(env, config[name]))
+        except ValueError:
+            print(f"Ungültiger Wert für {env}, verwende {config[name]}")
+    config["enabled"] = OpenAI is not None and bool(config["api_key"] or config["base_url"])
+    return config
+
+def normalize_for_classification(details):
+    """
+    Normalisiert Buchungstexte zum Schlüssel der Klassifikation.
+
+    Zahlen (Referenzen, Daten, Beträge) und Satzzeichen werden entfernt, da sie die Kategorie nicht
+    bestimmen; dadurch fallen viele Buchungen desselben Empfängers auf einen Schlüssel zusammen.
+
+    Args:
+        details (pd.Series): Buchungstexte
+
+    Returns:
+        pd.Series: Normalisierte Texte (leer, wenn nichts übrig bleibt)
+    """
+    text = details.fillna("").astype(str).str.lower()
+    text = text.str.replace(r"[^a-zäöüéèàç]+", " ", regex=True)
+    return text.str.split().str.join(" ")
+
+def create_client(config):
+    """
+    Erstellt einen Client für einen OpenAI-kompatiblen Endpunkt.
+
+    Args:
+        config (dict): Ergebnis von llm_config
+
+    Returns:
+        OpenAI: Client oder None, wenn die Klassifikation nicht verfügbar ist
+    """
+    if OpenAI is None or not config.get("enabled"):
+        return None
+    return OpenAI(
+        api_key=config["api_key"] or "nicht-benötigt",
+        base_url=config["base_url"],
+        timeout=config["timeout"],
+        max_retries=config["max_retries"]
+    )
+
+def _rate_limiter(requests_per_minute):
+    """Liefert eine Funktion, die bis zum nächsten freien Zeitfenster wartet (threadsicher)."""
+    abstand = 60.0 / requests_per_minute if requests_per_minute and requests_per_minute > 0 else 0.0
+    lock = threading.Lock()
+    naechster = [time.monotonic()]
+
+    def warten():
+        with lock:
+            jetzt = time.monotonic()
+            start = max(jetzt, naechster[0])
+            naechster[0] = start + abstand
+        if start > jetzt:
+            time.sleep(start - jetzt)
+
+    return warten
+
+def _parse_antwort(inhalt, texte, kategorien):
+    """Ordnet die JSON-Antwort den Texten zu; unbekannte Kategorien werden zu Standard."""
+    treffer = re.search(r"\{.*\}", inhalt or "", re.DOTALL)
+    if not treffer:
+        raise ValueError("Antwort enthält kein JSON-Objekt")
+    daten = json.loads(treffer.group(0))
+    erlaubt = set(kategorien)
+    ergebnis = {}
+    for nr, text in enumerate(texte, start=1):
+        kategorie = daten.get(str(nr))
+        if kategorie is None:
+            continue
+        ergebnis[text] = kategorie if kategorie in erlaubt else STANDARD_KATEGORIE
+    return ergebnis
+
+def _classify_batch(client, config, texte, kategorien, warten):
+    """Klassifiziert einen Stapel Texte mit einer einzigen Anfrage."""
+    warten()
+    nachricht = json.dumps({
+        "kategorien": kategorien,
+        "texte": [{"nr": nr, "text": text} for nr, text in enumerate(texte, start=1)]
+    }, ensure_ascii=False)
+    response = client.chat.completions.create(
+        model=config["model"],
+        temperature=0,
+        messages=[
+            {"role": "system", "content": SYSTEM_PROMPT},
+            {"role": "user", "content": nachricht}
+        ]
+    )
+    return _parse_antwort(response.choices[0].message.content, texte, kategorien)
+
+def classify_texts(texte, kategorien, config=None, client=None):
+    """
+    Klassifiziert eindeutige, normalisierte Texte in grossen Stapeln.
+
+    Die Stapel werden parallel (max_concurrency) und gedrosselt (requests_per_minute) gesendet.
+    Fehlgeschlagene Stapel werden ausgelassen, damit sie beim nächsten Mal erneut versucht werden.
+
+    Args:
+        texte (list): Normalisierte Texte (ohne Duplikate)
+        kategorien (list): Erlaubte Kategorien
+        config (dict, optional): Ergebnis von llm_config (Standard: aus der Umgebung)
+        client (OpenAI, optional): Vorhandener Client
+
+    Returns:
+        tuple: (dict Text -> Kategorie, Anzahl gesendeter Anfragen)
+    """
+    config = config or llm_config()
+    texte = [t for t in dict.fromkeys(texte) if t]
+    kategorien = [k for k in dict.fromkeys(kategorien) if k and k != STANDARD_KATEGORIE]
+    if not texte or not kategorien:
+        return {}, 0
+    client = client or create_client(config)
+    if client is None:
+        return {}, 0
+
+    groesse = max(1, int(config["batch_size"]))
+    stapel = [texte[i:i + groesse] for i in range(0, len(texte), groesse)]
+    warten = _rate_limiter(config["requests_per_minute"])
+
+    def ausfuehren(teil):
+        try:
+            return _classify_batch(client, config, teil, kategorien, warten)
+        except Exception as e:
+            print(f"Fehler bei der Klassifikation von {len(teil)} Buchungstexten: {e}")
+            return {}
+
+    ergebnis = {}
+    with ThreadPoolExecutor(max_workers=max(1, int(config["max_concurrency"]))) as executor:
+        for teil in executor.map(ausfuehren, stapel):
+            ergebnis.update(teil)
+    return ergebnis, len(stapel)
@@ -0,0 +1,261 @@
+import re
+import numpy as np
+import pandas as pd
+from logic.kategorien import ABGELEITETE_KATEGORIEN, STANDARD_KATEGORIE
+
+# Spaltennamen in Kontoauszügen verschiedener Banken
+DATUM_SPALTEN = ["Datum", "Buchungsdatum", "Valuta", "Valutadatum", "Date"]
+TEXT_SPALTEN = ["Buchungstext", "Text", "Beschreibung", "Details", "Mitteilung"]
+
+def normalize_kontoauszug(df):
+    """
+    Bringt einen Kontoauszug (CSV/Excel) in das Format Date, Details, Amount (vorzeichenbehaftet).
+
+    Unterstützt wird entweder eine Spalte Betrag (negativ = Belastung) oder getrennte Spalten
+    Gutschrift und Belastung.
+
+    Args:
+        df (pd.DataFrame): Rohdaten des Kontoauszugs
+
+    Returns:
+        pd.DataFrame: Date, Details, Amount und Direction
+    """
+    datum = next((c for c in DATUM_SPALTEN if c in df.columns), None)
+    text = next((c for c in TEXT_SPALTEN if c in df.columns), None)
+    if datum is None or text is None:
+        raise ValueError("Der Kontoauszug benötigt eine Datums- und eine Textspalte.")
+
+    if "Betrag" in df.columns:
+        amount = pd.to_numeric(df["Betrag"], errors="coerce")
+    elif "Gutschrift" in df.columns or "Belastung" in df.columns:
+        gutschrift = pd.to_numeric(df.get("Gutschrift", 0), errors="coerce")
+        belastung = pd.to_numeric(df.get("Belastung", 0), errors="coerce")
+        amount = pd.Series(gutschrift, index=df.index).fillna(0) - pd.Series(belastung, index=df.index).fillna(0).abs()
+    else:
+        raise ValueError("Der Kontoauszug benötigt eine Spalte Betrag oder Gutschrift/Belastung.")
+
+    result = pd.DataFrame({
+        "Date": pd.to_datetime(df[datum], dayfirst=True, errors="coerce").dt.normalize(),
+        "Details": df[text].fillna("").astype(str),
+        "Amount": amount
+    })
+    result = result.dropna(subset=["Date", "Amount"])
+    result = result[result["Amount"] != 0]
+    result["Direction"] = np.where(result["Amount"] < 0, "Outgoing", "Incoming")
+    return result.reset_index(drop=True)
+
+def plan_keys(ledger):
+    """
+    Bildet einen stabilen Schlüssel je Planzeile, über den abgeglichene Einträge wiedererkannt werden.
+
+    Buchungen werden über ihre ID erkannt, Fixkosten über Fixkosten-ID und Rhythmusdatum
+    (Original_date, vor der Verschiebung auf einen Werktag), Löhne über Details und Zahltag.
+    Übrige Zeilen (z.B. Simulationen) erhalten keinen Schlüssel.
+
+    Args:
+        ledger (pd.DataFrame): Ledger aus build_ledger
+
+    Returns:
+        pd.Series: Schlüssel je Zeile (None für nicht abgleichbare Zeilen)
+    """
+    keys = pd.Series(None, index=ledger.index, dtype=object)
+    if ledger.empty:
+        return keys
+    kategorie = ledger["Kategorie"] if "Kategorie" in ledger.columns else pd.Series(STANDARD_KATEGORIE, index=ledger.index)
+    datum = pd.to_datetime(ledger["Date"], errors="coerce").dt.strftime("%Y-%m-%d")
+
+    if "Id" in ledger.columns:
+        # Buchungen sind alle Zeilen, die nicht aus Fixkosten, Simulationen, Löhnen oder der Prognose stammen
+        buchung = ~kategorie.isin(ABGELEITETE_KATEGORIEN) & ledger["Id"].notna()
+        keys[buchung] = "buchung:" + ledger.loc[buchung, "Id"].astype(str)
+    if "Fixkosten_id" in ledger.columns:
+        fix = (kategorie == "Fixkosten") & ledger["Fixkosten_id"].notna()
+        rhythmus = pd.to_datetime(ledger["Original_date"], errors="coerce").dt.strftime("%Y-%m-%d") \
+            if "Original_date" in ledger.columns else datum
+        keys[fix] = "fixkosten:" + ledger.loc[fix, "Fixkosten_id"].astype(str) + ":" + rhythmus[fix].fillna(datum[fix])
+    lohn = kategorie == "Lohn"
+    keys[lohn] = "lohn:" + ledger.loc[lohn, "Details"].astype(str) + ":" + datum[lohn]
+    return keys
+
+def _tokens(text):
+    return set(re.findall(r"[a-z0-9äöüéèà]{3,}", str(text).lower()))
+
+def _text_similarity(a, b):
+    """Jaccard-Ähnlichkeit der Wörter (ab drei Zeichen) zweier Texte."""
+    ta, tb = _tokens(a), _tokens(b)
+    if not ta or not tb:
+        return 0.0
+    return len(ta & tb) / len(ta | tb)
+
+def match_transactions(bank, plan, amount_tolerance=1.0, relative_tolerance=0.005, date_window=10,
+                       min_score=0.45):
+    """
+    Ordnet Kontobewegungen den geplanten Einträgen zu (Betrag, Datum und Text).
+
+    Kandidaten entstehen nicht aus allen Paaren: Die Planzeilen sind nach Betrag sortiert, je
+    Kontobewegung liefert eine binäre Suche den Block mit passendem Betrag (Toleranz). Innerhalb
+    des Blocks sind gleiche Beträge nach Datum sortiert, sodass das Datumsfenster ebenfalls per
+    binärer Suche eingegrenzt wird. Die Kandidaten werden bewertet und absteigend nach Bewertung
+    eins zu eins zugeordnet.
+
+    Args:
+        bank (pd.DataFrame): Kontobewegungen aus normalize_kontoauszug
+        plan (pd.DataFrame): Planzeilen mit Date, Details, Amount (vorzeichenbehaftet) und Schlüssel
+        amount_tolerance (float): Absolute Betragstoleranz in CHF
+        relative_tolerance (float): Relative Betragstoleranz (zusätzlich zur absoluten)
+        date_window (int): Maximale Abweichung des Datums in Tagen
+        min_score (float): Mindestbewertung einer Zuordnung (0 bis 1)
+
+    Returns:
+        pd.DataFrame: bank_index, plan_index, Score, Tage und Differenz je Zuordnung
+    """
+    columns = ["bank_index", "plan_index", "Score", "Tage", "Differenz"]
+    if bank.empty or plan.empty:
+        return pd.DataFrame(columns=columns)
+
+    plan_dates = pd.to_datetime(plan["Date"], errors="coerce").dt.normalize()
+    plan_days = ((plan_dates - pd.Timestamp("1970-01-01")).dt.days).fillna(-10 ** 9).to_numpy(dtype=np.int64)
+    plan_amounts = pd.to_numeric(plan["Amount"], errors="coerce").fillna(0).to_numpy(dtype=float)
+    order = np.lexsort((plan_days, plan_amounts))
+    sorted_amounts, sorted_days = plan_amounts[order], plan_days[order]
+
+    bank_days = ((pd.to_datetime(bank["Date"]) - pd.Timestamp("1970-01-01")).dt.days).to_numpy(dtype=np.int64)
+    bank_amounts = bank["Amount"].to_numpy(dtype=float)
+    tol = amount_tolerance + relative_tolerance * np.abs(bank_amounts)
+
+    # Betragsblöcke per binärer Suche
+    lo = np.searchsorted(sorted_amounts, bank_amounts - tol, side="left")
+    hi = np.searchsorted(sorted_amounts, bank_amounts + tol, side="right")
+
+    kandidaten_bank, kandidaten_plan = [], []
+    for i in range(len(bank)):
+        if lo[i] >= hi[i]:
+            continue
+        if sorted_amounts[lo[i]] == sorted_amounts[hi[i] - 1]:
+            # Ein einziger Betrag: Datumsfenster innerhalb des (nach Datum sortierten) Blocks suchen
+            block = sorted_days[lo[i]:hi[i]]
+            a = lo[i] + np.searchsorted(block, bank_days[i] - date_window, side="left")
+            b = lo[i] + np.searchsorted(block, bank_days[i] + date_window, side="right")
+            idx = np.arange(a, b)
+        else:
+            idx = np.arange(lo[i], hi[i])
+            idx = idx[np.abs(sorted_days[idx] - bank_days[i]) <= date_window]
+        kandidaten_bank.append(np.full(len(idx), i))
+        kandidaten_plan.append(idx)
+
+    if not kandidaten_bank:
+        return pd.DataFrame(columns=columns)
+    bi = np.concatenate(kandidaten_bank)
+    pi = order[np.concatenate(kandidaten_plan)]
+    if not len(bi):
+        return pd.DataFrame(columns=columns)
+
+    tage = np.abs(plan_days[pi] - bank_days[bi])
+    differenz = np.abs(plan_amounts[pi] - bank_amounts[bi])
+    bank_text, plan_text = bank["Details"].to_numpy(), plan["Details"].to_numpy()
+    text = np.array([_text_similarity(bank_text[b], plan_text[p]) for b, p in zip(bi, pi)])
+    score = 0.5 * text + 0.3 * (1 - tage / (date_window + 1)) + 0.2 * (1 - differenz / (tol[bi] + 1e-9))
+
+    kandidaten = pd.DataFrame({
+        "bank_index": bi, "plan_index": pi, "Score": score.round(3), "Tage": tage, "Differenz": differenz.round(2)
+    })
+    kandidaten = kandidaten[kandidaten["Score"] >= min_score].sort_values("Score", ascending=False, kind="stable")
+
+    # Eins-zu-eins-Zuordnung, beste Bewertung zuerst
+    vergeben_bank, vergeben_plan, treffer = set(), set(), []
+    for row in kandidaten.itertuples(index=False):
+        if row.bank_index in vergeben_bank or row.plan_index in vergeben_plan:
+            continue
+        vergeben_bank.add(row.bank_index)
+        vergeben_plan.add(row.plan_index)
+        treffer.append(row)
+    result = pd.DataFrame(treffer, columns=columns)
+    result["bank_index"] = bank.index.to_numpy()[result["bank_index"].to_numpy(dtype=np.int64)]
+    result["plan_index"] = plan.index.to_numpy()[result["plan_index"].to_numpy(dtype=np.int64)]
+    return result.reset_index(drop=True)
+
+def normalize_details(details):
+    """
+    Normalisiert Buchungstexte für den unscharfen Vergleich.
+
+    Kleinschreibung, Satzzeichen und mehrfache Leerzeichen entfernen; lange Zahlen (Referenzen)
+    werden auf die ersten vier Ziffern gekürzt, damit abgeschnittene Referenznummern übereinstimmen.
+
+    Args:
+        details (pd.Series): Buchungstexte
+
+    Returns:
+        pd.Series: Normalisierte Texte
+    """
+    text = details.fillna("").astype(str).str.lower()
+    text = text.str.replace(r"[^0-9a-zäöüéèàç]+", " ", regex=True)
+    text = text.str.replace(r"\b(\d{4})\d+\b", r"\1", regex=True)
+    return text.str.split().str.join(" ")
+
+def _token_set_similarity(a, b):
+    """Anteil gemeinsamer Wörter, bezogen auf den kürzeren Text (abgeschnittene Texte bleiben ähnlich)."""
+    if not a or not b:
+        return 0.0
+    return len(a & b) / min(len(a), len(b))
+
+def _blocking_frame(df, amount_bucket):
+    """Normalisierte Texte, Wortmengen und Blockschlüssel (Betrag, Woche, erstes Wort) je Zeile."""
+    text = normalize_details(df["Details"])
+    dates = pd.to_datetime(df["Date"], errors="coerce")
+    return pd.DataFrame({
+        "pos": np.arange(len(df)),
+        "richtung": df["Direction"].astype(str).str.lower().to_numpy() if "Direction" in df.columns else "",
+        "betrag": (pd.to_numeric(df["Amount"], errors="coerce").abs() / amount_bucket).round().to_numpy(),
+        "woche": (dates.dt.normalize() - pd.Timestamp("1970-01-05")).dt.days.floordiv(7).fillna(-1).to_numpy(),
+        "erstes": text.str.split(" ", n=1).str[0].fillna("").to_numpy(),
+        "tokens": [frozenset(t.split()) for t in text]
+    })
+
+def find_near_duplicates(df, other=None, threshold=0.8, amount_bucket=1.0):
+    """
+    Findet Buchungen mit gleichem Betrag und ähnlichem Text (unscharfe Duplikate).
+
+    Verglichen wird nur innerhalb von Blöcken: gleiche Richtung und Betragsklasse sowie
+    entweder gleiche Kalenderwoche oder gleiches erstes Wort. Die Ähnlichkeit ist der Anteil
+    gemeinsamer Wörter der normalisierten Texte.
+
+    Args:
+        df (pd.DataFrame): Buchungen mit Date, Details, Amount und optional Direction
+        other (pd.DataFrame, optional): Vergleichsbestand; ohne Angabe wird df mit sich selbst verglichen
+        threshold (float): Mindestähnlichkeit (0 bis 1)
+        amount_bucket (float): Breite der Betragsklassen in CHF
+
+    Returns:
+        pd.DataFrame: index, other_index und Ähnlichkeit je Paar, absteigend nach Ähnlichkeit
+    """
+    columns = ["index", "other_index", "Ähnlichkeit"]
+    selbst = other is None
+    other = df if selbst else other
+    if df.empty or other.empty:
+        return pd.DataFrame(columns=columns)
+
+    links = _blocking_frame(df, amount_bucket)
+    rechts = links if selbst else _blocking_frame(other, amount_bucket)
+
+    paare = []
+    for block in [["richtung", "betrag", "woche"], ["richtung", "betrag", "erstes"]]:
+        merged = links[["pos"] + block].merge(rechts[["pos"] + block], on=block, suffixes=("", "_other"))
+        paare.append(merged[["pos", "pos_other"]])
+    paare = pd.concat(paare, ignore_index=True).drop_duplicates()
+    if selbst:
+        paare = paare[paare["pos"] < paare["pos_other"]]
+    if paare.empty:
+        return pd.DataFrame(columns=columns)
+
+    tokens_links, tokens_rechts = links["tokens"].to_numpy(), rechts["tokens"].to_numpy()
+    aehnlichkeit = np.array([
+        _token_set_similarity(tokens_links[i], tokens_rechts[j])
+        for i, j in zip(paare["pos"].to_numpy(), paare["pos_other"].to_numpy())
+    ])
+    treffer = paare[aehnlichkeit >= threshold]
+    result = pd.DataFrame({
+        "index": df.index.to_numpy()[treffer["pos"].to_numpy()],
+        "other_index": other.index.to_numpy()[treffer["pos_other"].to_numpy()],
+        "Ähnlichkeit": aehnlichkeit[aehnlichkeit >= threshold].round(3)
+    })
+    return result.sort_values("Ähnlichkeit", ascending=False, kind="stable").reset_index(drop=True)
@@ -0,0 +1,145 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+
+# Perzentile für das Fächerdiagramm
+PERCENTILES = [5, 25, 50, 75, 95]
+
+# Ab dieser Anzahl Pfade × Einnahmen wird die Simulation auf mehrere Prozesse verteilt
+PARALLEL_THRESHOLD = 5_000_000
+
+# Maximale Anzahl Pfade pro Block (begrenzt den Speicherbedarf der Verzugsmatrix)
+CHUNK_PATHS = 2_000
+
+def _ledger_arrays(df, start_date, end_date):
+    """Zerlegt das Ledger in Einnahmen (Tag, Betrag) und die festen Tagessummen aller übrigen Buchungen."""
+    n_days = (pd.Timestamp(end_date) - pd.Timestamp(start_date)).days + 1
+    day_codes = (pd.to_datetime(df["Date"], errors="coerce").dt.normalize() - pd.Timestamp(start_date)).dt.days
+    day_codes = day_codes.fillna(-1).to_numpy(dtype=np.int64)
+    amounts = pd.to_numeric(df["Amount"], errors="coerce").fillna(0).to_numpy(dtype=float)
+    in_range = (day_codes >= 0) & (day_codes < n_days)
+
+    incoming = in_range & (df["Direction"].astype(str).str.lower() == "incoming").to_numpy()
+    fixed = in_range & ~incoming
+    fixed_daily = np.bincount(day_codes[fixed], weights=amounts[fixed], minlength=n_days)
+    return day_codes[incoming], amounts[incoming], fixed_daily
+
+def _simulate_chunk(incoming_days, incoming_amounts, fixed_daily, start_balance, n_paths,
+                    delay_mean, delay_shape, amount_sd, seed):
+    """
+    Simuliert einen Block von Kontostandspfaden.
+
+    Returns:
+        np.ndarray: Kontostand am Tagesende (n_paths × Tage, float32)
+    """
+    rng = np.random.default_rng(seed)
+    n_days = len(fixed_daily)
+    n_items = len(incoming_days)
+
+    # Zahlungsverzug (Gamma-verteilt, ganze Tage) und Betragsabweichung je Pfad und Rechnung
+    delays = np.rint(rng.gamma(delay_shape, delay_mean / delay_shape, size=(n_paths, n_items))).astype(np.int64)
+    factors = np.clip(rng.normal(1.0, amount_sd, size=(n_paths, n_items)), 0.0, None)
+
+    # Zahlungen nach dem Zeitraum landen in einer Überlauf-Spalte und werden verworfen
+    paid_days = np.minimum(incoming_days[None, :] + delays, n_days)
+    flat = (np.arange(n_paths, dtype=np.int64)[:, None] * (n_days + 1) + paid_days).ravel()
+    incoming_daily = np.bincount(
+        flat, weights=(factors * incoming_amounts[None, :]).ravel(), minlength=n_paths * (n_days + 1)
+    ).reshape(n_paths, n_days + 1)[:, :n_days]
+
+    balances = start_balance + np.cumsum(incoming_daily + fixed_daily[None, :], axis=1)
+    return balances.astype(np.float32)
+
+def simulate_balances(df, start_date, end_date, start_balance=0.0, n_paths=2000, delay_mean=10.0,
+                      delay_shape=2.0, amount_sd=0.05, seed=None, max_workers=None):
+    """
+    Simuliert Kontostandspfade mit zufälligem Zahlungsverzug und Betragsabweichung der Einnahmen.
+
+    Ausgaben werden wie geplant übernommen. Grosse Läufe werden in Blöcke aufgeteilt und
+    auf einen Prozesspool verteilt; jeder Block erhält einen eigenen Zufallsstrom.
+
+    Args:
+        df (pd.DataFrame): Ledger mit Date, Amount (vorzeichenbehaftet) und Direction
+        start_date (date): Erster Tag des Zeitraums
+        end_date (date): Letzter Tag des Zeitraums
+        start_balance (float): Kontostand vor dem ersten Tag
+        n_paths (int): Anzahl simulierter Pfade
+        delay_mean (float): Mittlerer Zahlungsverzug in Tagen
+        delay_shape (float): Formparameter der Gamma-Verteilung (kleiner = mehr Streuung)
+        amount_sd (float): Standardabweichung der Einnahmen relativ zum Betrag
+        seed (int, optional): Startwert für reproduzierbare Ergebnisse
+        max_workers (int, optional): Anzahl Prozesse für grosse Läufe
+
+    Returns:
+        np.ndarray: Kontostand am Tagesende (n_paths × Tage)
+    """
+    incoming_days, incoming_amounts, fixed_daily = _ledger_arrays(df, start_date, end_date)
+
+    chunk_sizes = [min(CHUNK_PATHS, n_paths - i) for i in range(0, n_paths, CHUNK_PATHS)]
+    seeds = np.random.SeedSequence(seed).spawn(len(chunk_sizes))
+    args = [
+        (incoming_days, incoming_amounts, fixed_daily, start_balance, size, delay_mean, delay_shape, amount_sd, s)
+        for size, s in zip(chunk_sizes, seeds)
+    ]
+
+    workers = max_workers or os.cpu_count() or 1
+    if len(args) > 1 and workers > 1 and n_paths * max(len(incoming_days), 1) >= PARALLEL_THRESHOLD:
+        with ProcessPoolExecutor(max_workers=min(workers, len(args))) as pool:
+            chunks = list(pool.map(_simulate_chunk, *zip(*args)))
+    else:
+        chunks = [_simulate_chunk(*a) for a in args]
+
+    return np.vstack(chunks)
+
+def summarize_paths(balances, floor=0.0):
+    """
+    Verdichtet simulierte Pfade zu Kennzahlen für die Anzeige.
+
+    Args:
+        balances (np.ndarray): Kontostand am Tagesende (Pfade × Tage)
+        floor (float): Schwelle für eine Unterdeckung (standardmässig 0)
+
+    Returns:
+        dict: percentiles (Perzentil -> Tagesreihe), overdraft_probability (je Tag),
+              overdraft_any (Wahrscheinlichkeit mindestens einer Unterdeckung),
+              expected_min (erwarteter tiefster Kontostand), n_paths
+    """
+    bands = np.percentile(balances, PERCENTILES, axis=0)
+    minima = balances.min(axis=1)
+    return {
+        "percentiles": dict(zip(PERCENTILES, bands)),
+        "overdraft_probability": (balances < floor).mean(axis=0),
+        "overdraft_any": float((minima < floor).mean()),
+        "expected_min": float(minima.mean()),
+        "n_paths": balances.shape[0]
+    }
+
+def get_risk(df, version, start_date, end_date, start_balance, params, cache, max_entries=4):
+    """
+    Liefert die Monte-Carlo-Kennzahlen aus dem Cache oder simuliert einmal pro Ledger-Version und Parametern.
+
+    Args:
+        df (pd.DataFrame): Ledger aus build_ledger
+        version (str): Version des Ledgers
+        start_date (date): Erster Tag des Zeitraums
+        end_date (date): Letzter Tag des Zeitraums
+        start_balance (float): Kontostand vor dem ersten Tag
+        params (dict): Weitere Argumente für simulate_balances (n_paths, delay_mean, amount_sd, seed, ...)
+        cache (dict): Cache-Speicher, z.B. aus dem Session-State
+        max_entries (int): Maximale Anzahl gespeicherter Ergebnisse
+
+    Returns:
+        dict: Kennzahlen wie von summarize_paths
+    """
+    key = (version, str(start_date), str(end_date), float(start_balance), tuple(sorted(params.items())))
+    if key in cache:
+        return cache[key]
+
+    # Älteste Einträge verwerfen, damit der Session-State klein bleibt
+    while len(cache) >= max_entries:
+        cache.pop(next(iter(cache)))
+
+    balances = simulate_balances(df, start_date, end_date, start_balance, **params)
+    cache[key] = summarize_paths(balances)
+    return cache[key]
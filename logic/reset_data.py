@@ -1,4 +1,5 @@
 from core.storage import supabase
+from logic.fingerprint import invalidate_fingerprint
 
 def delete_all_rows(table_name: str):
     """Löscht alle Zeilen aus der Tabelle, bei denen eine gültige UUID vorhanden ist."""
@@ -11,10 +12,15 @@ def delete_all_rows(table_name: str):
             supabase.table(table_name).delete().in_("id", ids).execute()
     except Exception as e:
         print(f"⚠️ Fehler beim Löschen aus {table_name}: {e}")
+    finally:
+        # Auch nach teilweisem Löschen dürfen keine gecachten Pläne mehr ausgeliefert werden
+        invalidate_fingerprint(table_name)
 
 def reset_all_data():
     """Setzt die App zurück (löscht alle dynamischen Tabellen)."""
     delete_all_rows("buchungen")
     delete_all_rows("fixkosten")
     delete_all_rows("mitarbeiter")
+    # Löhne verweisen auf die gelöschten Mitarbeitenden
+    invalidate_fingerprint("loehne")
     delete_all_rows("simulationen")
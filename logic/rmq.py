@@ -0,0 +1,190 @@
+import numpy as np
+
+def build_sparse_table(values):
+    """
+    Baut einen Sparse-Table-Index für Minimum-Abfragen über eine Reihe auf (O(n log n)).
+
+    Ebene k enthält für jede Startposition i den Index des Minimums im Fenster [i, i + 2^k).
+    Bei gleichen Werten gewinnt der frühere Tag.
+
+    Args:
+        values (np.ndarray): Werte der Reihe (z.B. Kontostand am Tagesende)
+
+    Returns:
+        dict: values und levels (Liste von Index-Arrays je Ebene)
+    """
+    values = np.asarray(values, dtype=float)
+    levels = [np.arange(len(values))]
+    width = 1
+    while 2 * width <= len(values):
+        previous = levels[-1]
+        left = previous[:len(previous) - width]
+        right = previous[width:]
+        levels.append(np.where(values[right] < values[left], right, left))
+        width *= 2
+    return {"values": values, "levels": levels}
+
+def range_min(table, lo, hi):
+    """
+    Liefert das Minimum im Bereich [lo, hi] in O(1).
+
+    Args:
+        table (dict): Index aus build_sparse_table
+        lo (int): Erster Index (inklusive)
+        hi (int): Letzter Index (inklusive)
+
+    Returns:
+        tuple: (Minimum, Index des ersten Auftretens) oder (None, None) bei leerem Bereich
+    """
+    n = len(table["values"])
+    lo, hi = max(int(lo), 0), min(int(hi), n - 1)
+    if lo > hi:
+        return None, None
+    k = (hi - lo + 1).bit_length() - 1
+    level = table["levels"][k]
+    left, right = level[lo], level[hi - (1 << k) + 1]
+    idx = right if table["values"][right] < table["values"][left] else left
+    return float(table["values"][idx]), int(idx)
+
+def first_below(table, threshold, lo=0):
+    """
+    Findet den ersten Index ab lo, an dem der Wert unter threshold liegt, in O(log n).
+
+    Args:
+        table (dict): Index aus build_sparse_table
+        threshold (float): Schwelle (z.B. 0 für eine Unterdeckung)
+        lo (int): Startindex der Suche
+
+    Returns:
+        int: Erster Index mit Wert < threshold oder None, wenn die Schwelle nie unterschritten wird
+    """
+    values, levels = table["values"], table["levels"]
+    n = len(values)
+    pos = max(int(lo), 0)
+    # Grösstmögliche Sprünge über Fenster, deren Minimum nicht unter der Schwelle liegt
+    for k in range(len(levels) - 1, -1, -1):
+        if pos + (1 << k) <= n and values[levels[k][pos]] >= threshold:
+            pos += 1 << k
+    return pos if pos < n else None
+
+def balance_index(cube):
+    """
+    Liefert den Minimum-Index über den täglichen Kontostand eines Aggregationswürfels.
+
+    Der Index wird beim ersten Zugriff aufgebaut und im Würfel abgelegt, sodass er
+    wie der Würfel nur einmal pro Ledger-Version berechnet wird.
+
+    Args:
+        cube (dict): Würfel aus logic.aggregation.get_cube
+
+    Returns:
+        dict: Index aus build_sparse_table
+    """
+    daily = cube["D"]
+    if "balance_index" not in daily:
+        daily["balance_index"] = build_sparse_table(daily["end_balance"])
+    return daily["balance_index"]
+
+# ----------------------------------
+# Segmentbaum mit Bereichsaddition (lazy) und Bereichsminimum
+# ----------------------------------
+def build_min_tree(values):
+    """
+    Baut einen Segmentbaum für Bereichsminimum-Abfragen mit verzögerter Bereichsaddition auf.
+
+    Args:
+        values (np.ndarray): Werte der Reihe (z.B. Kontostand am Tagesende)
+
+    Returns:
+        dict: n, mn (Minimum je Knoten) und lazy (ausstehende Addition je Knoten)
+    """
+    values = [float(v) for v in values]
+    n = len(values)
+    size = 1
+    while size < max(n, 1):
+        size *= 2
+    mn = [float("inf")] * (2 * size)
+    mn[size:size + n] = values
+    for i in range(size - 1, 0, -1):
+        mn[i] = min(mn[2 * i], mn[2 * i + 1])
+    return {"n": n, "size": size, "mn": mn, "lazy": [0.0] * (2 * size)}
+
+def _tree_add(tree, node, node_lo, node_hi, lo, hi, delta):
+    if hi < node_lo or node_hi < lo:
+        return
+    mn, lazy = tree["mn"], tree["lazy"]
+    if lo <= node_lo and node_hi <= hi:
+        mn[node] += delta
+        lazy[node] += delta
+        return
+    mid = (node_lo + node_hi) // 2
+    _tree_add(tree, 2 * node, node_lo, mid, lo, hi, delta)
+    _tree_add(tree, 2 * node + 1, mid + 1, node_hi, lo, hi, delta)
+    mn[node] = min(mn[2 * node], mn[2 * node + 1]) + lazy[node]
+
+def tree_add(tree, lo, hi, delta):
+    """
+    Addiert delta zu allen Werten im Bereich [lo, hi] in O(log n).
+
+    Args:
+        tree (dict): Baum aus build_min_tree (wird verändert)
+        lo (int): Erster Index (inklusive)
+        hi (int): Letzter Index (inklusive)
+        delta (float): Zu addierender Betrag
+    """
+    if lo <= hi:
+        _tree_add(tree, 1, 0, tree["size"] - 1, int(lo), min(int(hi), tree["n"] - 1), float(delta))
+
+def _tree_min(tree, node, node_lo, node_hi, lo, hi):
+    if hi < node_lo or node_hi < lo:
+        return float("inf")
+    if lo <= node_lo and node_hi <= hi:
+        return tree["mn"][node]
+    mid = (node_lo + node_hi) // 2
+    return min(
+        _tree_min(tree, 2 * node, node_lo, mid, lo, hi),
+        _tree_min(tree, 2 * node + 1, mid + 1, node_hi, lo, hi)
+    ) + tree["lazy"][node]
+
+def tree_min(tree, lo, hi):
+    """
+    Liefert das Minimum im Bereich [lo, hi] in O(log n).
+
+    Args:
+        tree (dict): Baum aus build_min_tree
+        lo (int): Erster Index (inklusive)
+        hi (int): Letzter Index (inklusive)
+
+    Returns:
+        float: Minimum (inf bei leerem Bereich)
+    """
+    if lo > hi:
+        return float("inf")
+    return _tree_min(tree, 1, 0, tree["size"] - 1, int(lo), min(int(hi), tree["n"] - 1))
+
+def _tree_last_below(tree, node, node_lo, node_hi, lo, threshold, offset):
+    # offset: Summe der ausstehenden Additionen aller Vorfahren
+    if node_hi < lo or tree["mn"][node] + offset >= threshold:
+        return None
+    if node_lo == node_hi:
+        return node_lo
+    mid = (node_lo + node_hi) // 2
+    offset += tree["lazy"][node]
+    right = _tree_last_below(tree, 2 * node + 1, mid + 1, node_hi, lo, threshold, offset)
+    if right is not None:
+        return right
+    return _tree_last_below(tree, 2 * node, node_lo, mid, lo, threshold, offset)
+
+def tree_last_below(tree, threshold, lo=0):
+    """
+    Findet den letzten Index ab lo, an dem der Wert unter threshold liegt, in O(log n).
+
+    Args:
+        tree (dict): Baum aus build_min_tree
+        threshold (float): Schwelle
+        lo (int): Kleinster zu berücksichtigender Index
+
+    Returns:
+        int: Letzter Index mit Wert < threshold oder None
+    """
+    return _tree_last_below(tree, 1, 0, tree["size"] - 1, int(lo), float(threshold), 0.0)
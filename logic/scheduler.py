@@ -0,0 +1,139 @@
+import heapq
+import numpy as np
+import pandas as pd
+from logic.rmq import build_min_tree, tree_add, tree_last_below
+from logic.kategorien import ABGELEITETE_KATEGORIEN
+
+def _zahlungs_ids(df):
+    """Id-Spalte als Text; ohne Id-Spalte (z.B. Ledger nur aus abgeleiteten Zeilen) der Index."""
+    return df["Id"].astype(str) if "Id" in df.columns else pd.Series(df.index.astype(str), index=df.index)
+
+def default_payables(ledger, start_date, end_date, max_delay=30):
+    """
+    Stellt die ausgehenden Buchungen (ohne Fixkosten, Simulationen, Löhne und Prognose) als verschiebbare Zahlungen zusammen.
+
+    Args:
+        ledger (pd.DataFrame): Ledger aus build_ledger
+        start_date (date): Frühester möglicher Zahlungstag (überfällige Posten werden hierhin gelegt)
+        end_date (date): Ende des Planungszeitraums
+        max_delay (int): Maximale Verschiebung nach der Fälligkeit in Tagen
+
+    Returns:
+        pd.DataFrame: Id, Details, Betrag, Fällig, Frühestens, Spätestens und Priorität je Zahlung
+    """
+    outgoing = ledger[
+        (ledger["Direction"].astype(str).str.lower() == "outgoing")
+        & ~ledger["Kategorie"].isin(ABGELEITETE_KATEGORIEN)
+    ]
+    faellig = pd.to_datetime(outgoing["Date"]).dt.normalize()
+    start, ende = pd.Timestamp(start_date), pd.Timestamp(end_date)
+    return pd.DataFrame({
+        "Id": _zahlungs_ids(outgoing),
+        "Details": outgoing["Details"].astype(str),
+        "Betrag": pd.to_numeric(outgoing["Amount"], errors="coerce").abs(),
+        "Fällig": faellig.dt.date,
+        "Frühestens": faellig.clip(lower=start).dt.date,
+        "Spätestens": (faellig + pd.Timedelta(days=max_delay)).clip(lower=start, upper=ende).dt.date,
+        "Priorität": 0
+    }).reset_index(drop=True)
+
+def schedule_payments(ledger, payables, start_date, end_date, start_balance, floor=0.0):
+    """
+    Schlägt Zahlungstermine für ausgehende Posten vor, sodass der Kontostand möglichst über floor bleibt.
+
+    Greedy-Verfahren: Die Posten werden über einen Heap nach Priorität (hoch zuerst), Fälligkeit und
+    Betrag abgearbeitet. Jeder Posten erhält den frühesten Tag in [Frühestens, Spätestens], ab dem der
+    Kontostand nach Abzug des Betrags bis zum Ende des Zeitraums nicht unter floor fällt. Die Prüfung
+    läuft über einen Segmentbaum mit Bereichsaddition und Bereichsminimum (O(log n) je Posten).
+    Ist kein Tag zulässig, wird der Posten am spätesten Tag eingeplant und als Konflikt markiert.
+
+    Args:
+        ledger (pd.DataFrame): Ledger aus build_ledger (Amount vorzeichenbehaftet)
+        payables (pd.DataFrame): Zahlungen wie von default_payables (Werte dürfen angepasst sein)
+        start_date (date): Erster Tag des Zeitraums
+        end_date (date): Letzter Tag des Zeitraums
+        start_balance (float): Kontostand vor dem ersten Tag
+        floor (float): Mindestkontostand
+
+    Returns:
+        pd.DataFrame: payables ergänzt um Vorschlag, Verschiebung (Tage) und Konflikt
+    """
+    start = pd.Timestamp(start_date)
+    n_days = (pd.Timestamp(end_date) - start).days + 1
+
+    # Kontostand ohne die zu planenden Zahlungen
+    day_codes = (pd.to_datetime(ledger["Date"], errors="coerce").dt.normalize() - start).dt.days
+    day_codes = day_codes.fillna(-1).to_numpy(dtype=np.int64)
+    amounts = pd.to_numeric(ledger["Amount"], errors="coerce").fillna(0).to_numpy(dtype=float)
+    planbar = (
+        _zahlungs_ids(ledger).isin(payables["Id"].astype(str))
+        & (ledger["Direction"].astype(str).str.lower() == "outgoing")
+        & ~ledger["Kategorie"].isin(ABGELEITETE_KATEGORIEN)
+    ).to_numpy()
+    fest = (day_codes >= 0) & (day_codes < n_days) & ~planbar
+    balance = start_balance + np.cumsum(np.bincount(day_codes[fest], weights=amounts[fest], minlength=n_days))
+    tree = build_min_tree(balance)
+
+    def tage(spalte):
+        codes = (pd.to_datetime(payables[spalte]).dt.normalize() - start).dt.days.to_numpy()
+        return np.clip(codes, 0, n_days - 1).astype(np.int64)
+
+    faellig, frueh, spaet = tage("Fällig"), tage("Frühestens"), tage("Spätestens")
+    spaet = np.maximum(spaet, frueh)
+    betraege = pd.to_numeric(payables["Betrag"], errors="coerce").fillna(0).to_numpy(dtype=float)
+    prioritaeten = pd.to_numeric(payables["Priorität"], errors="coerce").fillna(0).to_numpy(dtype=float)
+
+    # Heap: höchste Priorität zuerst, dann frühere Fälligkeit, dann grösserer Betrag
+    heap = [(-prioritaeten[i], int(faellig[i]), -betraege[i], i) for i in range(len(payables))]
+    heapq.heapify(heap)
+
+    zahltage = np.zeros(len(payables), dtype=np.int64)
+    konflikt = np.zeros(len(payables), dtype=bool)
+    while heap:
+        _, _, _, i = heapq.heappop(heap)
+        betrag = betraege[i]
+
+        # Letzter Tag ab frühestens, an dem der Kontostand nach Abzug unter floor läge;
+        # da die Zahlung den Kontostand ab dem Zahltag senkt, ist der Folgetag der früheste zulässige
+        kritisch = tree_last_below(tree, floor + betrag, frueh[i])
+        zahltag = int(frueh[i]) if kritisch is None else kritisch + 1
+        if zahltag > spaet[i]:
+            zahltag = int(spaet[i])
+            konflikt[i] = True
+
+        tree_add(tree, zahltag, n_days - 1, -betrag)
+        zahltage[i] = zahltag
+
+    result = payables.copy()
+    result["Vorschlag"] = (start + pd.to_timedelta(zahltage, unit="D")).date
+    result["Verschiebung"] = zahltage - (pd.to_datetime(payables["Fällig"]).dt.normalize() - start).dt.days.to_numpy()
+    result["Konflikt"] = konflikt
+    return result
+
+def schedule_to_scenario(schedule, name, beschreibung=""):
+    """
+    Wandelt verschobene Zahlungen in ein Szenario um (Gegenbuchung am Fälligkeitstag, Zahlung am neuen Tag).
+
+    Args:
+        schedule (pd.DataFrame): Ergebnis von schedule_payments
+        name (str): Name des Szenarios
+        beschreibung (str): Beschreibung des Szenarios
+
+    Returns:
+        dict: Szenario für save_szenario
+    """
+    simulationen = []
+    for _, row in schedule[schedule["Verschiebung"] != 0].iterrows():
+        simulationen.append({
+            "date": row["Fällig"],
+            "details": f"Verschoben: {row['Details']}",
+            "amount": float(row["Betrag"]),
+            "direction": "Incoming"
+        })
+        simulationen.append({
+            "date": row["Vorschlag"],
+            "details": f"Zahlung {row['Details']} (fällig {pd.Timestamp(row['Fällig']).strftime('%d.%m.%Y')})",
+            "amount": float(row["Betrag"]),
+            "direction": "Outgoing"
+        })
+    return {"name": name, "beschreibung": beschreibung, "simulationen": simulationen}
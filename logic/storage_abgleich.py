@@ -0,0 +1,98 @@
+from datetime import datetime
+import pandas as pd
+from core.storage import supabase
+from logic.fingerprint import invalidate_fingerprint
+
+ABGLEICH_TABLE = "abgleich"
+
+def load_abgleich(user_id=None):
+    """
+    Lädt alle abgeglichenen (bezahlten) Planeinträge.
+    
+    Args:
+        user_id (str, optional): Benutzer-ID (wird nur für Audit-Trails verwendet, nicht zum Filtern)
+        
+    Returns:
+        pd.DataFrame: Abgleichszeilen mit plan_key, Plan- und Bankdaten
+    """
+    try:
+        response = supabase.table(ABGLEICH_TABLE).select("*").order("bank_datum", desc=True).execute()
+        return pd.DataFrame(response.data or [])
+    except Exception as e:
+        print(f"Fehler beim Laden des Abgleichs: {e}")
+        return pd.DataFrame()
+
+def load_erledigte_keys(user_id=None):
+    """
+    Lädt die Schlüssel aller bezahlten Planeinträge.
+    
+    Args:
+        user_id (str, optional): Benutzer-ID (wird nur für Audit-Trails verwendet, nicht zum Filtern)
+        
+    Returns:
+        set: plan_key der abgeglichenen Einträge
+    """
+    try:
+        response = supabase.table(ABGLEICH_TABLE).select("plan_key").execute()
+        return {row["plan_key"] for row in response.data or []}
+    except Exception as e:
+        print(f"Fehler beim Laden der abgeglichenen Einträge: {e}")
+        return set()
+
+def save_abgleich(zuordnungen, user_id=None):
+    """
+    Speichert bestätigte Zuordnungen (Upsert je Planeintrag).
+    
+    Args:
+        zuordnungen (list): Dictionaries mit plan_key, plan_datum, plan_details, plan_betrag,
+                            bank_datum, bank_details, bank_betrag und score
+        user_id (str, optional): Benutzer-ID für Audit-Trails
+        
+    Returns:
+        int: Anzahl gespeicherter Zuordnungen oder None bei Fehler
+    """
+    try:
+        if not zuordnungen:
+            return 0
+        now = datetime.utcnow().isoformat()
+        records = []
+        for z in zuordnungen:
+            record = {
+                "plan_key": z["plan_key"],
+                "plan_datum": str(z.get("plan_datum"))[:10] if z.get("plan_datum") is not None else None,
+                "plan_details": z.get("plan_details", ""),
+                "plan_betrag": float(z["plan_betrag"]) if z.get("plan_betrag") is not None else None,
+                "bank_datum": str(z["bank_datum"])[:10],
+                "bank_details": z.get("bank_details", ""),
+                "bank_betrag": float(z["bank_betrag"]),
+                "score": float(z.get("score", 0)),
+                "updated_at": now
+            }
+            if user_id:
+                record["user_id"] = user_id
+            records.append(record)
+        supabase.table(ABGLEICH_TABLE).upsert(records, on_conflict="plan_key").execute()
+        invalidate_fingerprint(ABGLEICH_TABLE)
+        return len(records)
+    except Exception as e:
+        print(f"Fehler beim Speichern des Abgleichs: {e}")
+        return None
+
+def delete_abgleich(plan_key, user_id=None):
+    """
+    Hebt einen Abgleich auf, sodass der Planeintrag wieder offen ist.
+    
+    Args:
+        plan_key (str): Schlüssel des Planeintrags
+        user_id (str, optional): Benutzer-ID für Audit-Trails
+        
+    Returns:
+        bool: True bei Erfolg, False bei Fehler
+    """
+    try:
+        supabase.table(ABGLEICH_TABLE).delete().eq("plan_key", plan_key).execute()
+        invalidate_fingerprint(ABGLEICH_TABLE)
+        return True
+    except Exception as e:
+        print(f"Fehler beim Aufheben des Abgleichs: {e}")
+        return False
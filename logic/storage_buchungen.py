@@ -3,6 +3,9 @@ from datetime import datetime
 import uuid
 from core.parsing import parse_date_swiss_fallback
 from core.storage import supabase
+from logic.fingerprint import invalidate_fingerprint
+from logic.kategorien import recategorize
+from logic.storage_kategorien import get_kategorie_regeln
 
 BUCHUNGEN_TABLE = "buchungen"
 
@@ -91,6 +94,7 @@ def save_buchungen(df, user_id=None):
             record = row.to_dict()
             supabase.table(BUCHUNGEN_TABLE).upsert(record).execute()
             
+        invalidate_fingerprint(BUCHUNGEN_TABLE)
         return True
     except Exception as e:
         print(f"Fehler beim Speichern der Buchungen: {e}")
@@ -131,12 +135,21 @@ def update_buchung_by_id(id, date, details, amount, direction, user_id=None, upd
             "modified": True,
             "updated_at": updated_at or datetime.utcnow().isoformat()
         }
+
+        # Geänderter Text kann eine andere Kategorisierungsregel treffen
+        bisher = supabase.table("buchungen").select("details, kategorie").eq("id", id).execute().data
+        if bisher:
+            kategorie = recategorize(bisher[0].get("details"), bisher[0].get("kategorie"), details,
+                                     get_kategorie_regeln())
+            if kategorie != bisher[0].get("kategorie"):
+                update_data["kategorie"] = kategorie
         
         # Füge user_id für Audit-Trail hinzu, wenn bereitgestellt
         if user_id:
             update_data["user_id"] = user_id
 
         supabase.table("buchungen").update(update_data).eq("id", id).execute()
+        invalidate_fingerprint(BUCHUNGEN_TABLE)
         return True
     except Exception as e:
         print(f"Fehler beim Aktualisieren der Buchung: {e}")
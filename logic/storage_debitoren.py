@@ -0,0 +1,137 @@
+from datetime import datetime
+import pandas as pd
+from core.storage import supabase
+from logic.fingerprint import invalidate_fingerprint
+
+DEBITOREN_VERZUG_TABLE = "debitoren_verzug"
+DEBITOREN_ZAHLUNGEN_TABLE = "debitoren_zahlungen"
+
+# Anzahl Schlüssel je Abfrage (Länge der URL bei in_-Filtern)
+KEY_BATCH_SIZE = 200
+
+def load_debitoren_verzug(user_id=None):
+    """
+    Lädt die Statistiken zum Zahlungsverhalten je Kundennummer.
+    
+    Args:
+        user_id (str, optional): Benutzer-ID (wird nur für Audit-Trails verwendet, nicht zum Filtern)
+        
+    Returns:
+        pd.DataFrame: kundennummer, anzahl, summe_verzug, summe_quadrate und verzug_tage
+    """
+    try:
+        response = supabase.table(DEBITOREN_VERZUG_TABLE).select(
+            "kundennummer, anzahl, summe_verzug, summe_quadrate, verzug_tage"
+        ).execute()
+        df = pd.DataFrame(response.data or [],
+                          columns=["kundennummer", "anzahl", "summe_verzug", "summe_quadrate", "verzug_tage"])
+        for spalte in ["anzahl", "summe_verzug", "summe_quadrate", "verzug_tage"]:
+            df[spalte] = pd.to_numeric(df[spalte], errors="coerce").fillna(0)
+        return df
+    except Exception as e:
+        print(f"Fehler beim Laden des Debitorenverzugs: {e}")
+        return pd.DataFrame(columns=["kundennummer", "anzahl", "summe_verzug", "summe_quadrate", "verzug_tage"])
+
+def load_verzug_lookup(user_id=None):
+    """
+    Lädt den erwarteten Zahlungsverzug als kompakte Nachschlagetabelle.
+    
+    Args:
+        user_id (str, optional): Benutzer-ID (wird nur für Audit-Trails verwendet, nicht zum Filtern)
+        
+    Returns:
+        dict: Kundennummer -> erwarteter Verzug in Tagen
+    """
+    df = load_debitoren_verzug(user_id=user_id)
+    return dict(zip(df["kundennummer"].astype(str), df["verzug_tage"].astype(float)))
+
+def save_debitoren_verzug(df, user_id=None):
+    """
+    Speichert die Statistiken zum Zahlungsverhalten (Upsert je Kundennummer).
+    
+    Args:
+        df (pd.DataFrame): Ergebnis von logic.debitoren.merge_verzug
+        user_id (str, optional): Benutzer-ID für Audit-Trails
+        
+    Returns:
+        bool: True bei Erfolg, False bei Fehler
+    """
+    try:
+        if df.empty:
+            return True
+        now = datetime.utcnow().isoformat()
+        records = [
+            {
+                "kundennummer": str(row["kundennummer"]),
+                "anzahl": int(row["anzahl"]),
+                "summe_verzug": float(row["summe_verzug"]),
+                "summe_quadrate": float(row["summe_quadrate"]),
+                "verzug_tage": float(row["verzug_tage"]),
+                "updated_at": now,
+                **({"user_id": user_id} if user_id else {})
+            }
+            for _, row in df.iterrows()
+        ]
+        supabase.table(DEBITOREN_VERZUG_TABLE).upsert(records, on_conflict="kundennummer").execute()
+        invalidate_fingerprint(DEBITOREN_VERZUG_TABLE)
+        return True
+    except Exception as e:
+        print(f"Fehler beim Speichern des Debitorenverzugs: {e}")
+        return False
+
+def load_bekannte_zahlungen(keys, user_id=None):
+    """
+    Ermittelt, welche bezahlten Rechnungen bereits in die Statistiken eingeflossen sind.
+    
+    Args:
+        keys (list): Schlüssel aus logic.debitoren.rechnung_keys
+        user_id (str, optional): Benutzer-ID (wird nur für Audit-Trails verwendet, nicht zum Filtern)
+        
+    Returns:
+        set: Bereits erfasste Schlüssel oder None bei Fehler
+    """
+    keys = list(dict.fromkeys(keys))
+    bekannt = set()
+    try:
+        for i in range(0, len(keys), KEY_BATCH_SIZE):
+            response = supabase.table(DEBITOREN_ZAHLUNGEN_TABLE).select("rechnung_key").in_(
+                "rechnung_key", keys[i:i + KEY_BATCH_SIZE]
+            ).execute()
+            bekannt.update(row["rechnung_key"] for row in response.data or [])
+        return bekannt
+    except Exception as e:
+        print(f"Fehler beim Laden der erfassten Zahlungen: {e}")
+        return None
+
+def save_zahlungen(zahlungen, user_id=None):
+    """
+    Merkt sich bezahlte Rechnungen, die in die Statistiken eingeflossen sind.
+    
+    Args:
+        zahlungen (pd.DataFrame): rechnung_key, kundennummer und verzug je Rechnung
+        user_id (str, optional): Benutzer-ID für Audit-Trails
+        
+    Returns:
+        bool: True bei Erfolg, False bei Fehler
+    """
+    try:
+        if zahlungen.empty:
+            return True
+        now = datetime.utcnow().isoformat()
+        records = [
+            {
+                "rechnung_key": str(row["rechnung_key"]),
+                "kundennummer": str(row["kundennummer"]),
+                "verzug": float(row["verzug"]),
+                "created_at": now,
+                **({"user_id": user_id} if user_id else {})
+            }
+            for _, row in zahlungen.iterrows()
+        ]
+        supabase.table(DEBITOREN_ZAHLUNGEN_TABLE).upsert(
+            records, on_conflict="rechnung_key", ignore_duplicates=True
+        ).execute()
+        return True
+    except Exception as e:
+        print(f"Fehler beim Speichern der erfassten Zahlungen: {e}")
+        return False
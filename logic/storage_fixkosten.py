@@ -2,6 +2,7 @@ import pandas as pd
 from datetime import datetime, date, timedelta
 import uuid
 from core.storage import supabase
+from logic.fingerprint import invalidate_fingerprint
 from dateutil.relativedelta import relativedelta
 import json  # Add import for better debug logging
 
@@ -106,6 +107,7 @@ def update_fixkosten_row(row_data, user_id=None):
                 print("Neuer Eintrag erstellt.")
             
             # Erfolgreiches Update oder Insert
+            invalidate_fingerprint("fixkosten")
             print("Datenbankoperation erfolgreich abgeschlossen.")
             return response.data if response and hasattr(response, 'data') else True
         
@@ -151,6 +153,7 @@ def delete_fixkosten_row(row_id, user_id=None):
         # Dann löschen
         try:
             response = supabase.table("fixkosten").delete().eq("id", row_id).execute()
+            invalidate_fingerprint("fixkosten")
             
             # Erfolg durch Prüfung, ob die Response vorhanden ist
             return True if response is not None else False
@@ -252,7 +255,7 @@ def convert_fixkosten_to_buchungen(start_date, end_date, user_id=None):
         for _, fixkosten in aktive_fixkosten.iterrows():
             try:
                 # Bestimme das Startdatum für diese Fixkosten
-                kosten_start = max(fixkosten["start"], start_date)
+                kosten_start = fixkosten["start"]
                 
                 # Bestimme das Enddatum für diese Fixkosten
                 kosten_ende = fixkosten["enddatum"] if pd.notna(fixkosten["enddatum"]) else end_date
@@ -277,8 +280,14 @@ def convert_fixkosten_to_buchungen(start_date, end_date, user_id=None):
                 
                 # Buchungsdaten generieren
                 current_date = kosten_start
+                schritt = 0
+                
+                # Finde das erste Datum im Rhythmus ab Beginn des Zeitraums (der Rhythmus
+                # bleibt am Startdatum der Fixkosten verankert, unabhängig vom Planungszeitraum)
+                while current_date < start_date:
+                    schritt += 1
+                    current_date = kosten_start + interval * schritt
                 
-                # Finde das erste Datum im zukünftigen Rhythmus
                 while current_date <= kosten_ende:
                     # Nur Buchungen für Daten nach dem Startdatum der Fixkosten
                     if current_date >= fixkosten["start"]:
@@ -315,8 +324,10 @@ def convert_fixkosten_to_buchungen(start_date, end_date, user_id=None):
                                 traceback.print_exc()
                     
                     # Zum nächsten Datum im Rhythmus wechseln
-                    # Wichtig: Verwende das ursprüngliche Datum für den Rhythmus, nicht das angepasste
-                    current_date += interval
+                    # Wichtig: Vom Startdatum aus rechnen (nicht vom angepassten oder vorherigen Datum),
+                    # damit z.B. der 31. nicht über kürzere Monate auf den 28. abrutscht
+                    schritt += 1
+                    current_date = kosten_start + interval * schritt
             except Exception as fixkosten_error:
                 print(f"Fehler bei der Verarbeitung von Fixkosten {fixkosten.get('id')}: {fixkosten_error}")
                 import traceback
@@ -328,10 +339,8 @@ def convert_fixkosten_to_buchungen(start_date, end_date, user_id=None):
             print(f"Insgesamt {len(buchungen)} Buchungen aus Fixkosten generiert.")
             df = pd.DataFrame(buchungen)
             
-            # Entferne zusätzliche Spalte "original_date", damit das DataFrame kompatibel bleibt
-            if "original_date" in df.columns:
-                df = df.drop(columns=["original_date"])
-                
+            # "original_date" (Rhythmusdatum vor der Wochenendverschiebung) bleibt erhalten:
+            # darüber werden abgeglichene Fixkosten wiedererkannt (logic.matching.plan_keys)
             return df
         else:
             print("Keine Buchungen aus Fixkosten generiert.")
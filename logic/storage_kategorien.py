@@ -0,0 +1,262 @@
+import re
+from datetime import datetime
+import pandas as pd
+from core.storage import supabase
+from logic.fingerprint import table_fingerprint, invalidate_fingerprint
+from logic.kategorien import (
+    ABGELEITETE_KATEGORIEN, STANDARD_KATEGORIE, compile_rules, categorize, get_compiled_rules, affected_rows
+)
+from logic.llm_kategorien import llm_config, normalize_for_classification, classify_texts
+
+KATEGORIE_REGELN_TABLE = "kategorie_regeln"
+BUCHUNGEN_TABLE = "buchungen"
+KATEGORIE_CACHE_TABLE = "kategorie_cache"
+
+# Maximale Anzahl IDs je Update-Anfrage (Länge der URL)
+UPDATE_BATCH_SIZE = 200
+
+def load_kategorie_regeln(user_id=None):
+    """
+    Lädt alle Kategorisierungsregeln.
+
+    Args:
+        user_id (str, optional): Benutzer-ID (wird nur für Audit-Trails verwendet, nicht zum Filtern)
+
+    Returns:
+        list: Regeln mit id, muster, kategorie, prioritaet, regex und aktiv (absteigend nach Priorität)
+    """
+    try:
+        response = supabase.table(KATEGORIE_REGELN_TABLE).select(
+            "id, muster, kategorie, prioritaet, regex, aktiv"
+        ).order("prioritaet", desc=True).execute()
+        return response.data or []
+    except Exception as e:
+        print(f"Fehler beim Laden der Kategorisierungsregeln: {e}")
+        return []
+
+def get_kategorie_regeln():
+    """
+    Liefert die kompilierten Kategorisierungsregeln (prozessweit zwischengespeichert).
+
+    Returns:
+        dict: Ergebnis von logic.kategorien.compile_rules
+    """
+    return get_compiled_rules(table_fingerprint(KATEGORIE_REGELN_TABLE), load_kategorie_regeln)
+
+def save_kategorie_regel(regel, user_id=None):
+    """
+    Speichert eine neue oder geänderte Kategorisierungsregel.
+
+    Args:
+        regel (dict): Regel mit muster, kategorie, prioritaet, regex, aktiv und optional id
+        user_id (str, optional): Benutzer-ID für Audit-Trails
+
+    Returns:
+        str: ID der Regel oder None bei Fehler
+    """
+    try:
+        muster = str(regel.get("muster") or "").strip()
+        kategorie = str(regel.get("kategorie") or "").strip()
+        if not muster or not kategorie:
+            print("Kategorisierungsregel ohne Muster oder Kategorie")
+            return None
+        if kategorie in ABGELEITETE_KATEGORIEN:
+            print(f"Die Kategorie '{kategorie}' ist für Fixkosten, Simulationen, Löhne und Prognose reserviert")
+            return None
+        if regel.get("regex"):
+            re.compile(muster)
+
+        record = {
+            "muster": muster,
+            "kategorie": kategorie,
+            "prioritaet": int(regel.get("prioritaet") or 0),
+            "regex": bool(regel.get("regex")),
+            "aktiv": bool(regel.get("aktiv", True)),
+            "updated_at": datetime.utcnow().isoformat()
+        }
+        if pd.notna(regel.get("id")) and str(regel.get("id") or "").strip():
+            record["id"] = regel["id"]
+        if user_id:
+            record["user_id"] = user_id
+
+        response = supabase.table(KATEGORIE_REGELN_TABLE).upsert(record).execute()
+        invalidate_fingerprint(KATEGORIE_REGELN_TABLE)
+        return response.data[0]["id"] if response.data else record.get("id")
+    except Exception as e:
+        print(f"Fehler beim Speichern der Kategorisierungsregel: {e}")
+        return None
+
+def delete_kategorie_regel(regel_id, user_id=None):
+    """
+    Löscht eine Kategorisierungsregel.
+
+    Args:
+        regel_id (str): ID der Regel
+        user_id (str, optional): Benutzer-ID für Audit-Trails
+
+    Returns:
+        bool: True bei Erfolg, False bei Fehler
+    """
+    try:
+        supabase.table(KATEGORIE_REGELN_TABLE).delete().eq("id", regel_id).execute()
+        invalidate_fingerprint(KATEGORIE_REGELN_TABLE)
+        return True
+    except Exception as e:
+        print(f"Fehler beim Löschen der Kategorisierungsregel: {e}")
+        return False
+
+def recategorize_buchungen(alt=None, neu=None, user_id=None):
+    """
+    Kategorisiert nach einer Regeländerung nur die betroffenen Buchungen neu.
+
+    Ohne alt und neu werden alle Buchungen neu kategorisiert.
+
+    Args:
+        alt (dict, optional): Regel vor der Änderung (None bei neuer Regel)
+        neu (dict, optional): Regel nach der Änderung (None bei gelöschter Regel)
+        user_id (str, optional): Benutzer-ID für Audit-Trails
+
+    Returns:
+        int: Anzahl geänderter Buchungen oder None bei Fehler
+    """
+    try:
+        response = supabase.table(BUCHUNGEN_TABLE).select("id, details, kategorie").execute()
+        df = pd.DataFrame(response.data or [], columns=["id", "details", "kategorie"])
+        if df.empty:
+            return 0
+
+        if alt is None and neu is None:
+            betroffen = df
+        else:
+            betroffen = df[affected_rows(df["details"], df["kategorie"], alt=alt, neu=neu)]
+        if betroffen.empty:
+            return 0
+
+        kategorien = categorize(betroffen["details"], compile_rules(load_kategorie_regeln()))
+        # Ohne Regeltreffer gilt eine bereits gespeicherte Klassifikation (ohne neue Anfragen)
+        kategorien = _apply_kategorie_cache(betroffen["details"], kategorien)
+        geaendert = kategorien != betroffen["kategorie"]
+        if not geaendert.any():
+            return 0
+
+        # Ein Update je Kategorie statt je Buchung
+        now = datetime.utcnow().isoformat()
+        ids = betroffen.loc[geaendert, "id"].astype(str)
+        for kategorie, gruppe in ids.groupby(kategorien[geaendert]):
+            werte = gruppe.tolist()
+            for i in range(0, len(werte), UPDATE_BATCH_SIZE):
+                update_data = {"kategorie": kategorie, "updated_at": now}
+                if user_id:
+                    update_data["user_id"] = user_id
+                supabase.table(BUCHUNGEN_TABLE).update(update_data).in_("id", werte[i:i + UPDATE_BATCH_SIZE]).execute()
+
+        invalidate_fingerprint(BUCHUNGEN_TABLE)
+        return int(geaendert.sum())
+    except Exception as e:
+        print(f"Fehler beim Neukategorisieren der Buchungen: {e}")
+        return None
+
+def load_kategorie_cache(keys):
+    """
+    Lädt gespeicherte Klassifikationen für normalisierte Buchungstexte.
+
+    Args:
+        keys (list): Normalisierte Texte
+
+    Returns:
+        dict: Text -> Kategorie (nur vorhandene Einträge)
+    """
+    keys = [k for k in dict.fromkeys(keys) if k]
+    ergebnis = {}
+    try:
+        for i in range(0, len(keys), UPDATE_BATCH_SIZE):
+            response = supabase.table(KATEGORIE_CACHE_TABLE).select("text_key, kategorie").in_(
+                "text_key", keys[i:i + UPDATE_BATCH_SIZE]
+            ).execute()
+            ergebnis.update({row["text_key"]: row["kategorie"] for row in response.data or []})
+        return ergebnis
+    except Exception as e:
+        print(f"Fehler beim Laden der gespeicherten Klassifikationen: {e}")
+        return ergebnis
+
+def save_kategorie_cache(ergebnisse, modell=None, user_id=None):
+    """
+    Speichert Klassifikationen je normalisiertem Buchungstext (Upsert).
+
+    Args:
+        ergebnisse (dict): Text -> Kategorie
+        modell (str, optional): Verwendetes Modell
+        user_id (str, optional): Benutzer-ID für Audit-Trails
+
+    Returns:
+        bool: True bei Erfolg, False bei Fehler
+    """
+    try:
+        if not ergebnisse:
+            return True
+        now = datetime.utcnow().isoformat()
+        records = [
+            {
+                "text_key": text,
+                "kategorie": kategorie,
+                "modell": modell,
+                "updated_at": now,
+                **({"user_id": user_id} if user_id else {})
+            }
+            for text, kategorie in ergebnisse.items()
+        ]
+        supabase.table(KATEGORIE_CACHE_TABLE).upsert(records, on_conflict="text_key").execute()
+        return True
+    except Exception as e:
+        print(f"Fehler beim Speichern der Klassifikationen: {e}")
+        return False
+
+def _apply_kategorie_cache(details, kategorien):
+    """Ersetzt Standard-Kategorien durch gespeicherte Klassifikationen des normalisierten Texts."""
+    offen = kategorien == STANDARD_KATEGORIE
+    if not offen.any():
+        return kategorien
+    keys = normalize_for_classification(details[offen])
+    gespeichert = load_kategorie_cache(keys.unique().tolist())
+    if not gespeichert:
+        return kategorien
+    return kategorien.where(~offen, keys.map(gespeichert).reindex(kategorien.index).fillna(kategorien))
+
+def categorize_with_llm(details, compiled=None, config=None, user_id=None):
+    """
+    Kategorisiert Buchungstexte über die Regeln und klassifiziert die übrigen Texte per Sprachmodell.
+
+    Jeder normalisierte Text wird höchstens einmal klassifiziert: Gespeicherte Ergebnisse werden
+    wiederverwendet, neue Ergebnisse in der Tabelle kategorie_cache abgelegt.
+
+    Args:
+        details (pd.Series): Buchungstexte
+        compiled (dict, optional): Kompilierte Regeln (Standard: aus der Datenbank)
+        config (dict, optional): Ergebnis von logic.llm_kategorien.llm_config (Standard: aus der Umgebung)
+        user_id (str, optional): Benutzer-ID für Audit-Trails
+
+    Returns:
+        tuple: (pd.Series Kategorie je Zeile, Anzahl gesendeter Anfragen)
+    """
+    compiled = compiled if compiled is not None else get_kategorie_regeln()
+    kategorien = categorize(details, compiled)
+    offen = kategorien == STANDARD_KATEGORIE
+    if not offen.any():
+        return kategorien, 0
+
+    keys = normalize_for_classification(details[offen])
+    eindeutig = [k for k in keys.unique().tolist() if k]
+    gespeichert = load_kategorie_cache(eindeutig)
+
+    anfragen = 0
+    config = config or llm_config()
+    fehlend = [k for k in eindeutig if k not in gespeichert]
+    if fehlend and config["enabled"]:
+        neu, anfragen = classify_texts(fehlend, compiled["kategorien"], config=config)
+        if neu:
+            save_kategorie_cache(neu, modell=config["model"], user_id=user_id)
+            gespeichert.update(neu)
+
+    if gespeichert:
+        kategorien = kategorien.where(~offen, keys.map(gespeichert).reindex(kategorien.index).fillna(kategorien))
+    return kategorien, anfragen
@@ -1,6 +1,7 @@
 from datetime import datetime
 import pandas as pd
 from core.storage import supabase
+from logic.fingerprint import invalidate_fingerprint
 
 TABLE_NAME = "loehne"
 
@@ -28,6 +29,7 @@ def add_lohn(mitarbeiter_id: int, start, betrag: float, ende=None):
         if ende:
             lohn["ende"] = pd.to_datetime(ende).strftime("%Y-%m-%d")
         supabase.table(TABLE_NAME).insert(lohn).execute()
+        invalidate_fingerprint(TABLE_NAME)
         return True
     except Exception as e:
         print("❌ Fehler beim Hinzufügen eines Lohns:", e)
@@ -1,4 +1,5 @@
 from core.storage import supabase
+from logic.fingerprint import invalidate_fingerprint
 import pandas as pd
 import uuid
 from datetime import datetime, date, timedelta
@@ -150,6 +151,7 @@ def save_mitarbeiter(mitarbeiter_list, user_id=None):
             # Dann den Mitarbeiter löschen
             supabase.table("mitarbeiter").delete().eq("id", delete_id).execute()
         
+        invalidate_fingerprint("mitarbeiter", "loehne")
         return True
     except Exception as e:
         print(f"Fehler beim Speichern der Mitarbeiter: {e}")
@@ -207,6 +209,7 @@ def add_mitarbeiter(name, lohn_daten, user_id=None, created_at=None, updated_at=
                 
             supabase.table("loehne").insert(lohn_data).execute()
             
+        invalidate_fingerprint("mitarbeiter", "loehne")
         return True
     except Exception as e:
         print(f"Fehler beim Hinzufügen des Mitarbeiters: {e}")
@@ -266,6 +269,7 @@ def update_mitarbeiter(mitarbeiter_id, updated_data, user_id=None):
                     
                 supabase.table("loehne").insert(lohn_data).execute()
         
+        invalidate_fingerprint("mitarbeiter", "loehne")
         return True
     except Exception as e:
         print(f"Fehler beim Aktualisieren des Mitarbeiters: {e}")
@@ -296,6 +300,7 @@ def delete_mitarbeiter(mitarbeiter_id, user_id=None):
         # Dann den Mitarbeiter löschen
         supabase.table("mitarbeiter").delete().eq("id", mitarbeiter_id).execute()
         
+        invalidate_fingerprint("mitarbeiter", "loehne")
         return True
     except Exception as e:
         print(f"Fehler beim Löschen des Mitarbeiters: {e}")
@@ -334,6 +339,7 @@ def add_lohn_to_mitarbeiter(mitarbeiter_id, lohn_daten, user_id=None):
             
         supabase.table("loehne").insert(lohn_data).execute()
         
+        invalidate_fingerprint("mitarbeiter", "loehne")
         return True
     except Exception as e:
         print(f"Fehler beim Hinzufügen des Lohneintrags: {e}")
@@ -381,6 +387,7 @@ def update_lohn(mitarbeiter_id, lohn_index, updated_lohn, user_id=None):
             
         supabase.table("loehne").update(lohn_data).eq("id", lohn_id).execute()
         
+        invalidate_fingerprint("mitarbeiter", "loehne")
         return True
     except Exception as e:
         print(f"Fehler beim Aktualisieren des Lohneintrags: {e}")
@@ -418,6 +425,7 @@ def delete_lohn(mitarbeiter_id, lohn_index, user_id=None):
         # Lohneintrag löschen
         supabase.table("loehne").delete().eq("id", lohn_id).execute()
         
+        invalidate_fingerprint("mitarbeiter", "loehne")
         return True
     except Exception as e:
         print(f"Fehler beim Löschen des Lohneintrags: {e}")
@@ -481,6 +489,25 @@ def get_aktuelle_loehne(user_id=None):
         print(f"Fehler beim Abrufen der aktuellen Löhne: {e}")
         return []
 
+LOHN_ZAHLTAG = 25
+
+def lohn_zahltage(start_date, end_date):
+    """
+    Liefert alle Lohnzahltage (25. des Monats) im Zeitraum.
+    
+    Args:
+        start_date: Anfangsdatum
+        end_date: Enddatum
+        
+    Returns:
+        list: Zahltage als date, aufsteigend sortiert
+    """
+    start = pd.Timestamp(start_date).normalize()
+    ende = pd.Timestamp(end_date).normalize()
+    monate = pd.date_range(start=start.replace(day=1), end=ende, freq="MS")
+    zahltage = [(monat + pd.Timedelta(days=LOHN_ZAHLTAG - 1)).date() for monat in monate]
+    return [tag for tag in zahltage if start.date() <= tag <= ende.date()]
+
 def convert_loehne_to_buchungen(start_date, end_date, user_id=None):
     """
     Konvertiert Lohndaten in Buchungen für die Liquiditätsplanung.
@@ -503,36 +530,28 @@ def convert_loehne_to_buchungen(start_date, end_date, user_id=None):
             
         buchungen = []
         
-        # Monatsweise durchgehen und Lohnbuchungen für den 25. erstellen
-        current_date = pd.Timestamp(start_date).to_pydatetime().date()
-        end_date_py = pd.Timestamp(end_date).to_pydatetime().date()
-        
-        while current_date <= end_date_py:
-            # Nur für den 25. des Monats Löhne generieren
-            if current_date.day == 25:
-                for lohn in loehne:
-                    start_date_lohn = lohn.get("Start")
-                    ende_date_lohn = lohn.get("Ende")
+        # Lohnbuchungen für jeden Zahltag (25. des Monats) erstellen
+        for current_date in lohn_zahltage(start_date, end_date):
+            for lohn in loehne:
+                start_date_lohn = lohn.get("Start")
+                ende_date_lohn = lohn.get("Ende")
+                
+                # Prüfen, ob Lohn zum aktuellen Datum gültig ist
+                if (start_date_lohn is None or start_date_lohn <= current_date) and \
+                   (ende_date_lohn is None or ende_date_lohn >= current_date):
+                    buchung = {
+                        "date": pd.Timestamp(current_date),
+                        "details": f"Lohn {lohn['Mitarbeiter']}",
+                        "amount": -float(lohn["Betrag"]),  # Negativer Betrag für Ausgabe
+                        "direction": "Outgoing",
+                        "kategorie": "Lohn"
+                    }
                     
-                    # Prüfen, ob Lohn zum aktuellen Datum gültig ist
-                    if (start_date_lohn is None or start_date_lohn <= current_date) and \
-                       (ende_date_lohn is None or ende_date_lohn >= current_date):
-                        buchung = {
-                            "date": pd.Timestamp(current_date),
-                            "details": f"Lohn {lohn['Mitarbeiter']}",
-                            "amount": -float(lohn["Betrag"]),  # Negativer Betrag für Ausgabe
-                            "direction": "Outgoing",
-                            "kategorie": "Lohn"
-                        }
+                    # Benutzer-ID für Audit-Trail hinzufügen
+                    if user_id:
+                        buchung["user_id"] = user_id
                         
-                        # Benutzer-ID für Audit-Trail hinzufügen
-                        if user_id:
-                            buchung["user_id"] = user_id
-                            
-                        buchungen.append(buchung)
-            
-            # Zum nächsten Tag
-            current_date += timedelta(days=1)
+                    buchungen.append(buchung)
         
         # DataFrame erstellen
         if buchungen:
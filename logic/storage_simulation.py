@@ -2,6 +2,7 @@ import pandas as pd
 import uuid
 from datetime import datetime, date
 from core.storage import supabase
+from logic.fingerprint import invalidate_fingerprint
 
 def load_simulationen(user_id=None):
     """
@@ -70,6 +71,7 @@ def save_simulationen(simulationen_data, user_id=None):
                     
             supabase.table("simulationen").insert(cleaned_list).execute()
             
+        invalidate_fingerprint("simulationen")
         return True
     except Exception as e:
         print(f"Fehler beim Speichern der Simulationen: {e}")
@@ -108,6 +110,7 @@ def update_simulation_by_id(id, data, user_id=None):
         
         # Aktualisierung durchführen
         supabase.table("simulationen").update(update_data).eq("id", id).execute()
+        invalidate_fingerprint("simulationen")
         return True
     except Exception as e:
         print(f"Fehler beim Aktualisieren der Simulation: {e}")
@@ -131,6 +134,7 @@ def delete_simulation_by_id(id, user_id=None):
             pass
             
         supabase.table("simulationen").delete().eq("id", id).execute()
+        invalidate_fingerprint("simulationen")
         return True
     except Exception as e:
         print(f"Fehler beim Löschen der Simulation: {e}")
@@ -150,7 +154,7 @@ def add_new_simulation(date, details, amount, direction, user_id=None, created_a
         updated_at (str, optional): Aktualisierungszeitstempel
         
     Returns:
-        bool: True bei Erfolg, False bei Fehler
+        str: ID der neuen Simulation bei Erfolg, False bei Fehler
     """
     try:
         # Neue ID generieren
@@ -177,7 +181,8 @@ def add_new_simulation(date, details, amount, direction, user_id=None, created_a
         
         # Neue Simulation einfügen
         supabase.table("simulationen").insert(data).execute()
-        return True
+        invalidate_fingerprint("simulationen")
+        return new_id
     except Exception as e:
         print(f"Fehler beim Hinzufügen der Simulation: {e}")
         return False
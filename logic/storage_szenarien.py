@@ -0,0 +1,91 @@
+import uuid
+from datetime import datetime
+from core.storage import supabase
+from logic.fingerprint import invalidate_fingerprint
+
+SZENARIEN_TABLE = "szenarien"
+
+def load_szenarien(user_id=None):
+    """
+    Lädt alle gespeicherten Szenarien.
+    
+    Args:
+        user_id (str, optional): Benutzer-ID (wird nur für Audit-Trails verwendet, nicht zum Filtern)
+        
+    Returns:
+        list: Szenarien als Dictionaries mit name, beschreibung, simulationen,
+              fixkosten_overrides und lohn_overrides
+    """
+    try:
+        response = supabase.table(SZENARIEN_TABLE).select("*").order("name").execute()
+        szenarien = response.data or []
+        for szenario in szenarien:
+            szenario["simulationen"] = szenario.get("simulationen") or []
+            szenario["fixkosten_overrides"] = szenario.get("fixkosten_overrides") or {}
+            szenario["lohn_overrides"] = szenario.get("lohn_overrides") or {}
+        return szenarien
+    except Exception as e:
+        print(f"Fehler beim Laden der Szenarien: {e}")
+        return []
+
+def save_szenario(szenario, user_id=None):
+    """
+    Speichert ein Szenario (neu oder aktualisiert).
+    
+    Args:
+        szenario (dict): Szenario mit name, beschreibung, simulationen, fixkosten_overrides, lohn_overrides
+                         und optional id
+        user_id (str, optional): Benutzer-ID für Audit-Trails
+        
+    Returns:
+        str: ID des gespeicherten Szenarios oder None bei Fehler
+    """
+    try:
+        now = datetime.utcnow().isoformat()
+        data = {
+            "id": szenario.get("id") or str(uuid.uuid4()),
+            "name": szenario["name"],
+            "beschreibung": szenario.get("beschreibung", ""),
+            "simulationen": [
+                {
+                    "date": str(sim["date"])[:10],
+                    "details": sim.get("details", ""),
+                    "amount": abs(float(sim["amount"])),
+                    "direction": sim.get("direction", "Incoming")
+                }
+                for sim in szenario.get("simulationen", [])
+            ],
+            "fixkosten_overrides": {str(k): float(v) for k, v in szenario.get("fixkosten_overrides", {}).items()},
+            "lohn_overrides": {str(k): float(v) for k, v in szenario.get("lohn_overrides", {}).items()},
+            "updated_at": now
+        }
+        if not szenario.get("id"):
+            data["created_at"] = now
+        if user_id:
+            data["user_id"] = user_id
+        
+        supabase.table(SZENARIEN_TABLE).upsert(data).execute()
+        invalidate_fingerprint(SZENARIEN_TABLE)
+        return data["id"]
+    except Exception as e:
+        print(f"Fehler beim Speichern des Szenarios: {e}")
+        return None
+
+def delete_szenario(szenario_id, user_id=None):
+    """
+    Löscht ein Szenario.
+    
+    Args:
+        szenario_id (str): ID des Szenarios
+        user_id (str, optional): Benutzer-ID für Audit-Trails
+        
+    Returns:
+        bool: True bei Erfolg, False bei Fehler
+    """
+    try:
+        supabase.table(SZENARIEN_TABLE).delete().eq("id", szenario_id).execute()
+        invalidate_fingerprint(SZENARIEN_TABLE)
+        return True
+    except Exception as e:
+        print(f"Fehler beim Löschen des Szenarios: {e}")
+        return False
@@ -0,0 +1,96 @@
+import numpy as np
+import pandas as pd
+from logic.kategorien import ABGELEITETE_KATEGORIEN
+
+def _rechnungen(ledger):
+    """Maske der eingehenden Rechnungen (Buchungen, ohne Fixkosten, Simulationen, Löhne und Prognose)."""
+    incoming = ledger["Direction"].astype(str).str.lower() == "incoming"
+    if "Kategorie" not in ledger.columns:
+        return incoming
+    return incoming & ~ledger["Kategorie"].isin(ABGELEITETE_KATEGORIEN)
+
+def top_debtors(ledger, k):
+    """
+    Ermittelt die k Debitoren mit den höchsten Zahlungseingängen aus Rechnungen im Ledger.
+
+    Args:
+        ledger (pd.DataFrame): Ledger mit Details, Amount, Direction und Kategorie
+        k (int): Anzahl Debitoren
+
+    Returns:
+        list: Details-Werte der grössten Debitoren, absteigend nach Summe
+    """
+    if k <= 0 or ledger.empty:
+        return []
+    incoming = ledger[_rechnungen(ledger)]
+    totals = pd.to_numeric(incoming["Amount"], errors="coerce").abs().groupby(incoming["Details"].astype(str)).sum()
+    return totals.sort_values(ascending=False, kind="stable").head(k).index.tolist()
+
+def _daily_flows(ledger, start_date, n_days, haircut_debtors, haircut):
+    """Tägliche Einnahmen (nach Abschlägen) und übrige Zahlungsflüsse als Arrays."""
+    day_codes = (pd.to_datetime(ledger["Date"], errors="coerce").dt.normalize() - pd.Timestamp(start_date)).dt.days
+    day_codes = day_codes.fillna(-1).to_numpy(dtype=np.int64)
+    amounts = pd.to_numeric(ledger["Amount"], errors="coerce").fillna(0).to_numpy(dtype=float)
+    in_range = (day_codes >= 0) & (day_codes < n_days)
+
+    incoming = (ledger["Direction"].astype(str).str.lower() == "incoming").to_numpy()
+    if haircut_debtors:
+        # Ausfallende Debitoren zahlen nur den Anteil (1 - haircut)
+        betroffen = ledger["Details"].astype(str).isin(haircut_debtors).to_numpy() & _rechnungen(ledger).to_numpy()
+        amounts = np.where(betroffen, amounts * (1.0 - haircut), amounts)
+
+    inc = in_range & incoming
+    other = in_range & ~incoming
+    incoming_daily = np.bincount(day_codes[inc], weights=amounts[inc], minlength=n_days)
+    other_daily = np.bincount(day_codes[other], weights=amounts[other], minlength=n_days)
+    return incoming_daily, other_daily
+
+def stress_sweep(ledger, start_date, end_date, start_balance, shifts, haircut_top_k=0, haircut=1.0, floor=0.0):
+    """
+    Berechnet den Kontostand für ein ganzes Raster von Zahlungsverschiebungen in einem Durchgang.
+
+    Die Einnahmen werden nicht pro Verschiebung neu aufgebaut, sondern das tägliche Einnahmen-Array
+    wird per Index-Verschiebung für alle Rasterwerte gleichzeitig verschoben (Zahlungen, die über das
+    Ende des Zeitraums hinaus rutschen, entfallen). Optional fallen die grössten Debitoren ganz oder
+    teilweise aus.
+
+    Args:
+        ledger (pd.DataFrame): Ledger mit Date, Details, Amount (vorzeichenbehaftet) und Direction
+        start_date (date): Erster Tag des Zeitraums
+        end_date (date): Letzter Tag des Zeitraums
+        start_balance (float): Kontostand vor dem ersten Tag
+        shifts (list): Verschiebungen der Einnahmen in Tagen (positiv = später)
+        haircut_top_k (int): Anzahl der grössten Debitoren, deren Zahlungen gekürzt werden
+        haircut (float): Anteil der gekürzten Zahlungen (1.0 = Totalausfall)
+        floor (float): Schwelle für die Runway (standardmässig 0)
+
+    Returns:
+        tuple: (pd.DataFrame mit Verschiebung, Tiefststand, Tag des Tiefststands und Runway je Rasterwert,
+                np.ndarray Kontostand am Tagesende (Verschiebungen × Tage),
+                list der gekürzten Debitoren)
+    """
+    n_days = (pd.Timestamp(end_date) - pd.Timestamp(start_date)).days + 1
+    shifts = np.asarray(shifts, dtype=np.int64)
+    debtors = top_debtors(ledger, haircut_top_k)
+    incoming_daily, other_daily = _daily_flows(ledger, start_date, n_days, debtors, haircut)
+
+    # Verschobene Einnahmen für alle Rasterwerte: Tag d erhält die Einnahmen von Tag d - shift
+    source = np.arange(n_days)[None, :] - shifts[:, None]
+    valid = (source >= 0) & (source < n_days)
+    shifted = np.where(valid, incoming_daily[np.clip(source, 0, n_days - 1)], 0.0)
+
+    balances = start_balance + np.cumsum(shifted + other_daily[None, :], axis=1)
+
+    min_day = balances.argmin(axis=1)
+    below = balances < floor
+    # Runway: Tage bis zur ersten Unterschreitung (leer, wenn der Zeitraum ausreicht)
+    runway = np.where(below.any(axis=1), below.argmax(axis=1), -1)
+
+    days = pd.date_range(start=pd.Timestamp(start_date), periods=n_days, freq="D")
+    summary = pd.DataFrame({
+        "Verschiebung": shifts,
+        "Tiefststand": balances[np.arange(len(shifts)), min_day],
+        "Datum Tiefststand": days[min_day].date,
+        "Runway": pd.Series(runway).where(runway >= 0).astype("Int64")
+    })
+    return summary, balances, debtors
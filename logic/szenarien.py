@@ -0,0 +1,136 @@
+import numpy as np
+import pandas as pd
+
+def _day_codes(dates, start_date, n_days):
+    """Tagesindex relativ zum Startdatum (ausserhalb des Zeitraums: -1)."""
+    codes = (pd.to_datetime(dates, errors="coerce").dt.normalize() - pd.Timestamp(start_date)).dt.days
+    codes = codes.fillna(-1).to_numpy(dtype=np.int64)
+    return np.where((codes >= 0) & (codes < n_days), codes, -1)
+
+def _override_deltas(ledger, key_column, overrides, day_codes):
+    """Differenz zwischen neuem und geplantem Betrag für alle Ledger-Zeilen mit Anpassung."""
+    if not overrides or key_column not in ledger.columns:
+        return np.arange(0), np.arange(0.0)
+    neu = ledger[key_column].astype(str).map({str(k): float(v) for k, v in overrides.items()})
+    mask = neu.notna().to_numpy() & (day_codes >= 0)
+    # Angepasste Zeilen sind Ausgaben: neuer Betrag negativ, Differenz zum bisherigen Betrag
+    geplant = pd.to_numeric(ledger["Amount"], errors="coerce").fillna(0).to_numpy(dtype=float)
+    delta = -np.abs(neu.to_numpy(dtype=float)[mask]) - geplant[mask]
+    return day_codes[mask], delta
+
+def scenario_deltas(ledger, szenarien, start_date, end_date):
+    """
+    Berechnet die täglichen Zahlungsdifferenzen aller Szenarien gegenüber dem Basis-Ledger als Matrix.
+
+    Jedes Szenario trägt eigene Simulationszeilen sowie Anpassungen von Fixkosten (über fixkosten_id)
+    und Löhnen (über den Mitarbeiternamen) bei. Alle Differenzen werden in einem einzigen
+    bincount-Durchgang zu einer Matrix Szenario × Tag zusammengefasst.
+
+    Args:
+        ledger (pd.DataFrame): Basis-Ledger aus build_ledger (Amount vorzeichenbehaftet)
+        szenarien (list): Szenarien wie von load_szenarien
+        start_date (date): Erster Tag des Zeitraums
+        end_date (date): Letzter Tag des Zeitraums
+
+    Returns:
+        np.ndarray: Tägliche Differenzen (Szenarien × Tage)
+    """
+    n_days = (pd.Timestamp(end_date) - pd.Timestamp(start_date)).days + 1
+    n = len(szenarien)
+    ledger_days = _day_codes(ledger["Date"], start_date, n_days)
+
+    # Lohnzeilen tragen den Mitarbeiternamen in den Details ("Lohn {name}")
+    lohn_namen = pd.Series(np.nan, index=ledger.index, dtype=object)
+    if "Kategorie" in ledger.columns and "Details" in ledger.columns:
+        is_lohn = ledger["Kategorie"] == "Lohn"
+        lohn_namen[is_lohn] = ledger.loc[is_lohn, "Details"].astype(str).str.replace(r"^Lohn ", "", regex=True)
+    ledger = ledger.assign(_Mitarbeiter=lohn_namen)
+
+    scenario_idx, days, deltas = [], [], []
+    for i, szenario in enumerate(szenarien):
+        # Zusätzliche Simulationszeilen des Szenarios
+        sims = pd.DataFrame(szenario.get("simulationen") or [], columns=["date", "amount", "direction"])
+        if not sims.empty:
+            sim_days = _day_codes(sims["date"], start_date, n_days)
+            amounts = pd.to_numeric(sims["amount"], errors="coerce").fillna(0).abs().to_numpy()
+            outgoing = sims["direction"].astype(str).str.lower().to_numpy() == "outgoing"
+            valid = sim_days >= 0
+            days.append(sim_days[valid])
+            deltas.append(np.where(outgoing, -amounts, amounts)[valid])
+            scenario_idx.append(np.full(valid.sum(), i))
+
+        # Angepasste Fixkosten und Löhne
+        for key_column, overrides in [
+            ("Fixkosten_id", szenario.get("fixkosten_overrides")),
+            ("_Mitarbeiter", szenario.get("lohn_overrides"))
+        ]:
+            override_days, override_deltas = _override_deltas(ledger, key_column, overrides, ledger_days)
+            days.append(override_days)
+            deltas.append(override_deltas)
+            scenario_idx.append(np.full(len(override_days), i))
+
+    if not days:
+        return np.zeros((n, n_days))
+
+    flat = np.concatenate(scenario_idx).astype(np.int64) * n_days + np.concatenate(days).astype(np.int64)
+    weights = np.concatenate(deltas).astype(float)
+    return np.bincount(flat, weights=weights, minlength=n * n_days).reshape(n, n_days)
+
+def evaluate_scenarios(ledger, szenarien, start_date, end_date, base_balance):
+    """
+    Berechnet die Kontostandsverläufe mehrerer Szenarien auf Basis des gemeinsamen Ledgers.
+
+    Args:
+        ledger (pd.DataFrame): Basis-Ledger aus build_ledger
+        szenarien (list): Szenarien wie von load_szenarien
+        start_date (date): Erster Tag des Zeitraums
+        end_date (date): Letzter Tag des Zeitraums
+        base_balance (np.ndarray): Kontostand am Tagesende ohne Szenario (z.B. cube["D"]["end_balance"])
+
+    Returns:
+        dict: names, balances (Szenarien × Tage), min_balance, end_balance und min_day je Szenario
+    """
+    balances = np.asarray(base_balance, dtype=float)[None, :] + np.cumsum(
+        scenario_deltas(ledger, szenarien, start_date, end_date), axis=1
+    )
+    return {
+        "names": [s["name"] for s in szenarien],
+        "balances": balances,
+        "min_balance": balances.min(axis=1) if balances.shape[1] else np.zeros(len(szenarien)),
+        "min_day": balances.argmin(axis=1) if balances.shape[1] else np.zeros(len(szenarien), dtype=int),
+        "end_balance": balances[:, -1] if balances.shape[1] else np.zeros(len(szenarien))
+    }
+
+def get_scenarios(ledger, version, szenarien, szenarien_version, start_date, end_date, base_balance, cache,
+                  max_entries=4):
+    """
+    Liefert die Szenario-Auswertung aus dem Cache oder berechnet sie einmal pro Ledger- und Szenario-Version.
+
+    Args:
+        ledger (pd.DataFrame): Basis-Ledger aus build_ledger
+        version (str): Version des Ledgers
+        szenarien (list): Ausgewählte Szenarien
+        szenarien_version (str): Fingerprint der Szenario-Tabelle
+        start_date (date): Erster Tag des Zeitraums
+        end_date (date): Letzter Tag des Zeitraums
+        base_balance (np.ndarray): Kontostand am Tagesende ohne Szenario
+        cache (dict): Cache-Speicher, z.B. aus dem Session-State
+        max_entries (int): Maximale Anzahl gespeicherter Auswertungen
+
+    Returns:
+        dict: Auswertung wie von evaluate_scenarios
+    """
+    key = (version, szenarien_version, tuple(s["id"] for s in szenarien), str(start_date), str(end_date),
+           float(base_balance[0]) if len(base_balance) else 0.0)
+    if szenarien_version is not None and key in cache:
+        return cache[key]
+
+    result = evaluate_scenarios(ledger, szenarien, start_date, end_date, base_balance)
+    if szenarien_version is None:
+        return result
+
+    # Älteste Einträge verwerfen, damit der Session-State klein bleibt
+    while len(cache) >= max_entries:
+        cache.pop(next(iter(cache)))
+    cache[key] = result
+    return result
@@ -0,0 +1,23 @@
+-- Benannte Szenarien: eigene Simulationszeilen plus optionale Fixkosten- und Lohnanpassungen
+create table if not exists public.szenarien (
+    id uuid primary key default gen_random_uuid(),
+    name text not null,
+    beschreibung text,
+    -- Liste von {date, details, amount, direction}
+    simulationen jsonb not null default '[]'::jsonb,
+    -- fixkosten_id -> neuer Betrag (0 = entfällt)
+    fixkosten_overrides jsonb not null default '{}'::jsonb,
+    -- Mitarbeitername -> neuer Monatslohn (0 = entfällt)
+    lohn_overrides jsonb not null default '{}'::jsonb,
+    user_id uuid references auth.users (id),
+    created_at timestamptz not null default now(),
+    updated_at timestamptz not null default now()
+);
+
+alter table public.szenarien enable row level security;
+
+create policy "Szenarien für angemeldete Benutzer"
+    on public.szenarien for all
+    to authenticated
+    using (true)
+    with check (true);
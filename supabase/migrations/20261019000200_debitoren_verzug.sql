@@ -0,0 +1,22 @@
+-- Zahlungsverhalten je Kunde: Verzug zwischen Fälligkeit ("Zahlbar bis") und Zahlungseingang
+create table if not exists public.debitoren_verzug (
+    id uuid primary key default gen_random_uuid(),
+    kundennummer text not null unique,
+    -- Suffiziente Statistiken, damit neue Zahlungen ohne Neuberechnung ergänzt werden können
+    anzahl integer not null default 0,
+    summe_verzug numeric not null default 0,
+    summe_quadrate numeric not null default 0,
+    -- Erwarteter Verzug in Tagen (geglättet zum Durchschnitt aller Kunden)
+    verzug_tage numeric not null default 0,
+    user_id uuid references auth.users (id),
+    created_at timestamptz not null default now(),
+    updated_at timestamptz not null default now()
+);
+
+alter table public.debitoren_verzug enable row level security;
+
+create policy "Debitorenverzug für angemeldete Benutzer"
+    on public.debitoren_verzug for all
+    to authenticated
+    using (true)
+    with check (true);
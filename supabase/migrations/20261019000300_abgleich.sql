@@ -0,0 +1,24 @@
+-- Abgleich Kontoauszug -> Planung: jede Zeile markiert einen geplanten Eintrag als bezahlt
+create table if not exists public.abgleich (
+    id uuid primary key default gen_random_uuid(),
+    -- Schlüssel der Planzeile (buchung:<id>, fixkosten:<id>:<datum>, lohn:<details>:<datum>)
+    plan_key text not null unique,
+    plan_datum date,
+    plan_details text,
+    plan_betrag numeric,
+    bank_datum date not null,
+    bank_details text,
+    bank_betrag numeric not null,
+    score numeric,
+    user_id uuid references auth.users (id),
+    created_at timestamptz not null default now(),
+    updated_at timestamptz not null default now()
+);
+
+alter table public.abgleich enable row level security;
+
+create policy "Abgleich für angemeldete Benutzer"
+    on public.abgleich for all
+    to authenticated
+    using (true)
+    with check (true);
@@ -0,0 +1,36 @@
+-- Regeln zur automatischen Kategorisierung von Buchungen (Stichwort oder regulärer Ausdruck)
+create table if not exists public.kategorie_regeln (
+    id uuid primary key default gen_random_uuid(),
+    muster text not null,
+    kategorie text not null,
+    -- Höhere Priorität gewinnt, wenn mehrere Regeln auf einen Text passen
+    prioritaet integer not null default 0,
+    regex boolean not null default false,
+    aktiv boolean not null default true,
+    user_id uuid references auth.users (id),
+    created_at timestamptz not null default now(),
+    updated_at timestamptz not null default now(),
+    unique (muster, kategorie)
+);
+
+alter table public.kategorie_regeln enable row level security;
+
+create policy "Kategorisierungsregeln für angemeldete Benutzer"
+    on public.kategorie_regeln for all
+    to authenticated
+    using (true)
+    with check (true);
+
+-- Gespeicherte Kategorie je Buchung (leer = beim Aufbau des Ledgers aus den Regeln bestimmen)
+alter table public.buchungen add column if not exists kategorie text;
+
+-- Bisherige Zuordnung der Fixkosten-Analyse als Startregeln
+insert into public.kategorie_regeln (muster, kategorie, prioritaet, regex)
+values
+    ('miete', 'Miete', 30, false),
+    ('lizenz', 'Lizenzen', 20, false),
+    ('\bit\b', 'IT-Kosten', 10, true),
+    ('cloud', 'IT-Kosten', 10, false),
+    ('software', 'IT-Kosten', 10, false),
+    ('hardware', 'IT-Kosten', 10, false)
+on conflict (muster, kategorie) do nothing;
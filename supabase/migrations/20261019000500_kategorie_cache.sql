@@ -0,0 +1,18 @@
+-- Klassifikationen des Sprachmodells je normalisiertem Buchungstext (jeder Text wird nur einmal angefragt)
+create table if not exists public.kategorie_cache (
+    id uuid primary key default gen_random_uuid(),
+    text_key text not null unique,
+    kategorie text not null,
+    modell text,
+    user_id uuid references auth.users (id),
+    created_at timestamptz not null default now(),
+    updated_at timestamptz not null default now()
+);
+
+alter table public.kategorie_cache enable row level security;
+
+create policy "Klassifikationen für angemeldete Benutzer"
+    on public.kategorie_cache for all
+    to authenticated
+    using (true)
+    with check (true);
@@ -0,0 +1,29 @@
+-- Rolle, Profil und Designeinstellungen des angemeldeten Benutzers in einer Abfrage
+-- (ersetzt check_user_is_admin, profiles-Abfrage und user_settings-Abfrage beim Anmelden)
+create or replace function public.session_bootstrap(user_id_param uuid)
+returns jsonb
+language sql
+stable
+security definer
+set search_path = public
+as $$
+    select jsonb_build_object(
+        'role', p.role,
+        'is_admin', coalesce(lower(p.role) = 'admin', false),
+        'profile', to_jsonb(p),
+        'settings', (
+            select s.settings
+            from public.user_settings s
+            where s.user_id = user_id_param
+            order by s.updated_at desc nulls last
+            limit 1
+        )
+    )
+    from (select user_id_param as id) u
+    left join public.profiles p on p.id = u.id
+    -- Nur die eigene Identität ist abrufbar
+    where user_id_param = auth.uid();
+$$;
+
+revoke all on function public.session_bootstrap(uuid) from public;
+grant execute on function public.session_bootstrap(uuid) to authenticated;
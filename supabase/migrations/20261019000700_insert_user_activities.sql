@@ -0,0 +1,25 @@
+-- Sammel-Insert für Benutzeraktivitäten (ein Aufruf je Stapel statt je Aktivität)
+-- Erwartet ein JSON-Array mit Objekten {user_id, action, details, created_at}
+create or replace function public.insert_user_activities(activities jsonb)
+returns integer
+language plpgsql
+security definer
+set search_path = public
+as $$
+declare
+    anzahl integer;
+begin
+    insert into public.user_activities (user_id, action, details, created_at)
+    select
+        (a ->> 'user_id')::uuid,
+        a ->> 'action',
+        a ->> 'details',
+        coalesce((a ->> 'created_at')::timestamptz, now())
+    from jsonb_array_elements(activities) as a;
+    get diagnostics anzahl = row_count;
+    return anzahl;
+end;
+$$;
+
+revoke all on function public.insert_user_activities(jsonb) from public;
+grant execute on function public.insert_user_activities(jsonb) to anon, authenticated;
@@ -0,0 +1,4 @@
+-- Zusammengefasste Benutzeraktivitäten: Anzahl gleicher Ereignisse im Zeitfenster und letztes Auftreten
+-- (die Funktion insert_user_activities schreibt die Spalten, siehe 20261019001000_insert_user_activities_auth.sql)
+alter table public.user_activities add column if not exists event_count integer not null default 1;
+alter table public.user_activities add column if not exists last_seen_at timestamptz;
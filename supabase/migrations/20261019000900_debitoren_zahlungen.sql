@@ -0,0 +1,20 @@
+-- Bereits in debitoren_verzug eingeflossene bezahlte Rechnungen, damit ein erneuter Import
+-- derselben Rechnungsliste die Statistiken nicht doppelt zählt
+create table if not exists public.debitoren_zahlungen (
+    id uuid primary key default gen_random_uuid(),
+    -- Kundennummer und Rechnungsnummer bzw. Hash aus Kunde, Fälligkeit, Betrag und Zahlungsdatum
+    rechnung_key text not null unique,
+    kundennummer text not null,
+    -- Verzug der Zahlung in Tagen (erlaubt einen Neuaufbau der Statistiken)
+    verzug numeric not null,
+    user_id uuid references auth.users (id),
+    created_at timestamptz not null default now()
+);
+
+alter table public.debitoren_zahlungen enable row level security;
+
+create policy "Erfasste Zahlungen für angemeldete Benutzer"
+    on public.debitoren_zahlungen for all
+    to authenticated
+    using (true)
+    with check (true);
@@ -0,0 +1,41 @@
+-- Sammel-Insert der Benutzeraktivitäten absichern: kein Zugriff mit dem öffentlichen anon-Schlüssel,
+-- angemeldete Benutzer schreiben nur unter ihrer eigenen ID (auth.uid()), nur die Service-Role
+-- (serverseitiger Hintergrund-Thread) darf Aktivitäten beliebiger Benutzer in einem Stapel schreiben
+
+-- Spalten der Zusammenfassung (falls die event_count-Migration noch nicht gelaufen ist)
+alter table public.user_activities add column if not exists event_count integer not null default 1;
+alter table public.user_activities add column if not exists last_seen_at timestamptz;
+
+create or replace function public.insert_user_activities(activities jsonb)
+returns integer
+language plpgsql
+security definer
+set search_path = public
+as $$
+declare
+    anzahl integer;
+    ist_service boolean := coalesce(auth.role(), '') = 'service_role';
+begin
+    if not ist_service and auth.uid() is null then
+        raise exception 'insert_user_activities erfordert eine Anmeldung';
+    end if;
+
+    insert into public.user_activities (user_id, action, details, created_at, event_count, last_seen_at)
+    select
+        case when ist_service then (a ->> 'user_id')::uuid else auth.uid() end,
+        a ->> 'action',
+        a ->> 'details',
+        -- Zeitstempel nur von der Service-Role übernehmen, sonst Serverzeit
+        case when ist_service then coalesce((a ->> 'created_at')::timestamptz, now()) else now() end,
+        greatest(coalesce((a ->> 'event_count')::integer, 1), 1),
+        case when ist_service
+            then coalesce((a ->> 'last_seen_at')::timestamptz, (a ->> 'created_at')::timestamptz, now())
+            else now() end
+    from jsonb_array_elements(activities) as a;
+    get diagnostics anzahl = row_count;
+    return anzahl;
+end;
+$$;
+
+revoke all on function public.insert_user_activities(jsonb) from public, anon;
+grant execute on function public.insert_user_activities(jsonb) to authenticated, service_role;
@@ -0,0 +1,60 @@
+from datetime import date
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from logic.aggregation import build_cube, patch_cube
+
+START, ENDE = date(2026, 1, 1), date(2026, 3, 31)
+
+
+def _ledger(rng, n):
+    return pd.DataFrame({
+        "Date": pd.Timestamp("2025-12-20") + pd.to_timedelta(rng.integers(0, 120, n), unit="D"),
+        "Amount": rng.normal(0, 100, n),
+        "Direction": rng.choice(["Incoming", "outgoing", "Unbekannt"], n),
+        "Kategorie": rng.choice(["Standard", "Lohn", "Fixkosten", None], n),
+    })
+
+
+def _assert_cube_equal(a, b):
+    for key in "DWM":
+        assert a[key]["labels"] == b[key]["labels"]
+        np.testing.assert_allclose(a[key]["sums"], b[key]["sums"], atol=1e-9)
+        np.testing.assert_array_equal(a[key]["counts"], b[key]["counts"])
+        np.testing.assert_allclose(a[key]["end_balance"], b[key]["end_balance"], atol=1e-9)
+
+
+def test_build_cube_matches_groupby():
+    df = _ledger(np.random.default_rng(0), 500)
+    cube = build_cube(df, START, ENDE, start_balance=100.0)
+    im_zeitraum = df[(df["Date"] >= pd.Timestamp(START)) & (df["Date"] <= pd.Timestamp(ENDE))]
+    monat = im_zeitraum["Date"].dt.strftime("%Y-%m")
+    erwartet = im_zeitraum.groupby(monat)["Amount"].sum().cumsum() + 100.0
+    np.testing.assert_allclose(cube["M"]["end_balance"], erwartet.to_numpy())
+    eingang = im_zeitraum[im_zeitraum["Direction"] == "Incoming"]
+    lohn = eingang[eingang["Kategorie"] == "Lohn"].groupby(monat)["Amount"].sum()
+    k = cube["M"]["kategorien"].index("Lohn")
+    np.testing.assert_allclose(cube["M"]["sums"][:, 0, k], lohn.reindex(erwartet.index, fill_value=0).to_numpy())
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_patch_cube_matches_rebuild(seed):
+    rng = np.random.default_rng(seed)
+    df = _ledger(rng, 300)
+    entfernt = df.sample(40, random_state=seed)
+    hinzu = _ledger(rng, 30)
+    gepatcht = patch_cube(build_cube(df, START, ENDE, 500.0), START, entfernt, hinzu)
+    _assert_cube_equal(gepatcht, build_cube(pd.concat([df.drop(entfernt.index), hinzu]), START, ENDE, 500.0))
+
+
+def test_patch_cube_keeps_original_and_rejects_unknown_category():
+    df = _ledger(np.random.default_rng(9), 50)
+    cube = build_cube(df, START, ENDE)
+    vorher = cube["D"]["sums"].copy()
+    neu = pd.DataFrame({"Date": [pd.Timestamp("2026-02-01")], "Amount": [10.0], "Direction": ["Incoming"],
+                        "Kategorie": ["Neu"]})
+    assert patch_cube(cube, START, None, neu) is None
+    patch_cube(cube, START, None, neu.assign(Kategorie="Standard"))
+    np.testing.assert_array_equal(cube["D"]["sums"], vorher)
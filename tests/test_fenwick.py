@@ -0,0 +1,31 @@
+import numpy as np
+import pytest
+
+from logic.fenwick import fenwick_build, fenwick_add, fenwick_prefix
+
+
+@pytest.mark.parametrize("n", [1, 2, 7, 16, 33])
+def test_prefix_sums_match_cumsum_after_point_updates(n):
+    rng = np.random.default_rng(n)
+    values = rng.normal(0, 100, n)
+    tree = fenwick_build(values)
+    for _ in range(30):
+        index = int(rng.integers(0, n))
+        delta = float(rng.normal(0, 50))
+        fenwick_add(tree, index, delta)
+        values[index] += delta
+        erwartet = np.cumsum(values)
+        for i in range(n):
+            assert fenwick_prefix(tree, i) == pytest.approx(erwartet[i])
+
+
+def test_prefix_boundaries():
+    tree = fenwick_build([1.0, 2.0, 3.0])
+    assert fenwick_prefix(tree, -1) == 0.0
+    assert fenwick_prefix(tree, 10) == 6.0
+
+
+def test_add_ignores_negative_index():
+    tree = fenwick_build([1.0, 2.0, 3.0])
+    fenwick_add(tree, -1, 100.0)
+    assert fenwick_prefix(tree, 2) == 6.0
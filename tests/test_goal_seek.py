@@ -0,0 +1,60 @@
+from datetime import date
+
+import numpy as np
+import pytest
+
+from logic.rmq import build_sparse_table
+from logic.goal_seek import zahltag_codes, is_affordable, max_affordable_salary, earliest_start, hire_balance
+
+
+def _brute_affordable(balance, codes, erster, betrag, floor):
+    if erster >= len(codes):
+        return True
+    return hire_balance(balance, codes, erster, betrag)[codes[erster]:].min() >= floor
+
+
+def _fall(seed):
+    rng = np.random.default_rng(seed)
+    n_days = int(rng.integers(40, 200))
+    balance = 5000 + np.cumsum(rng.integers(-300, 320, n_days)).astype(float)
+    codes = np.sort(rng.choice(n_days, size=int(rng.integers(1, 7)), replace=False))
+    return balance, codes
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_is_affordable_matches_hire_balance(seed):
+    balance, codes = _fall(seed)
+    table = build_sparse_table(balance)
+    for erster in range(len(codes) + 1):
+        for betrag in [0.0, 100.0, 1000.0, 2500.0, 10000.0]:
+            for floor in [0.0, 1000.0]:
+                assert is_affordable(table, codes, erster, betrag, floor) == \
+                    _brute_affordable(balance, codes, erster, betrag, floor)
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_max_affordable_salary_is_tight(seed):
+    balance, codes = _fall(seed)
+    table = build_sparse_table(balance)
+    lohn = max_affordable_salary(table, codes, 0, floor=0.0, tolerance=1.0)
+    if lohn is None:
+        assert not _brute_affordable(balance, codes, 0, 0.0, 0.0)
+        return
+    assert _brute_affordable(balance, codes, 0, lohn, 0.0)
+    obergrenze = balance.max()
+    assert lohn == obergrenze or not _brute_affordable(balance, codes, 0, lohn + 1.0, 0.0)
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_earliest_start_matches_linear_scan(seed):
+    balance, codes = _fall(seed)
+    table = build_sparse_table(balance)
+    for betrag in [100.0, 1000.0, 3000.0]:
+        erwartet = next((e for e in range(len(codes)) if _brute_affordable(balance, codes, e, betrag, 0.0)), None)
+        assert earliest_start(table, codes, betrag) == erwartet
+
+
+def test_zahltag_codes_drops_days_outside_range():
+    codes = zahltag_codes([date(2026, 1, 25), date(2025, 12, 25), date(2026, 3, 25), date(2026, 2, 25)],
+                          date(2026, 1, 1), 59)
+    assert codes.tolist() == [24, 55]
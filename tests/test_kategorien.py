@@ -0,0 +1,93 @@
+import re
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from logic.kategorien import REGEX_FLAGS, STANDARD_KATEGORIE, compile_rules, categorize, recategorize, _text_treffer
+
+
+def _brute_categorize(details, regeln):
+    """Referenz: Regeln nach Priorität, je Text die erste passende Regel."""
+    aktive = sorted([r for r in regeln if r.get("aktiv", True)], key=lambda r: -int(r.get("prioritaet") or 0))
+    ergebnis = []
+    for text in details.fillna("").astype(str).str.replace("\n", " ", regex=False).str.lower():
+        kategorie = STANDARD_KATEGORIE
+        for regel in aktive:
+            muster = regel["muster"].strip()
+            passt = re.search(muster, text, REGEX_FLAGS) if regel.get("regex") else muster.lower() in text
+            if passt:
+                kategorie = regel["kategorie"]
+                break
+        ergebnis.append(kategorie)
+    return ergebnis
+
+
+def _regel(muster, kategorie, prioritaet, regex=False):
+    return {"muster": muster, "kategorie": kategorie, "prioritaet": prioritaet, "regex": regex, "aktiv": True}
+
+
+REGELN = [
+    _regel("miete", "Miete", 5),
+    _regel("mietzins", "Mietzins", 6),
+    _regel("swisscom", "Telefon", 3),
+    _regel("post", "Porto", 1),
+    _regel(r"\bab\b", "Wort ab", 4, regex=True),
+    _regel(r"^lohn", "Lohnzahlung", 7, regex=True),
+    _regel(r"x$", "Endet auf x", 2, regex=True),
+    _regel(r"(?i)Rechnung \d+", "Rechnung", 8, regex=True),
+    _regel(r"(\w)\1{2}", "Dreifach", 0, regex=True),
+    _regel(r"a\sb", "a b", 9, regex=True),
+]
+
+WOERTER = ["miete", "mietzins", "swisscom", "post", "ab", "abc", "lohn", "x", "rechnung 12", "aaa", "a", "b", "zins"]
+
+
+@pytest.mark.parametrize("seed", range(6))
+def test_categorize_matches_brute_force(seed):
+    rng = np.random.default_rng(seed)
+    texte = []
+    for _ in range(400):
+        woerter = rng.choice(WOERTER, size=int(rng.integers(0, 4)))
+        trenner = rng.choice([" ", "", "\n"])
+        texte.append(str(trenner).join(woerter))
+    details = pd.Series(texte + [None, "Rechnung 7", "LOHN Mai"])
+    assert categorize(details, compile_rules(REGELN)).tolist() == _brute_categorize(details, REGELN)
+
+
+def test_matches_do_not_cross_into_the_next_text():
+    # "... x" am Textende und "a b" über die Grenze dürfen im Gesamttext nicht zusammenwachsen
+    details = pd.Series(["a", "b", "miet", "e", "ab"])
+    assert categorize(details, compile_rules(REGELN)).tolist() == _brute_categorize(details, REGELN)
+
+
+def test_text_treffer_word_edges():
+    texte = ["abmiete x", "miete", "vormiete"]
+    anfaenge = np.array([0, 10, 16])
+    enden = np.array([9, 15, 24])
+    gesamt = "\n".join(texte)
+    wort = re.compile(r"\bmiete\b", REGEX_FLAGS)
+    assert _text_treffer(wort, gesamt, anfaenge, enden) == [1]
+    ende = re.compile(r"e$", REGEX_FLAGS)
+    assert _text_treffer(ende, gesamt, anfaenge, enden) == [1, 2]
+    # Ein Treffer über die Grenze ("x\nmiete") zählt nicht, der Text wird einzeln geprüft
+    grenze = re.compile(r"x\smiete", REGEX_FLAGS)
+    assert _text_treffer(grenze, gesamt, anfaenge, enden) == []
+    assert _text_treffer(wort, gesamt, anfaenge, enden, texte=[0, 1]) == [1]
+
+
+def test_invalid_and_conflicting_rules_fall_back():
+    regeln = [_regel("(", "Kaputt", 1, regex=True),
+              _regel(r"(?P<n>ab)", "Eins", 2, regex=True),
+              _regel(r"(?P<n>cd)", "Zwei", 1, regex=True)]
+    compiled = compile_rules(regeln)
+    assert compiled["ausdruecke"] is None
+    assert categorize(pd.Series(["xx cd", "ab", "zz"]), compiled).tolist() == ["Zwei", "Eins", STANDARD_KATEGORIE]
+
+
+def test_recategorize_keeps_non_rule_categories():
+    compiled = compile_rules(REGELN)
+    assert recategorize("Zahlung", "Marketing", "Zahlung", compiled) == "Marketing"
+    assert recategorize("Zahlung", "Marketing", "Andere Zahlung", compiled) == "Marketing"
+    assert recategorize("Miete Mai", "Miete", "Zahlung", compiled) == STANDARD_KATEGORIE
+    assert recategorize("Zahlung", "Marketing", "Miete Juni", compiled) == "Miete"
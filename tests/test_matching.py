@@ -0,0 +1,96 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from logic.matching import (match_transactions, find_near_duplicates, normalize_details, plan_keys,
+                            _text_similarity, _token_set_similarity)
+
+
+def _brute_match(bank, plan, amount_tolerance=1.0, relative_tolerance=0.005, date_window=10, min_score=0.45):
+    """Referenz: alle Paare bewerten, dann gleich wie match_transactions eins zu eins zuordnen."""
+    plan_days = ((pd.to_datetime(plan["Date"]) - pd.Timestamp("1970-01-01")).dt.days).to_numpy()
+    bank_days = ((pd.to_datetime(bank["Date"]) - pd.Timestamp("1970-01-01")).dt.days).to_numpy()
+    plan_amounts, bank_amounts = plan["Amount"].to_numpy(float), bank["Amount"].to_numpy(float)
+    # Gleiche Reihenfolge der Kandidaten wie match_transactions (Betrag, dann Datum)
+    order = np.lexsort((plan_days, plan_amounts))
+    zeilen = []
+    for b in range(len(bank)):
+        tol = amount_tolerance + relative_tolerance * abs(bank_amounts[b])
+        for p in order:
+            tage = abs(plan_days[p] - bank_days[b])
+            differenz = abs(plan_amounts[p] - bank_amounts[b])
+            if differenz > tol or tage > date_window:
+                continue
+            score = 0.5 * _text_similarity(bank["Details"].iloc[b], plan["Details"].iloc[p]) \
+                + 0.3 * (1 - tage / (date_window + 1)) + 0.2 * (1 - differenz / (tol + 1e-9))
+            zeilen.append((b, p, round(score, 3)))
+    zeilen = [z for z in zeilen if z[2] >= min_score]
+    zeilen.sort(key=lambda z: -z[2])
+    vergeben_bank, vergeben_plan, treffer = set(), set(), []
+    for b, p, score in zeilen:
+        if b in vergeben_bank or p in vergeben_plan:
+            continue
+        vergeben_bank.add(b)
+        vergeben_plan.add(p)
+        treffer.append((bank.index[b], plan.index[p], score))
+    return treffer
+
+
+def _buchungen(rng, n, praefix):
+    woerter = np.array(["miete", "swisscom", "lohn", "rechnung", "kunde", "post", "versicherung"])
+    return pd.DataFrame({
+        "Date": pd.Timestamp("2026-01-01") + pd.to_timedelta(rng.integers(0, 60, n), unit="D"),
+        "Details": [" ".join(rng.choice(woerter, 2)) for _ in range(n)],
+        # Wenige Beträge, damit Betragsblöcke mit mehreren Einträgen entstehen
+        "Amount": rng.choice([-500.0, -120.0, -119.5, 80.0, 1000.0, 1003.0], n),
+    }, index=[f"{praefix}{i}" for i in range(n)])
+
+
+@pytest.mark.parametrize("seed", range(6))
+def test_match_transactions_matches_all_pairs(seed):
+    rng = np.random.default_rng(seed)
+    bank, plan = _buchungen(rng, 40, "k"), _buchungen(rng, 60, "p")
+    result = match_transactions(bank, plan, min_score=0.3)
+    erwartet = _brute_match(bank, plan, min_score=0.3)
+    assert list(zip(result["bank_index"], result["plan_index"], result["Score"])) == erwartet
+
+
+def _brute_duplicates(df, threshold):
+    text = normalize_details(df["Details"])
+    tokens = [frozenset(t.split()) for t in text]
+    erstes = text.str.split(" ", n=1).str[0].fillna("").tolist()
+    betrag = (df["Amount"].abs()).round().tolist()
+    woche = ((pd.to_datetime(df["Date"]) - pd.Timestamp("1970-01-05")).dt.days // 7).tolist()
+    paare = set()
+    for i in range(len(df)):
+        for j in range(i + 1, len(df)):
+            gleicher_block = betrag[i] == betrag[j] and (woche[i] == woche[j] or erstes[i] == erstes[j])
+            if gleicher_block and _token_set_similarity(tokens[i], tokens[j]) >= threshold:
+                paare.add((df.index[i], df.index[j]))
+    return paare
+
+
+@pytest.mark.parametrize("seed", range(6))
+def test_near_duplicates_match_all_pairs(seed):
+    rng = np.random.default_rng(seed)
+    df = _buchungen(rng, 80, "b")
+    result = find_near_duplicates(df, threshold=0.5)
+    assert set(zip(result["index"], result["other_index"])) == _brute_duplicates(df, 0.5)
+
+
+def test_normalize_details_shortens_references():
+    assert normalize_details(pd.Series(["Zahlung REF 123456789, Kunde-A"])).tolist() == ["zahlung ref 1234 kunde a"]
+
+
+def test_plan_keys():
+    ledger = pd.DataFrame({
+        "Id": ["b1", None, None, None],
+        "Date": pd.to_datetime(["2026-01-05", "2026-01-31", "2026-01-25", "2026-02-01"]),
+        "Details": ["Kunde", "Miete", "Lohn Anna", "Simulation"],
+        "Kategorie": ["Beratung", "Fixkosten", "Lohn", "Simulation"],
+        "Fixkosten_id": [None, "f1", None, None],
+        "Original_date": pd.to_datetime([None, "2026-02-01", None, None]),
+    })
+    keys = plan_keys(ledger)
+    assert keys[:3].tolist() == ["buchung:b1", "fixkosten:f1:2026-02-01", "lohn:Lohn Anna:2026-01-25"]
+    assert pd.isna(keys[3])
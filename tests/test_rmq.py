@@ -0,0 +1,78 @@
+import numpy as np
+import pytest
+
+from logic.rmq import build_sparse_table, range_min, first_below, build_min_tree, tree_add, tree_min, tree_last_below
+
+
+def _brute_first_below(values, threshold, lo):
+    treffer = np.flatnonzero(values[max(lo, 0):] < threshold)
+    return int(treffer[0]) + max(lo, 0) if len(treffer) else None
+
+
+def _brute_last_below(values, threshold, lo):
+    treffer = np.flatnonzero(values[max(lo, 0):] < threshold)
+    return int(treffer[-1]) + max(lo, 0) if len(treffer) else None
+
+
+@pytest.mark.parametrize("n", [1, 2, 3, 7, 8, 9, 31])
+def test_range_min_matches_brute_force(n):
+    rng = np.random.default_rng(n)
+    # Wenige verschiedene Werte, damit gleiche Minima (früherer Tag gewinnt) vorkommen
+    values = rng.integers(-3, 4, n).astype(float)
+    table = build_sparse_table(values)
+    for lo in range(n):
+        for hi in range(lo, n):
+            minimum, idx = range_min(table, lo, hi)
+            assert minimum == values[lo:hi + 1].min()
+            assert idx == lo + int(np.argmin(values[lo:hi + 1]))
+
+
+def test_range_min_clips_and_handles_empty_range():
+    table = build_sparse_table([5.0, 1.0, 3.0])
+    assert range_min(table, -4, 10) == (1.0, 1)
+    assert range_min(table, 2, 1) == (None, None)
+    assert range_min(build_sparse_table([]), 0, 0) == (None, None)
+
+
+@pytest.mark.parametrize("n", [1, 2, 5, 8, 13, 64])
+def test_first_below_matches_brute_force(n):
+    rng = np.random.default_rng(100 + n)
+    values = rng.integers(-5, 6, n).astype(float)
+    table = build_sparse_table(values)
+    for threshold in [-6, -5, -1, 0, 0.5, 5, 6]:
+        for lo in range(-1, n + 2):
+            assert first_below(table, threshold, lo) == _brute_first_below(values, threshold, lo)
+
+
+@pytest.mark.parametrize("n", [1, 2, 3, 5, 8, 17])
+def test_min_tree_matches_brute_force_after_range_adds(n):
+    rng = np.random.default_rng(200 + n)
+    values = rng.integers(-10, 11, n).astype(float)
+    tree = build_min_tree(values)
+    for _ in range(40):
+        lo = int(rng.integers(0, n))
+        hi = int(rng.integers(lo, n + 2))
+        delta = float(rng.integers(-5, 6))
+        tree_add(tree, lo, hi, delta)
+        values[lo:hi + 1] += delta
+
+        a = int(rng.integers(0, n))
+        b = int(rng.integers(a, n))
+        assert tree_min(tree, a, b) == values[a:b + 1].min()
+        for threshold in [values.min(), values.min() + 0.5, values.max() + 1, 0.0]:
+            for start in [0, a, n - 1, n]:
+                assert tree_last_below(tree, threshold, start) == _brute_last_below(values, threshold, start)
+
+
+def test_min_tree_boundaries():
+    tree = build_min_tree([3.0, 1.0, 2.0])
+    assert tree_min(tree, 2, 1) == float("inf")
+    assert tree_min(tree, 0, 10) == 1.0
+    # Unter der Schwelle nur vor lo: kein Treffer
+    assert tree_last_below(tree, 1.5, 2) is None
+    assert tree_last_below(tree, 2.5, 0) == 2
+    # Aufgefüllte Blätter (n ist keine Zweierpotenz) zählen nie als Treffer
+    assert tree_last_below(tree, float("inf"), 0) == 2
+    tree_add(tree, 1, 1, 5.0)
+    assert tree_last_below(tree, 2.5, 0) == 2
+    assert tree_last_below(tree, 2.0, 0) is None
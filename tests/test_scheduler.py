@@ -0,0 +1,85 @@
+from datetime import date
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from logic.scheduler import default_payables, schedule_payments
+
+START, ENDE = date(2026, 1, 1), date(2026, 2, 28)
+
+
+def _ledger(rng, n):
+    tage = rng.integers(-5, 70, n)
+    richtung = rng.choice(["Incoming", "Outgoing"], n)
+    betrag = rng.integers(10, 500, n).astype(float)
+    return pd.DataFrame({
+        "Id": [f"b{i}" for i in range(n)],
+        "Date": pd.Timestamp(START) + pd.to_timedelta(tage, unit="D"),
+        "Details": [f"Posten {i}" for i in range(n)],
+        "Amount": np.where(richtung == "Outgoing", -betrag, betrag),
+        "Direction": richtung,
+        "Kategorie": rng.choice(["Standard", "Standard", "Fixkosten"], n)
+    })
+
+
+def _brute_schedule(ledger, payables, start_balance, floor):
+    """Greedy-Referenz mit vollständigem Kontostand-Array statt Segmentbaum."""
+    start = pd.Timestamp(START)
+    n_days = (pd.Timestamp(ENDE) - start).days + 1
+    planbar = ledger["Id"].isin(payables["Id"]) & (ledger["Direction"] == "Outgoing") \
+        & (ledger["Kategorie"] == "Standard")
+    balance = np.full(n_days, float(start_balance))
+    for _, row in ledger[~planbar].iterrows():
+        tag = (row["Date"].normalize() - start).days
+        if 0 <= tag < n_days:
+            balance[tag:] += row["Amount"]
+
+    def tag(wert):
+        return int(np.clip((pd.Timestamp(wert) - start).days, 0, n_days - 1))
+
+    reihenfolge = sorted(range(len(payables)), key=lambda i: (
+        -payables["Priorität"].iloc[i], tag(payables["Fällig"].iloc[i]), -payables["Betrag"].iloc[i], i))
+    vorschlag, konflikt = {}, {}
+    for i in reihenfolge:
+        betrag = payables["Betrag"].iloc[i]
+        frueh = tag(payables["Frühestens"].iloc[i])
+        spaet = max(tag(payables["Spätestens"].iloc[i]), frueh)
+        zulaessig = [d for d in range(frueh, spaet + 1) if balance[d:].min() - betrag >= floor]
+        vorschlag[i] = zulaessig[0] if zulaessig else spaet
+        konflikt[i] = not zulaessig
+        balance[vorschlag[i]:] -= betrag
+    return [vorschlag[i] for i in range(len(payables))], [konflikt[i] for i in range(len(payables))]
+
+
+@pytest.mark.parametrize("seed", range(8))
+def test_schedule_matches_brute_force(seed):
+    rng = np.random.default_rng(seed)
+    ledger = _ledger(rng, 40)
+    payables = default_payables(ledger, START, ENDE, max_delay=int(rng.integers(0, 20)))
+    payables["Priorität"] = rng.integers(0, 3, len(payables))
+    start_balance, floor = float(rng.integers(0, 2000)), float(rng.integers(0, 300))
+
+    result = schedule_payments(ledger, payables, START, ENDE, start_balance, floor=floor)
+    vorschlag, konflikt = _brute_schedule(ledger, payables, start_balance, floor)
+
+    tage = [(pd.Timestamp(v) - pd.Timestamp(START)).days for v in result["Vorschlag"]]
+    assert tage == vorschlag
+    assert result["Konflikt"].tolist() == konflikt
+
+
+def test_default_payables_excludes_derived_rows():
+    ledger = _ledger(np.random.default_rng(0), 30)
+    payables = default_payables(ledger, START, ENDE)
+    erwartet = ledger[(ledger["Direction"] == "Outgoing") & (ledger["Kategorie"] == "Standard")]
+    assert payables["Id"].tolist() == erwartet["Id"].tolist()
+    assert (pd.to_datetime(payables["Frühestens"]) >= pd.Timestamp(START)).all()
+
+
+def test_ledger_without_id_column_uses_index():
+    ledger = _ledger(np.random.default_rng(1), 20).drop(columns="Id")
+    payables = default_payables(ledger, START, ENDE)
+    result = schedule_payments(ledger, payables, START, ENDE, 1000.0)
+    assert len(result) == len(payables)
+    assert payables["Id"].tolist() == [str(i) for i in ledger.index[
+        (ledger["Direction"] == "Outgoing") & (ledger["Kategorie"] == "Standard")]]
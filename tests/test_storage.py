@@ -0,0 +1,38 @@
+import os
+
+import pytest
+
+httpx = pytest.importorskip("httpx")
+pytest.importorskip("supabase")
+
+os.environ.setdefault("SUPABASE_URL", "http://127.0.0.1:54321")
+os.environ.setdefault("SUPABASE_KEY", "test-anon-key")
+
+from core import storage
+
+
+def test_session_clients_keep_separate_authorization(monkeypatch):
+    gesendet = []
+
+    def antwort(request):
+        gesendet.append(request.headers.get("Authorization"))
+        return httpx.Response(200, json=[])
+
+    monkeypatch.setattr(storage, "_transport", httpx.MockTransport(antwort))
+    a = storage.create_session_client()
+    b = storage.create_session_client()
+    a.postgrest.auth("token-a")
+    b.postgrest.auth("token-b")
+
+    a.table("buchungen").select("*").execute()
+    b.table("buchungen").select("*").execute()
+    a.table("buchungen").select("*").execute()
+
+    assert gesendet == ["Bearer token-a", "Bearer token-b", "Bearer token-a"]
+
+
+def test_session_clients_do_not_share_http_client():
+    a = storage.create_session_client()
+    b = storage.create_session_client()
+    assert a.postgrest.session is not b.postgrest.session
+    assert a.postgrest.session is not storage.base_client.postgrest.session
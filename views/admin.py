@@ -270,6 +270,8 @@ def aktivitaetslog():
             # Datum formatieren
             if 'created_at' in df.columns:
                 df['created_at'] = pd.to_datetime(df['created_at']).dt.strftime('%d.%m.%Y %H:%M:%S')
+            if 'last_seen_at' in df.columns:
+                df['last_seen_at'] = pd.to_datetime(df['last_seen_at']).dt.strftime('%d.%m.%Y %H:%M:%S')
             
             # Benutzer-IDs durch Namen ersetzen
             if 'user_id' in df.columns:
@@ -282,7 +284,9 @@ def aktivitaetslog():
                 'created_at': 'Zeitpunkt',
                 'user': 'Benutzer',
                 'action': 'Aktion',
-                'details': 'Details'
+                'details': 'Details',
+                'event_count': 'Anzahl',
+                'last_seen_at': 'Zuletzt'
             }
             
             df = df.rename(columns={k: v for k, v in column_map.items() if k in df.columns})
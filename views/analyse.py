@@ -5,12 +5,98 @@ from datetime import datetime, date, timedelta
 from core.parsing import parse_date_swiss_fallback
 from core.utils import chf_format
 from streamlit_echarts import st_echarts
-from logic.storage_fixkosten import convert_fixkosten_to_buchungen, load_fixkosten
-from logic.storage_simulation import convert_simulationen_to_buchungen
-from logic.storage_mitarbeiter import convert_loehne_to_buchungen, get_aktuelle_loehne
-from logic.storage_buchungen import load_buchungen
+from logic.storage_fixkosten import load_fixkosten
+from logic.storage_mitarbeiter import get_aktuelle_loehne, lohn_zahltage
+from logic.aggregation import get_cube
+from logic.downsampling import downsample_window
+from logic.monte_carlo import get_risk
+from logic.szenarien import get_scenarios
+from logic.stress_test import stress_sweep
+from logic.scheduler import default_payables, schedule_payments, schedule_to_scenario
+from logic.contribution import removal_impact
+from logic.goal_seek import zahltag_codes, max_affordable_salary, earliest_start, hire_balance
+from logic.rmq import balance_index, range_min, first_below
+from logic.storage_szenarien import load_szenarien, save_szenario
+from logic.fingerprint import table_fingerprint
+from logic.ledger import get_ledger
+from logic.forecast import new_forecast_state, forecast_band
+from logic.kategorien import categorize
+from logic.storage_kategorien import get_kategorie_regeln
+from core.charts import dataset_chart, dataset_pie, cached_chart
 from core.auth import prüfe_session_gültigkeit, log_user_activity
 
+# Farben der Ausgaben-Kategorien im Monatsdiagramm
+KATEGORIE_FARBEN = {
+    "Standard": "#FFB3B3",
+    "Fixkosten": "#FFD580",
+    "Simulation": "#C8A2C8",
+    "Lohn": "#FFA07A"
+}
+
+# Standard-Punktbudget für das Tagesdiagramm
+DEFAULT_POINT_BUDGET = 500
+
+# Standardanzahl simulierter Szenarien für die Risikoanalyse
+DEFAULT_RISK_PATHS = 2000
+
+# Anzahl der standardmässig verglichenen benannten Szenarien
+MAX_DEFAULT_SZENARIEN = 10
+
+# Gibt bei Zoom-Interaktionen den sichtbaren Bereich [start, end] in Prozent zurück
+DATAZOOM_EVENT = """
+function(params) {
+    var p = params.batch ? params.batch[0] : params;
+    if (p.start === undefined || p.end === undefined) { return null; }
+    return [Math.round(p.start * 10) / 10, Math.round(p.end * 10) / 10];
+}
+"""
+
+# Anzeigetexte je Quelle des Ledgers
+QUELLEN_LABELS = {
+    "Fixkosten": "Fixkosten",
+    "Simulationen": "Simulationen",
+    "Löhne": "Lohnbuchungen",
+    "Prognose": "Prognosebuchungen"
+}
+QUELLEN_AKTIVITAETEN = {
+    "Fixkosten": "Fixkosten",
+    "Simulationen": "Simulationen",
+    "Löhne": "Lohndaten",
+    "Prognose": "Prognose"
+}
+
+# Zeithorizonte (Tage) für die Kennzahlenleiste
+KPI_HORIZONTE = [30, 60, 90]
+
+def show_kpi_strip(cube, ab_tag=0, horizonte=KPI_HORIZONTE):
+    """
+    Zeigt die Kennzahlenleiste mit dem tiefsten Kontostand je Horizont und der Runway.
+    
+    Args:
+        cube (dict): Aggregationswürfel aus get_cube
+        ab_tag (int): Index des Tages im Würfel, ab dem die Horizonte zählen
+        horizonte (list): Horizonte in Tagen
+    """
+    daily = cube["D"]
+    index = balance_index(cube)
+    cols = st.columns(len(horizonte) + 1)
+    
+    for col, tage in zip(cols, horizonte):
+        minimum, idx = range_min(index, ab_tag, ab_tag + tage - 1)
+        if minimum is None:
+            continue
+        datum = pd.Timestamp(daily["labels"][idx]).strftime("%d.%m.%Y")
+        col.metric(f"Tiefststand {tage} Tage", chf_format(minimum), help=f"Tiefster Kontostand am {datum}")
+    
+    # Runway: erster Tag mit negativem Kontostand
+    unterdeckung = first_below(index, 0.0, ab_tag)
+    if unterdeckung is None:
+        cols[-1].metric("Runway", f"> {len(daily['labels']) - ab_tag} Tage",
+                        help="Kein negativer Kontostand im Zeitraum")
+    else:
+        datum = pd.Timestamp(daily["labels"][unterdeckung]).strftime("%d.%m.%Y")
+        cols[-1].metric("Runway", f"{unterdeckung - ab_tag} Tage", help=f"Erster negativer Kontostand am {datum}")
+
 def show():
     # Authentifizierungsprüfung
     if not prüfe_session_gültigkeit():
@@ -54,7 +140,7 @@ def show():
         st.button("Aktuelle 3 Monate anzeigen", on_click=set_three_months)
     
     # Optionen für die Anzeige
-    col_options = st.columns(4)
+    col_options = st.columns(5)
     with col_options[0]:
         show_fixkosten = st.checkbox("Fixkosten einbeziehen", value=True)
     with col_options[1]:
@@ -62,366 +148,149 @@ def show():
     with col_options[2]:
         show_loehne = st.checkbox("Lohnauszahlungen einbeziehen", value=True)
     with col_options[3]:
+        show_prognose = st.checkbox("Statistische Prognose einbeziehen", value=False,
+                                    help="Ergänzt den Zeitraum nach der letzten bekannten Buchung "
+                                         "um wiederkehrende Ein- und Auszahlungsmuster aus der Vergangenheit")
+    with col_options[4]:
         show_daily_points = st.checkbox("Alle Tage anzeigen", value=True)
 
-    # Daten laden - keine Benutzerfilterung
-    if "edited_df" in st.session_state:
-        df = st.session_state.edited_df.copy()
-    else:
-        df = load_buchungen()  # Keine Benutzerfilterung
-        if df is None or df.empty:
-            # Leeren DataFrame erstellen für die weitere Verarbeitung
-            df = pd.DataFrame(columns=["date", "details", "amount", "direction"])
-    
-    # Spaltennamen normalisieren - hier verwenden wir Großbuchstaben, da das die Konvention in diesem Modul ist
-    df = df.copy()
-    df.columns = df.columns.str.capitalize()
-    
-    if not df.empty:
-        df["Date"] = pd.to_datetime(df["Date"])
-        df["Amount"] = pd.to_numeric(df["Amount"], errors="coerce")
-        # Nach Datum filtern
-        df = df[(df["Date"].dt.date >= start_date) & (df["Date"].dt.date <= end_date)]
+    # Daten laden und zusammenführen - keine Benutzerfilterung
+    base_df = st.session_state.edited_df if "edited_df" in st.session_state else None
+    # Ledger, Würfel und Diagramme werden nur neu berechnet, wenn sich der Fingerprint
+    # der Planungstabellen oder die Parameter geändert haben
+    df, quellen, version = get_ledger(
+        start_date, end_date,
+        cache=st.session_state.setdefault("ledger_cache", {}),
+        show_fixkosten=show_fixkosten,
+        show_simulationen=show_simulationen,
+        show_loehne=show_loehne,
+        user_id=user_id,  # user_id für Audit-Trails, nicht für Filterung
+        base_df=base_df,
+        # Das Prognosemodell bleibt in der Session und lernt nur neue Tage dazu
+        prognose_state=st.session_state.setdefault("prognose_state", new_forecast_state()) if show_prognose else None
+    )
     
-    df = df.sort_values("Date").reset_index(drop=True)
-
-    # Fixkosten laden, wenn aktiviert
-    if show_fixkosten:
-        try:
-            # user_id für Audit-Trails, nicht für Filterung
-            fixkosten_df = convert_fixkosten_to_buchungen(start_date, end_date, user_id=user_id)
-            
-            if not fixkosten_df.empty:
-                # Sicherstellen, dass die Spalten kompatibel sind
-                fixkosten_df.columns = fixkosten_df.columns.str.capitalize()
-                
-                # Füge eine Kategorie-Spalte hinzu
-                if "Kategorie" not in df.columns:
-                    df["Kategorie"] = "Standard"
-                
-                if "Kategorie" not in fixkosten_df.columns:
-                    fixkosten_df["Kategorie"] = "Fixkosten"
-                
-                # Sicherstellen, dass Direction immer outgoing ist für Fixkosten
-                fixkosten_df["Direction"] = "Outgoing"
-                
-                # Kombiniere die Dataframes
-                combined_df = pd.concat([df, fixkosten_df], ignore_index=True)
-                combined_df = combined_df.sort_values("Date").reset_index(drop=True)
-                
-                df = combined_df
-                st.success(f"✅ {len(fixkosten_df)} Fixkosten in die Analyse integriert")
-                
-                # Aktivität protokollieren
-                log_user_activity("Fixkosten in Analyse integriert", {"anzahl": len(fixkosten_df)})
-        except Exception as e:
-            st.error(f"❌ Fehler beim Laden der Fixkosten: {e}")
-
-    # Simulationen laden, wenn aktiviert
-    if show_simulationen:
-        try:
-            # user_id für Audit-Trails, nicht für Filterung
-            simulation_df = convert_simulationen_to_buchungen(user_id=user_id)
-            
-            if not simulation_df.empty:
-                # Spaltennamen normalisieren
-                simulation_df.columns = simulation_df.columns.str.capitalize()
-                
-                # Nach Datum filtern
-                simulation_df["Date"] = pd.to_datetime(simulation_df["Date"])
-                simulation_df = simulation_df[(simulation_df["Date"].dt.date >= start_date) & 
-                                             (simulation_df["Date"].dt.date <= end_date)]
-                
-                if "Kategorie" not in df.columns:
-                    df["Kategorie"] = "Standard"
-                
-                if "Kategorie" not in simulation_df.columns:
-                    simulation_df["Kategorie"] = "Simulation"
-                
-                # Kombiniere die Dataframes
-                combined_df = pd.concat([df, simulation_df], ignore_index=True)
-                combined_df = combined_df.sort_values("Date").reset_index(drop=True)
-                
-                df = combined_df
-                st.success(f"✅ {len(simulation_df)} Simulationen in die Analyse integriert")
-                
-                # Aktivität protokollieren
-                log_user_activity("Simulationen in Analyse integriert", {"anzahl": len(simulation_df)})
-        except Exception as e:
-            st.error(f"❌ Fehler beim Laden der Simulationen: {e}")
-
-    # Lohndaten laden, wenn aktiviert
-    if show_loehne:
-        try:
-            # user_id für Audit-Trails, nicht für Filterung
-            lohn_df = convert_loehne_to_buchungen(start_date, end_date, user_id=user_id)
+    # Rückmeldung je integrierter Quelle
+    for quelle, ergebnis in quellen.items():
+        if isinstance(ergebnis, Exception):
+            st.error(f"❌ Fehler beim Laden der {QUELLEN_AKTIVITAETEN[quelle]}: {ergebnis}")
+        else:
+            st.success(f"✅ {ergebnis} {QUELLEN_LABELS[quelle]} in die Analyse integriert")
             
-            if not lohn_df.empty:
-                # Spaltennamen normalisieren
-                lohn_df.columns = lohn_df.columns.str.capitalize()
-                
-                if "Kategorie" not in df.columns:
-                    df["Kategorie"] = "Standard"
-                
-                if "Kategorie" not in lohn_df.columns:
-                    lohn_df["Kategorie"] = "Lohn"
-                
-                # Sicherstellen, dass Direction immer outgoing ist für Löhne
-                lohn_df["Direction"] = "Outgoing"
-                
-                # KORREKTUR: Sicherstellen, dass keine "modified" Spalte existiert bei Lohnbuchungen
-                if "modified" in lohn_df.columns:
-                    lohn_df = lohn_df.drop(columns=["modified"])
-                
-                # Kombiniere die Dataframes
-                combined_df = pd.concat([df, lohn_df], ignore_index=True)
-                combined_df = combined_df.sort_values("Date").reset_index(drop=True)
-                
-                df = combined_df
-                st.success(f"✅ {len(lohn_df)} Lohnbuchungen in die Analyse integriert")
-                
-                # Aktivität protokollieren
-                log_user_activity("Lohndaten in Analyse integriert", {"anzahl": len(lohn_df)})
-        except Exception as e:
-            st.error(f"❌ Fehler beim Laden der Lohndaten: {e}")
+            # Aktivität protokollieren
+            log_user_activity(f"{QUELLEN_AKTIVITAETEN[quelle]} in Analyse integriert", {"anzahl": ergebnis})
 
     # Wenn nach dem Laden immer noch keine Daten vorhanden sind
     if df.empty:
         st.warning("Keine Daten für die Analyse verfügbar.")
         return
-
-    # Rest der Funktion bleibt unverändert...
-    # Beträge entsprechend der Richtung anpassen
-    df["Amount"] = df.apply(
-        lambda row: -abs(float(row["Amount"])) if row["Direction"].lower() == "outgoing" else abs(float(row["Amount"])),
-        axis=1
-    )
     
     start_balance = st.session_state.get("start_balance", 0)
     
-    # Kontostand berechnen (nach Datum sortiert)
-    df_sorted = df.sort_values("Date").reset_index(drop=True)
-    df_sorted["Kontostand"] = df_sorted["Amount"].cumsum() + start_balance
+    # Aggregationswürfel einmal pro Ledger-Version berechnen und für alle Widgets verwenden
+    cube = get_cube(
+        df, version, start_date, end_date, start_balance,
+        cache=st.session_state.setdefault("cube_cache", {})
+    )
     
-    # Sortierte Indizes auf ursprüngliche Sortierung anwenden
-    kontostand_mapping = dict(zip(df_sorted.index, df_sorted["Kontostand"]))
-    df["Kontostand"] = df.index.map(kontostand_mapping)
+    # Fertige Diagramm-Optionen werden pro Ledger-Version und Parametern wiederverwendet
+    chart_cache = st.session_state.setdefault("chart_cache", {})
+
+    # Kennzahlen ab heute (bzw. ab Beginn des Zeitraums, falls dieser in der Zukunft liegt)
+    ab_tag = (date.today() - start_date).days if start_date <= date.today() <= end_date else 0
+    show_kpi_strip(cube, ab_tag=ab_tag)
 
     # NEUE FEATURE: Monatliche Übersicht (aus planung.py übernommen und angepasst)
     st.subheader("💰 Monatliche Übersicht")
     
-    if not df.empty:
-        # Monatlich gruppieren
-        df["Month"] = df["Date"].dt.strftime("%Y-%m")
-        monthly_summary = df.groupby(["Month", "Direction"])["Amount"].sum().unstack().fillna(0)
+    monthly = cube["M"]
+    incoming_idx = monthly["directions"].index("incoming")
+    outgoing_idx = monthly["directions"].index("outgoing")
+    
+    if monthly["counts"][:, incoming_idx, :].any() and monthly["counts"][:, outgoing_idx, :].any():
+        # Saldo berechnen (outgoing ist bereits negativ)
+        monthly_summary = pd.DataFrame({
+            "Incoming": monthly["sums"][:, incoming_idx, :].sum(axis=1),
+            "Outgoing": monthly["sums"][:, outgoing_idx, :].sum(axis=1)
+        }, index=pd.Index(monthly["labels"], name="Month"))
+        monthly_summary["Saldo"] = monthly_summary["Incoming"] + monthly_summary["Outgoing"]
         
-        if "Incoming" in monthly_summary.columns and "Outgoing" in monthly_summary.columns:
-            # Saldo berechnen (outgoing ist bereits negativ)
-            monthly_summary["Saldo"] = monthly_summary["Incoming"] + monthly_summary["Outgoing"]
-            
-            # Formatierung
-            formatted_summary = monthly_summary.copy()
-            for col in formatted_summary.columns:
-                formatted_summary[col] = formatted_summary[col].apply(chf_format)
-            
-            # Anzeige der monatlichen Übersicht
-            st.dataframe(
-                formatted_summary.rename(columns={
-                    "Incoming": "Einnahmen",
-                    "Outgoing": "Ausgaben"
-                }), 
-                use_container_width=True
-            )
+        # Formatierung
+        formatted_summary = monthly_summary.copy()
+        for col in formatted_summary.columns:
+            formatted_summary[col] = formatted_summary[col].apply(chf_format)
+        
+        # Anzeige der monatlichen Übersicht
+        st.dataframe(
+            formatted_summary.rename(columns={
+                "Incoming": "Einnahmen",
+                "Outgoing": "Ausgaben"
+            }), 
+            use_container_width=True
+        )
     
     
     # Monatsübersicht
     st.subheader("💡 Monatsübersicht (Diagramm)")
-    df["Monat"] = df["Date"].dt.to_period("M").astype(str)
     
     try:
-        # Unterscheidung zwischen Fixkosten, Simulationen, Löhnen und anderen Buchungen
-        if "Kategorie" in df.columns:
-            monthly = df.groupby(["Monat", "Direction", "Kategorie"])["Amount"].sum().unstack().fillna(0)
-            
-            months = sorted(df["Monat"].unique().tolist())
-            
-            # Separate Darstellung für verschiedene Kategorien
-            incoming = []
-            outgoing_standard = []
-            outgoing_fixkosten = []
-            outgoing_simulation = []
-            outgoing_lohn = []
-            kontostand = []
+        # Monatsebene des Würfels (Monat × Richtung × Kategorie)
+        def build_monthly_chart():
+            months = monthly["labels"]
             
-            # Temporärer DataFrame für Kontostand-Berechnung
-            temp_df = df.sort_values("Date").copy()
-            temp_df["running_total"] = temp_df["Amount"].cumsum() + start_balance
-            
-            for month in months:
-                # Einnahmen (alle Kategorien zusammen)
-                month_incoming = df[(df["Monat"] == month) & (df["Direction"].str.lower() == "incoming")]["Amount"].sum()
-                incoming.append(month_incoming)
-                
-                # Ausgaben nach Kategorien
-                month_outgoing_standard = abs(df[(df["Monat"] == month) & 
-                                           (df["Direction"].str.lower() == "outgoing") & 
-                                           (df["Kategorie"] == "Standard")]["Amount"].sum())
-                outgoing_standard.append(month_outgoing_standard)
-                
-                month_outgoing_fixkosten = abs(df[(df["Monat"] == month) & 
-                                            (df["Direction"].str.lower() == "outgoing") & 
-                                            (df["Kategorie"] == "Fixkosten")]["Amount"].sum())
-                outgoing_fixkosten.append(month_outgoing_fixkosten)
-                
-                month_outgoing_simulation = abs(df[(df["Monat"] == month) & 
-                                             (df["Direction"].str.lower() == "outgoing") & 
-                                             (df["Kategorie"] == "Simulation")]["Amount"].sum())
-                outgoing_simulation.append(month_outgoing_simulation)
-                
-                month_outgoing_lohn = abs(df[(df["Monat"] == month) & 
-                                        (df["Direction"].str.lower() == "outgoing") & 
-                                        (df["Kategorie"] == "Lohn")]["Amount"].sum())
-                outgoing_lohn.append(month_outgoing_lohn)
-                
-                # Letzter Kontostand des Monats
-                month_end = temp_df[temp_df["Monat"] == month]["running_total"].iloc[-1] if len(temp_df[temp_df["Monat"] == month]) > 0 else (kontostand[-1] if kontostand else start_balance)
-                kontostand.append(month_end)
-            
-            # Erweitertes Chart mit allen Kategorien
-            chart = {
-                "tooltip": {"trigger": "axis"},
-                "legend": {
-                    "data": ["Einnahmen", "Ausgaben (Standard)", "Ausgaben (Fixkosten)", 
-                             "Ausgaben (Simulation)", "Ausgaben (Lohn)", "Kontostand"]
-                },
-                "xAxis": {"type": "category", "data": months},
-                "yAxis": {"type": "value"},
-                "toolbox": {
-                    "feature": {
-                        "dataZoom": {
-                            "yAxisIndex": "none"
-                        },
-                        "restore": {},
-                        "saveAsImage": {}
-                    }
-                },
-                "dataZoom": [
-                    {
-                        "type": "inside",
-                        "start": 0,
-                        "end": 100
-                    },
-                    {
-                        "start": 0,
-                        "end": 100
-                    }
-                ],
-                "series": [
-                    {
-                        "name": "Einnahmen", 
-                        "type": "bar", 
-                        "stack": "total", 
-                        "itemStyle": {"color": "#B7E4C7"}, 
-                        "data": incoming
-                    },
-                    {
-                        "name": "Ausgaben (Standard)", 
-                        "type": "bar", 
-                        "stack": "total", 
-                        "itemStyle": {"color": "#FFB3B3"}, 
-                        "data": [-x for x in outgoing_standard]  # Negative Werte für die Darstellung
-                    },
-                    {
-                        "name": "Ausgaben (Fixkosten)", 
-                        "type": "bar", 
-                        "stack": "total", 
-                        "itemStyle": {"color": "#FFD580"}, 
-                        "data": [-x for x in outgoing_fixkosten]  # Negative Werte für die Darstellung
-                    },
-                    {
-                        "name": "Ausgaben (Simulation)", 
-                        "type": "bar", 
-                        "stack": "total", 
-                        "itemStyle": {"color": "#C8A2C8"}, 
-                        "data": [-x for x in outgoing_simulation]  # Negative Werte für die Darstellung
-                    },
-                    {
-                        "name": "Ausgaben (Lohn)", 
-                        "type": "bar", 
-                        "stack": "total", 
-                        "itemStyle": {"color": "#FFA07A"}, 
-                        "data": [-x for x in outgoing_lohn]  # Negative Werte für die Darstellung
-                    },
-                    {
-                        "name": "Kontostand", 
-                        "type": "line", 
-                        "smooth": True, 
-                        "symbol": "circle", 
-                        "symbolSize": 10,
-                        "lineStyle": {"width": 3}, 
-                        "itemStyle": {"color": "#6666CC"}, 
-                        "data": kontostand
-                    }
-                ]
+            # Einnahmen (alle Kategorien zusammen)
+            columns = {
+                "Monat": months,
+                "Einnahmen": monthly["sums"][:, incoming_idx, :].sum(axis=1)
             }
+            series = [
+                {"name": "Einnahmen", "type": "bar", "stack": "total", "itemStyle": {"color": "#B7E4C7"}}
+            ]
             
-            # Fokus auf die ersten 3 Monate für die Standardansicht
-            if len(months) > 3:
-                chart["dataZoom"][0]["end"] = int(3 / len(months) * 100)
-                chart["dataZoom"][1]["end"] = int(3 / len(months) * 100)
-            
-            st_echarts(options=chart, height="500px")
+            # Ausgaben nach Kategorien (bereits negativ für die Darstellung)
+            for k, kategorie in enumerate(monthly["kategorien"]):
+                outgoing = monthly["sums"][:, outgoing_idx, k]
+                # Zusätzliche Kategorien nur anzeigen, wenn sie Ausgaben enthalten
+                if kategorie not in KATEGORIE_FARBEN and not outgoing.any():
+                    continue
+                name = f"Ausgaben ({kategorie})"
+                columns[name] = outgoing
+                series.append({
+                    "name": name, 
+                    "type": "bar", 
+                    "stack": "total", 
+                    "itemStyle": {"color": KATEGORIE_FARBEN.get(kategorie, "#D3D3D3")}
+                })
             
-            # Aktivität protokollieren
-            log_user_activity("Monatsübersicht angesehen", {
-                "zeitraum": f"{start_date} bis {end_date}",
-                "kategorien": ["Einnahmen", "Ausgaben (Standard)", "Ausgaben (Fixkosten)", 
-                               "Ausgaben (Simulation)", "Ausgaben (Lohn)", "Kontostand"]
+            # Letzter Kontostand des Monats
+            columns["Kontostand"] = monthly["end_balance"]
+            series.append({
+                "name": "Kontostand", 
+                "type": "line", 
+                "smooth": True, 
+                "symbol": "circle", 
+                "symbolSize": 10,
+                "lineStyle": {"width": 3}, 
+                "itemStyle": {"color": "#6666CC"}
             })
-        else:
-            # Fallback ohne Kategorien
-            monthly = df.groupby(["Monat", "Direction"])["Amount"].sum().unstack().fillna(0)
-            months = monthly.index.tolist()
-            incoming = monthly.get("Incoming", pd.Series(0, index=months)).tolist()
-            outgoing = monthly.get("Outgoing", pd.Series(0, index=months)).tolist()
-            kontostand = df.groupby("Monat")["Kontostand"].last().tolist()
-            
-            chart = {
-                "tooltip": {"trigger": "axis"},
-                "legend": {"data": ["Einnahmen", "Ausgaben", "Kontostand"]},
-                "xAxis": {"type": "category", "data": months},
-                "yAxis": {"type": "value"},
-                "toolbox": {
-                    "feature": {
-                        "dataZoom": {"yAxisIndex": "none"},
-                        "restore": {},
-                        "saveAsImage": {}
-                    }
-                },
-                "dataZoom": [
-                    {"type": "inside", "start": 0, "end": 100},
-                    {"start": 0, "end": 100}
-                ],
-                "series": [
-                    {"name": "Einnahmen", "type": "bar", "stack": "total", "itemStyle": {"color": "#B7E4C7"}, "data": incoming},
-                    {"name": "Ausgaben", "type": "bar", "stack": "total", "itemStyle": {"color": "#FFB3B3"}, "data": outgoing},
-                    {"name": "Kontostand", "type": "line", "smooth": True, "symbol": "circle", "symbolSize": 10,
-                     "lineStyle": {"width": 3}, "itemStyle": {"color": "#6666CC"}, "data": kontostand}
-                ]
-            }
             
             # Fokus auf die ersten 3 Monate für die Standardansicht
-            if len(months) > 3:
-                chart["dataZoom"][0]["end"] = int(3 / len(months) * 100)
-                chart["dataZoom"][1]["end"] = int(3 / len(months) * 100)
-                
-            st_echarts(options=chart, height="500px")
-            
-            # Aktivität protokollieren
-            log_user_activity("Monatsübersicht angesehen", {
-                "zeitraum": f"{start_date} bis {end_date}",
-                "kategorien": ["Einnahmen", "Ausgaben", "Kontostand"]
-            })
+            zoom_end = int(3 / len(months) * 100) if len(months) > 3 else 100
+            return dataset_chart(columns, "Monat", series, zoom=(0, zoom_end))
+        
+        chart = cached_chart(
+            chart_cache, version, "monatsuebersicht",
+            {"start": start_date, "end": end_date, "start_balance": start_balance},
+            build_monthly_chart
+        )
+        
+        st_echarts(options=chart, height="500px")
+        
+        # Aktivität protokollieren
+        log_user_activity("Monatsübersicht angesehen", {
+            "zeitraum": f"{start_date} bis {end_date}",
+            "kategorien": [s["name"] for s in chart["series"]]
+        })
     except Exception as e:
         st.error(f"Fehler bei der Monatsübersicht: {e}")
         st.info("Überspringe Monatsübersicht aufgrund von Datenstruktur-Problemen.")
@@ -430,52 +299,52 @@ def show():
         # Tagesverlauf
         st.subheader("📅 Tagesgenaue Liquiditätsentwicklung")
         
-        # Erzeuge vollständige Tagesreihe für den ausgewählten Zeitraum
-        if show_daily_points:
-            date_range = pd.date_range(start=start_date, end=end_date, freq='D')
-            daily_df = pd.DataFrame({'Date': date_range})
-            
-            # Kombiniere mit vorhandenen Daten
-            df_temp = df.copy()
-            df_temp["Date"] = pd.to_datetime(df_temp["Date"]).dt.date
-            daily_sum = df_temp.groupby(df_temp["Date"])["Amount"].sum().reset_index()
-            daily_sum["Date"] = pd.to_datetime(daily_sum["Date"])
-            
-            # Left join mit dem Datumsreihen-DataFrame
-            daily_df = daily_df.merge(daily_sum, on="Date", how="left").fillna(0)
-            
-            # Kontostand berechnen
-            daily_df["Amount_cumsum"] = daily_df["Amount"].cumsum()
-            daily_df["Kontostand"] = daily_df["Amount_cumsum"] + start_balance
-            
-            # NaN-Werte mit dem zuletzt gültigen Wert füllen (FutureWarning behoben)
-            daily_df["Kontostand"] = daily_df["Kontostand"].ffill().fillna(start_balance)
-        else:
+        # Tagesebene des Würfels: vollständige Tagesreihe für den ausgewählten Zeitraum
+        daily = cube["D"]
+        day_offsets = np.arange(len(daily["labels"]))
+        balances = daily["end_balance"]
+        
+        if not show_daily_points:
             # Nur Tage mit tatsächlichen Buchungen anzeigen
-            df_daily = df.groupby("Date").agg({"Amount": "sum", "Kontostand": "last"}).reset_index()
-            daily_df = df_daily.copy()
-            
-        daily_df["Datum"] = daily_df["Date"].dt.strftime("%Y-%m-%d")
+            has_bookings = daily["counts"].sum(axis=(1, 2)) > 0
+            day_offsets = day_offsets[has_bookings]
+            balances = balances[has_bookings]
+        
+        # Punktbudget für das Diagramm (Tiefpunkte bleiben beim Ausdünnen immer erhalten)
+        point_budget = st.number_input(
+            "Maximale Anzahl Datenpunkte im Diagramm",
+            min_value=100, max_value=5000, value=DEFAULT_POINT_BUDGET, step=100,
+            key="daily_point_budget"
+        )
+        
+        # Zoombereich aus der letzten Interaktion übernehmen (pro Zeitraum gespeichert)
+        total_days = len(daily["labels"])
+        zoom_key = f"daily_zoom_{start_date}_{end_date}"
+        zoom_event = st.session_state.get("daily_chart")
+        if zoom_event and zoom_event != st.session_state.get("daily_zoom_seen"):
+            st.session_state.daily_zoom_seen = zoom_event
+            st.session_state[zoom_key] = tuple(zoom_event)
+        
+        # Fokus auf die ersten 90 Tage (3 Monate) für die Standardansicht
+        default_zoom = (0, int(90 / total_days * 100) if total_days > 90 else 100)
+        zoom_start, zoom_end = st.session_state.get(zoom_key, default_zoom)
+        
+        # Sichtbarer Bereich in voller Auflösung (bis zum Budget), Rest ausgedünnt
+        keep = downsample_window(day_offsets, balances, zoom_start, zoom_end, point_budget)
+        
+        if len(keep) < len(balances):
+            st.caption(f"Angezeigt werden {len(keep)} von {len(balances)} Tagen. "
+                       f"Beim Hineinzoomen wird der sichtbare Bereich in voller Auflösung geladen.")
 
         # Erweiterte Optionen für das Tagesdiagramm
-        daily_chart = {
-            "tooltip": {"trigger": "axis"},
-            "xAxis": {"type": "category", "data": daily_df["Datum"].tolist(), "axisLabel": {"rotate": 45}},
-            "yAxis": {"type": "value"},
-            "toolbox": {
-                "feature": {
-                    "dataZoom": {"yAxisIndex": "none"},
-                    "restore": {},
-                    "saveAsImage": {}
-                }
-            },
-            "dataZoom": [
-                {"type": "inside", "start": 0, "end": 100},
-                {"start": 0, "end": 100}
-            ],
-            "series": [
+        def build_daily_chart():
+            columns = {
+                "Datum": [daily["labels"][i] for i in day_offsets[keep]],
+                "Kontostand": balances[keep]
+            }
+            series = [
                 {
-                    "data": daily_df["Kontostand"].tolist(),
+                    "name": "Kontostand",
                     "type": "line",
                     "smooth": True,
                     "symbol": "circle",
@@ -494,15 +363,27 @@ def show():
                     }
                 }
             ]
-        }
+            return dataset_chart(
+                columns, "Datum", series, x_type="time", zoom=(zoom_start, zoom_end),
+                extra={"xAxis": {"type": "time", "axisLabel": {"rotate": 45}}, "legend": {"show": False}}
+            )
         
-        # Fokus auf die ersten 90 Tage (3 Monate) für die Standardansicht
-        total_days = len(daily_df["Datum"].tolist())
-        if total_days > 90:
-            daily_chart["dataZoom"][0]["end"] = int(90 / total_days * 100)
-            daily_chart["dataZoom"][1]["end"] = int(90 / total_days * 100)
+        daily_chart = cached_chart(
+            chart_cache, version, "tagesverlauf",
+            {
+                "start": start_date, "end": end_date, "start_balance": start_balance,
+                "alle_tage": show_daily_points, "budget": point_budget, "zoom": [zoom_start, zoom_end]
+            },
+            build_daily_chart
+        )
             
-        st_echarts(options=daily_chart, height="500px")
+        # Zoom-Ereignisse liefern den sichtbaren Bereich in Prozent zurück
+        st_echarts(
+            options=daily_chart,
+            height="500px",
+            events={"datazoom": DATAZOOM_EVENT},
+            key="daily_chart"
+        )
         
         # Aktivität protokollieren
         log_user_activity("Tagesgenaue Liquiditätsentwicklung angesehen", {"zeitraum": f"{start_date} bis {end_date}"})
@@ -510,6 +391,406 @@ def show():
         st.error(f"Fehler bei der Tagesentwicklung: {e}")
         st.info("Überspringe Tagesentwicklung aufgrund von Datenstruktur-Problemen.")
     
+    if show_prognose:
+        try:
+            # Unsicherheit der Prognose als Band um den erwarteten Kontostand
+            band = forecast_band(df, start_date, end_date)
+            if band[-1] > 0:
+                st.subheader("🔮 Statistische Prognose")
+                daily = cube["D"]
+                prognose_chart = cached_chart(
+                    chart_cache, version, "prognose_band",
+                    {"start": start_date, "end": end_date, "start_balance": start_balance},
+                    lambda: dataset_chart(
+                        {
+                            "Datum": daily["labels"],
+                            "Untergrenze": daily["end_balance"] - band,
+                            "Bandbreite": 2 * band,
+                            "Erwarteter Kontostand": daily["end_balance"]
+                        },
+                        "Datum",
+                        [
+                            {"name": "Untergrenze", "type": "line", "symbol": "none", "stack": "band",
+                             "lineStyle": {"opacity": 0}},
+                            {"name": "Bandbreite", "type": "line", "symbol": "none", "stack": "band",
+                             "lineStyle": {"opacity": 0}, "areaStyle": {"color": "rgba(145, 204, 117, 0.3)"}},
+                            {"name": "Erwarteter Kontostand", "type": "line", "symbol": "none",
+                             "lineStyle": {"width": 2, "color": "#4A90E2"}, "itemStyle": {"color": "#4A90E2"}}
+                        ],
+                        x_type="time", zoom=(0, 100),
+                        extra={"legend": {"data": ["Bandbreite", "Erwarteter Kontostand"]}}
+                    )
+                )
+                st_echarts(options=prognose_chart, height="400px")
+                st.caption(f"80-%-Band der Prognose; Unsicherheit am Ende des Zeitraums ±{chf_format(band[-1])}.")
+        except Exception as e:
+            st.error(f"Fehler bei der Prognose: {e}")
+            st.info("Überspringe Prognose aufgrund von Datenstruktur-Problemen.")
+    
+    try:
+        # Benannte Szenarien im Vergleich zum Basisverlauf
+        szenarien_version = table_fingerprint("szenarien")
+        if szenarien_version is None or st.session_state.get("szenarien_version") != szenarien_version:
+            st.session_state.szenarien = load_szenarien()
+            st.session_state.szenarien_version = szenarien_version
+        szenarien = st.session_state.szenarien
+        
+        if szenarien:
+            st.subheader("🧭 Szenarienvergleich")
+            szenarien_by_id = {s["id"]: s for s in szenarien}
+            auswahl = st.multiselect(
+                "Szenarien vergleichen",
+                list(szenarien_by_id),
+                default=list(szenarien_by_id)[:MAX_DEFAULT_SZENARIEN],
+                format_func=lambda szenario_id: szenarien_by_id[szenario_id]["name"],
+                key="szenarien_auswahl"
+            )
+            
+            if auswahl:
+                daily = cube["D"]
+                ergebnis = get_scenarios(
+                    df, version, [szenarien_by_id[i] for i in auswahl], szenarien_version,
+                    start_date, end_date, daily["end_balance"],
+                    cache=st.session_state.setdefault("szenarien_cache", {})
+                )
+                
+                # Kennzahlen je Szenario
+                vergleich = pd.DataFrame({
+                    "Szenario": ergebnis["names"],
+                    "Tiefster Kontostand": [chf_format(v) for v in ergebnis["min_balance"]],
+                    "am": [daily["labels"][i] for i in ergebnis["min_day"]],
+                    "Kontostand Ende": [chf_format(v) for v in ergebnis["end_balance"]],
+                    "Differenz zur Basis": [chf_format(v - daily["end_balance"][-1]) for v in ergebnis["end_balance"]]
+                })
+                st.dataframe(vergleich, use_container_width=True, hide_index=True)
+                
+                def build_szenarien_chart():
+                    columns = {"Datum": daily["labels"], "Basis": daily["end_balance"]}
+                    series = [{"name": "Basis", "type": "line", "symbol": "none",
+                               "lineStyle": {"width": 3, "color": "#4A90E2"}, "itemStyle": {"color": "#4A90E2"}}]
+                    for name, balances in zip(ergebnis["names"], ergebnis["balances"]):
+                        # Gleichnamige Szenarien unterscheidbar halten
+                        spalte = name if name not in columns else f"{name} ({len(columns)})"
+                        columns[spalte] = balances
+                        series.append({"name": spalte, "type": "line", "symbol": "none", "lineStyle": {"width": 2}})
+                    return dataset_chart(columns, "Datum", series, x_type="time", zoom=(0, 100))
+                
+                szenarien_chart = cached_chart(
+                    chart_cache, version, "szenarienvergleich",
+                    {"start": start_date, "end": end_date, "start_balance": start_balance,
+                     "szenarien": auswahl, "szenarien_version": szenarien_version},
+                    build_szenarien_chart
+                )
+                st_echarts(options=szenarien_chart, height="500px")
+                
+                # Aktivität protokollieren
+                log_user_activity("Szenarienvergleich angesehen", {
+                    "zeitraum": f"{start_date} bis {end_date}",
+                    "szenarien": ergebnis["names"]
+                })
+    except Exception as e:
+        st.error(f"Fehler beim Szenarienvergleich: {e}")
+        st.info("Überspringe Szenarienvergleich aufgrund von Datenstruktur-Problemen.")
+    
+    try:
+        # Stresstest: verspätete Zahlungseingänge und Ausfall der grössten Debitoren
+        st.subheader("🧯 Stresstest Zahlungseingänge")
+        
+        col_stress = st.columns(4)
+        with col_stress[0]:
+            max_shift = st.number_input("Maximale Verspätung (Tage)", min_value=0, max_value=180,
+                                        value=60, step=5, key="stress_max_shift")
+        with col_stress[1]:
+            shift_step = st.number_input("Schrittweite (Tage)", min_value=1, max_value=60,
+                                         value=15, step=1, key="stress_step")
+        with col_stress[2]:
+            top_k = st.number_input("Ausfall der grössten Debitoren", min_value=0, max_value=20,
+                                    value=0, step=1, key="stress_top_k")
+        with col_stress[3]:
+            haircut = st.number_input("Ausfallquote (%)", min_value=0, max_value=100,
+                                      value=100, step=10, key="stress_haircut")
+        
+        shifts = list(range(0, int(max_shift) + 1, int(shift_step)))
+        stress_summary, _, stress_debtors = stress_sweep(
+            df, start_date, end_date, start_balance, shifts,
+            haircut_top_k=int(top_k), haircut=haircut / 100
+        )
+        
+        if stress_debtors:
+            st.caption("Gekürzte Debitoren: " + ", ".join(stress_debtors))
+        
+        stress_display = stress_summary.copy()
+        stress_display["Verschiebung"] = stress_display["Verschiebung"].apply(lambda d: f"+{d} Tage")
+        stress_display["Tiefststand"] = stress_display["Tiefststand"].apply(chf_format)
+        stress_display["Datum Tiefststand"] = stress_display["Datum Tiefststand"].apply(lambda d: d.strftime("%d.%m.%Y"))
+        stress_display["Runway"] = stress_display["Runway"].apply(
+            lambda r: "ausreichend" if pd.isna(r) else f"{int(r)} Tage"
+        )
+        st.dataframe(stress_display, use_container_width=True, hide_index=True)
+        
+        stress_chart = cached_chart(
+            chart_cache, version, "stresstest",
+            {"start": start_date, "end": end_date, "start_balance": start_balance,
+             "shifts": shifts, "top_k": int(top_k), "haircut": haircut},
+            lambda: dataset_chart(
+                {
+                    "Verspätung": [f"+{d} Tage" for d in stress_summary["Verschiebung"]],
+                    "Tiefststand": stress_summary["Tiefststand"].to_numpy()
+                },
+                "Verspätung",
+                [{"name": "Tiefststand", "type": "bar", "itemStyle": {"color": "#E8846B"}}],
+                extra={"legend": {"show": False}}
+            )
+        )
+        st_echarts(options=stress_chart, height="300px")
+        
+        # Aktivität protokollieren
+        log_user_activity("Stresstest durchgeführt", {
+            "zeitraum": f"{start_date} bis {end_date}",
+            "max_verspaetung": int(max_shift),
+            "ausfall_debitoren": int(top_k),
+            "ausfallquote": haircut
+        })
+    except Exception as e:
+        st.error(f"Fehler beim Stresstest: {e}")
+        st.info("Überspringe Stresstest aufgrund von Datenstruktur-Problemen.")
+    
+    try:
+        # Zahlungsplan: ausgehende Zahlungen so terminieren, dass der Mindestkontostand gehalten wird
+        st.subheader("🗓️ Zahlungsplan-Optimierung")
+        
+        col_plan = st.columns(2)
+        with col_plan[0]:
+            mindestbestand = st.number_input("Mindestkontostand (CHF)", min_value=0, value=0, step=1000,
+                                             key="plan_floor")
+        with col_plan[1]:
+            max_delay = st.number_input("Maximale Verschiebung nach Fälligkeit (Tage)", min_value=0, max_value=180,
+                                        value=30, step=5, key="plan_max_delay")
+        
+        payables = default_payables(df, max(start_date, date.today()), end_date, int(max_delay))
+        if payables.empty:
+            st.info("Keine ausgehenden Zahlungen im gewählten Zeitraum.")
+        else:
+            payables = st.data_editor(
+                payables,
+                column_config={
+                    "Id": None,
+                    "Betrag": st.column_config.NumberColumn("Betrag", format="%.2f", disabled=True),
+                    "Details": st.column_config.TextColumn("Details", disabled=True),
+                    "Fällig": st.column_config.DateColumn("Fällig", format="DD.MM.YYYY", disabled=True),
+                    "Frühestens": st.column_config.DateColumn("Frühestens", format="DD.MM.YYYY"),
+                    "Spätestens": st.column_config.DateColumn("Spätestens", format="DD.MM.YYYY"),
+                    "Priorität": st.column_config.NumberColumn("Priorität", min_value=0, max_value=10, step=1,
+                                                               help="Höhere Priorität wird zuerst eingeplant")
+                },
+                use_container_width=True,
+                hide_index=True,
+                key="plan_payables"
+            )
+            
+            plan = schedule_payments(df, payables, start_date, end_date, start_balance, float(mindestbestand))
+            verschoben = plan[plan["Verschiebung"] != 0]
+            konflikte = int(plan["Konflikt"].sum())
+            
+            col_kpi = st.columns(3)
+            col_kpi[0].metric("Verschobene Zahlungen", len(verschoben))
+            col_kpi[1].metric("Verschobener Betrag", chf_format(verschoben["Betrag"].sum()))
+            col_kpi[2].metric("Nicht einhaltbar", konflikte)
+            if konflikte:
+                st.warning(f"{konflikte} Zahlung(en) können den Mindestkontostand nicht einhalten "
+                           f"und wurden auf den spätesten Tag gelegt.")
+            
+            if not verschoben.empty:
+                plan_display = verschoben[["Details", "Betrag", "Fällig", "Vorschlag", "Verschiebung", "Konflikt"]].copy()
+                plan_display["Betrag"] = plan_display["Betrag"].apply(chf_format)
+                plan_display["Fällig"] = plan_display["Fällig"].apply(lambda d: d.strftime("%d.%m.%Y"))
+                plan_display["Vorschlag"] = plan_display["Vorschlag"].apply(lambda d: d.strftime("%d.%m.%Y"))
+                plan_display["Verschiebung"] = plan_display["Verschiebung"].apply(lambda d: f"{d:+d} Tage")
+                plan_display["Konflikt"] = plan_display["Konflikt"].map({True: "⚠️", False: ""})
+                st.dataframe(plan_display, use_container_width=True, hide_index=True)
+                
+                if st.button("Als Szenario speichern", key="plan_save"):
+                    name = f"Zahlungsplan {date.today().strftime('%d.%m.%Y')}"
+                    szenario = schedule_to_scenario(
+                        plan, name,
+                        beschreibung=f"Mindestkontostand {chf_format(mindestbestand)}, "
+                                     f"max. {int(max_delay)} Tage Verschiebung"
+                    )
+                    if save_szenario(szenario, user_id=user_id):
+                        st.success(f"Szenario '{name}' gespeichert.")
+                        log_user_activity("Zahlungsplan als Szenario gespeichert", {
+                            "verschobene_zahlungen": len(verschoben),
+                            "mindestkontostand": mindestbestand
+                        })
+                    else:
+                        st.error("Szenario konnte nicht gespeichert werden.")
+            else:
+                st.success("Alle Zahlungen können am Fälligkeitstag geleistet werden.")
+    except Exception as e:
+        st.error(f"Fehler bei der Zahlungsplan-Optimierung: {e}")
+        st.info("Überspringe Zahlungsplan-Optimierung aufgrund von Datenstruktur-Problemen.")
+    
+    try:
+        # Zielwertsuche: frühester Starttermin bzw. höchster tragbarer Lohn für eine Anstellung
+        st.subheader("🎯 Tragbarkeit von Anstellungen und Lohnerhöhungen")
+        
+        daily = cube["D"]
+        codes = zahltag_codes(lohn_zahltage(start_date, end_date), start_date, len(daily["end_balance"]))
+        zahltage = [daily["period_start"][c].date() for c in codes]
+        
+        if not zahltage:
+            st.info("Im gewählten Zeitraum liegt kein Lohnzahltag.")
+        else:
+            col_goal = st.columns(3)
+            with col_goal[0]:
+                modus = st.radio("Gesucht", ["Höchster Monatslohn", "Frühester Start"], key="goal_modus")
+            with col_goal[1]:
+                goal_floor = st.number_input("Mindestkontostand (CHF)", min_value=0, value=0, step=1000,
+                                             key="goal_floor")
+            with col_goal[2]:
+                if modus == "Höchster Monatslohn":
+                    start_tag = st.selectbox("Erste Lohnzahlung", zahltage,
+                                             format_func=lambda d: d.strftime("%d.%m.%Y"), key="goal_start")
+                else:
+                    goal_lohn = st.number_input("Zusätzlicher Monatslohn (CHF)", min_value=0, value=8000,
+                                                step=500, key="goal_lohn")
+            
+            table = balance_index(cube)
+            if modus == "Höchster Monatslohn":
+                erster = zahltage.index(start_tag)
+                betrag = max_affordable_salary(table, codes, erster, float(goal_floor))
+                if betrag is None:
+                    st.warning("Der Kontostand fällt bereits ohne zusätzlichen Lohn unter den Mindestkontostand.")
+                else:
+                    st.metric(f"Höchster tragbarer Monatslohn ab {start_tag.strftime('%d.%m.%Y')}", chf_format(betrag))
+            else:
+                betrag = float(goal_lohn)
+                erster = earliest_start(table, codes, betrag, float(goal_floor))
+                if erster is None:
+                    st.warning(f"Ein zusätzlicher Lohn von {chf_format(betrag)} ist im gewählten Zeitraum nicht tragbar.")
+                else:
+                    st.metric("Frühester Starttermin (erste Lohnzahlung)", zahltage[erster].strftime("%d.%m.%Y"))
+            
+            if betrag is not None and erster is not None:
+                goal_chart = cached_chart(
+                    chart_cache, version, "tragbarkeit",
+                    {"start": start_date, "end": end_date, "start_balance": start_balance,
+                     "erster": int(erster), "betrag": round(betrag, 2), "floor": goal_floor},
+                    lambda: dataset_chart(
+                        {
+                            "Datum": daily["labels"],
+                            "Basis": daily["end_balance"],
+                            "Mit zusätzlichem Lohn": hire_balance(daily["end_balance"], codes, erster, betrag)
+                        },
+                        "Datum",
+                        [
+                            {"name": "Basis", "type": "line", "symbol": "none",
+                             "lineStyle": {"width": 2, "color": "#4A90E2"}, "itemStyle": {"color": "#4A90E2"}},
+                            {"name": "Mit zusätzlichem Lohn", "type": "line", "symbol": "none",
+                             "lineStyle": {"width": 2, "color": "#E8846B"}, "itemStyle": {"color": "#E8846B"}}
+                        ],
+                        x_type="time", zoom=(0, 100)
+                    )
+                )
+                st_echarts(options=goal_chart, height="400px")
+            
+            # Aktivität protokollieren
+            log_user_activity("Tragbarkeit einer Anstellung geprüft", {
+                "modus": modus,
+                "mindestkontostand": goal_floor
+            })
+    except Exception as e:
+        st.error(f"Fehler bei der Tragbarkeitsprüfung: {e}")
+        st.info("Überspringe Tragbarkeitsprüfung aufgrund von Datenstruktur-Problemen.")
+    
+    try:
+        # Liquiditätsrisiko bei verspäteten Zahlungseingängen
+        st.subheader("🎲 Liquiditätsrisiko (Monte-Carlo-Simulation)")
+        
+        if st.checkbox("Risikosimulation berechnen", value=False, key="risk_enabled"):
+            col_risk = st.columns(3)
+            with col_risk[0]:
+                n_paths = st.number_input("Anzahl Szenarien", min_value=500, max_value=50000,
+                                          value=DEFAULT_RISK_PATHS, step=500, key="risk_paths")
+            with col_risk[1]:
+                delay_mean = st.number_input("Mittlerer Zahlungsverzug (Tage)", min_value=0, max_value=120,
+                                             value=10, step=1, key="risk_delay")
+            with col_risk[2]:
+                amount_sd = st.number_input("Abweichung der Einnahmen (%)", min_value=0, max_value=50,
+                                            value=5, step=1, key="risk_amount_sd")
+            
+            risk_params = {
+                "n_paths": int(n_paths),
+                "delay_mean": float(delay_mean),
+                "amount_sd": amount_sd / 100,
+                "seed": 42  # Reproduzierbar, damit sich das Ergebnis bei Reruns nicht ändert
+            }
+            risk = get_risk(
+                df, version, start_date, end_date, start_balance, risk_params,
+                cache=st.session_state.setdefault("risk_cache", {})
+            )
+            
+            overdraft = risk["overdraft_probability"]
+            worst_day = int(np.argmax(overdraft))
+            col_kpi = st.columns(3)
+            col_kpi[0].metric("Wahrscheinlichkeit einer Unterdeckung", f"{risk['overdraft_any']:.1%}")
+            col_kpi[1].metric("Erwarteter Tiefststand", chf_format(risk["expected_min"]))
+            col_kpi[2].metric(f"Höchstes Tagesrisiko ({cube['D']['labels'][worst_day]})", f"{overdraft[worst_day]:.1%}")
+            
+            def build_fan_chart():
+                p = risk["percentiles"]
+                columns = {
+                    "Datum": cube["D"]["labels"],
+                    "P5": p[5],
+                    "Spannweite 5–95 %": p[95] - p[5],
+                    "P25": p[25],
+                    "Spannweite 25–75 %": p[75] - p[25],
+                    "Median": p[50],
+                    "Unterdeckungsrisiko (%)": overdraft * 100
+                }
+                band = {"type": "line", "symbol": "none", "lineStyle": {"opacity": 0}}
+                series = [
+                    {**band, "name": "P5", "stack": "aussen"},
+                    {**band, "name": "Spannweite 5–95 %", "stack": "aussen",
+                     "areaStyle": {"color": "rgba(74, 144, 226, 0.15)"}},
+                    {**band, "name": "P25", "stack": "innen"},
+                    {**band, "name": "Spannweite 25–75 %", "stack": "innen",
+                     "areaStyle": {"color": "rgba(74, 144, 226, 0.35)"}},
+                    {"name": "Median", "type": "line", "symbol": "none",
+                     "lineStyle": {"width": 2, "color": "#4A90E2"}, "itemStyle": {"color": "#4A90E2"}},
+                    {"name": "Unterdeckungsrisiko (%)", "type": "line", "symbol": "none", "yAxisIndex": 1,
+                     "lineStyle": {"width": 1, "color": "#E74C3C"}, "itemStyle": {"color": "#E74C3C"}}
+                ]
+                return dataset_chart(
+                    columns, "Datum", series, x_type="time", zoom=(0, 100),
+                    extra={
+                        "legend": {"data": ["Spannweite 5–95 %", "Spannweite 25–75 %", "Median", "Unterdeckungsrisiko (%)"]},
+                        "yAxis": [
+                            {"type": "value", "name": "CHF"},
+                            {"type": "value", "name": "%", "min": 0, "max": 100, "splitLine": {"show": False}}
+                        ]
+                    }
+                )
+            
+            fan_chart = cached_chart(
+                chart_cache, version, "risiko_faecher",
+                {"start": start_date, "end": end_date, "start_balance": start_balance, **risk_params},
+                build_fan_chart
+            )
+            st_echarts(options=fan_chart, height="500px")
+            st.caption(f"{risk['n_paths']} simulierte Szenarien mit zufälligem Zahlungsverzug und "
+                       f"Betragsabweichung der Einnahmen. Ausgaben werden wie geplant angenommen.")
+            
+            # Aktivität protokollieren
+            log_user_activity("Liquiditätsrisiko simuliert", {
+                "zeitraum": f"{start_date} bis {end_date}",
+                "szenarien": int(n_paths),
+                "unterdeckung": risk["overdraft_any"]
+            })
+    except Exception as e:
+        st.error(f"Fehler bei der Risikosimulation: {e}")
+        st.info("Überspringe Risikosimulation aufgrund von Datenstruktur-Problemen.")
+    
     # Vollständig überarbeitete Fixkosten-Analyse
     if show_fixkosten:
         try:
@@ -582,52 +863,19 @@ def show():
                     st.markdown(f"**Monatliche Fixkosten-Gesamtbelastung: {chf_format(monatliche_summe)}**")
                     
                     # Pie-Chart der Fixkosten nach Rhythmus (mit monatlichen Anteilen)
-                    pie_data = []
-                    
-                    if summe_monatlich > 0:
-                        pie_data.append({"name": "Monatlich", "value": summe_monatlich})
-                    
-                    if summe_quartalsweise > 0:
-                        pie_data.append({"name": "Quartalsweise (monatl. Anteil)", "value": summe_quartalsweise})
-                        
-                    if summe_halbjaehrlich > 0:
-                        pie_data.append({"name": "Halbjährlich (monatl. Anteil)", "value": summe_halbjaehrlich})
-                        
-                    if summe_jaehrlich > 0:
-                        pie_data.append({"name": "Jährlich (monatl. Anteil)", "value": summe_jaehrlich})
+                    rhythmus_anteile = [
+                        ("Monatlich", summe_monatlich),
+                        ("Quartalsweise (monatl. Anteil)", summe_quartalsweise),
+                        ("Halbjährlich (monatl. Anteil)", summe_halbjaehrlich),
+                        ("Jährlich (monatl. Anteil)", summe_jaehrlich)
+                    ]
+                    rhythmus_anteile = [(name, wert) for name, wert in rhythmus_anteile if wert > 0]
                     
-                    pie_chart = {
-                        "tooltip": {
-                            "trigger": "item", 
-                            "formatter": "{a} <br/>{b}: {c} CHF ({d}%)"
-                        },
-                        "legend": {
-                            "orient": "vertical", 
-                            "left": "left", 
-                            "data": [item["name"] for item in pie_data]
-                        },
-                        "series": [
-                            {
-                                "name": "Fixkosten pro Monat",
-                                "type": "pie",
-                                "radius": ["30%", "70%"],
-                                "avoidLabelOverlap": False,
-                                "label": {
-                                    "show": True,
-                                    "formatter": "{b}: {c} CHF"
-                                },
-                                "emphasis": {
-                                    "label": {
-                                        "show": True,
-                                        "fontSize": "18",
-                                        "fontWeight": "bold"
-                                    }
-                                },
-                                "labelLine": {"show": True},
-                                "data": pie_data
-                            }
-                        ]
-                    }
+                    pie_chart = dataset_pie(
+                        [name for name, _ in rhythmus_anteile],
+                        [wert for _, wert in rhythmus_anteile],
+                        "Fixkosten pro Monat"
+                    )
                     
                     st_echarts(options=pie_chart, height="400px")
                     
@@ -639,39 +887,39 @@ def show():
                     # Zusätzliche Fixkosten-Analyse für den ausgewählten Zeitraum
                     st.markdown("#### Monatliche Fixkosten-Übersicht")
                     
-                    # Nach Kategorien
-                    df_fixkosten["Kategorie"] = df_fixkosten["Name"].apply(
-                        lambda x: "Miete" if "miete" in x.lower() else (
-                            "Lizenzen" if "lizenz" in x.lower() else (
-                                "IT-Kosten" if any(k in x.lower() for k in ["it", "cloud", "software", "hardware"]) else "Sonstiges"
-                            )
-                        )
-                    )
+                    # Nach Kategorien (gleiche Regeln wie für die Buchungen)
+                    df_fixkosten["Kategorie"] = categorize(df_fixkosten["Name"], get_kategorie_regeln(),
+                                                           default="Sonstiges")
                     
                     # Gruppiert nach Kategorie
                     category_sum = df_fixkosten.groupby("Kategorie")["Betrag_Monatlich"].sum().reset_index()
                     
                     # Balkendiagramm der Fixkosten nach Kategorie
-                    bar_data = [{"name": row["Kategorie"], "value": row["Betrag_Monatlich"]} for _, row in category_sum.iterrows()]
-                    
-                    bar_chart = {
-                        "tooltip": {"trigger": "axis"},
-                        "xAxis": {
-                            "type": "category",
-                            "data": [item["name"] for item in bar_data]
-                        },
-                        "yAxis": {"type": "value"},
-                        "series": [
-                            {
-                                "name": "Monatliche Kosten",
-                                "type": "bar",
-                                "data": [item["value"] for item in bar_data],
-                                "itemStyle": {"color": "#91CC75"}
-                            }
-                        ]
-                    }
+                    bar_chart = dataset_chart(
+                        {"Kategorie": category_sum["Kategorie"], "Monatliche Kosten": category_sum["Betrag_Monatlich"]},
+                        "Kategorie",
+                        [{"name": "Monatliche Kosten", "type": "bar", "itemStyle": {"color": "#91CC75"}}],
+                        extra={"legend": {"show": False}}
+                    )
                     
                     st_echarts(options=bar_chart, height="300px")
+                    
+                    # Welche Verträge und Löhne belasten die Liquidität am kritischen Punkt am stärksten?
+                    st.markdown("#### Einfluss auf Tiefststand und Runway")
+                    impact = removal_impact(df, start_date, end_date, cube["D"]["end_balance"])
+                    if not impact.empty:
+                        impact_display = impact.copy()
+                        for spalte in ["Summe", "Tiefststand ohne", "Verbesserung"]:
+                            impact_display[spalte] = impact_display[spalte].apply(chf_format)
+                        impact_display["Runway ohne"] = impact_display["Runway ohne"].apply(
+                            lambda r: "ausreichend" if pd.isna(r) else f"{int(r)} Tage"
+                        )
+                        impact_display["Runway-Gewinn"] = impact_display["Runway-Gewinn"].apply(
+                            lambda g: f"+{g} Tage" if g > 0 else "–"
+                        )
+                        st.dataframe(impact_display.rename(columns={"Summe": "Summe im Zeitraum"}),
+                                     use_container_width=True, hide_index=True)
+                        st.caption("Wirkung, wenn der jeweilige Vertrag bzw. Lohn im gewählten Zeitraum wegfällt.")
 
                 else:
                     st.info("Keine aktiven Fixkosten gefunden.")
@@ -719,24 +967,12 @@ def show():
                 })
                 
                 # Balkendiagramm der Löhne pro Mitarbeiter
-                bar_data = [{"name": row["Mitarbeiter"], "value": row["Betrag"]} for _, row in df_loehne.iterrows()]
-                
-                bar_chart = {
-                    "tooltip": {"trigger": "axis"},
-                    "xAxis": {
-                        "type": "category",
-                        "data": [item["name"] for item in bar_data]
-                    },
-                    "yAxis": {"type": "value"},
-                    "series": [
-                        {
-                            "name": "Monatlicher Lohn",
-                            "type": "bar",
-                            "data": [item["value"] for item in bar_data],
-                            "itemStyle": {"color": "#5470C6"}
-                        }
-                    ]
-                }
+                bar_chart = dataset_chart(
+                    {"Mitarbeiter": df_loehne["Mitarbeiter"], "Monatlicher Lohn": df_loehne["Betrag"].astype(float)},
+                    "Mitarbeiter",
+                    [{"name": "Monatlicher Lohn", "type": "bar", "itemStyle": {"color": "#5470C6"}}],
+                    extra={"legend": {"show": False}}
+                )
                 
                 st_echarts(options=bar_chart, height="300px")
                 
@@ -744,40 +980,12 @@ def show():
                 st.markdown("#### Lohnverteilung")
                 
                 # Pie-Chart für die Lohnverteilung
-                pie_data = [{"name": row["Mitarbeiter"], "value": row["Betrag"]} for _, row in df_loehne.iterrows()]
-                
-                pie_chart = {
-                    "tooltip": {
-                        "trigger": "item", 
-                        "formatter": "{a} <br/>{b}: {c} CHF ({d}%)"
-                    },
-                    "legend": {
-                        "orient": "vertical", 
-                        "left": "left", 
-                        "data": [item["name"] for item in pie_data]
-                    },
-                    "series": [
-                        {
-                            "name": "Lohnverteilung",
-                            "type": "pie",
-                            "radius": ["30%", "70%"],
-                            "avoidLabelOverlap": False,
-                            "label": {
-                                "show": True,
-                                "formatter": "{b}: {c} CHF ({d}%)"
-                            },
-                            "emphasis": {
-                                "label": {
-                                    "show": True,
-                                    "fontSize": "18",
-                                    "fontWeight": "bold"
-                                }
-                            },
-                            "labelLine": {"show": True},
-                            "data": pie_data
-                        }
-                    ]
-                }
+                pie_chart = dataset_pie(
+                    df_loehne["Mitarbeiter"],
+                    df_loehne["Betrag"].astype(float),
+                    "Lohnverteilung",
+                    label_formatter="{b}: {c} CHF ({d}%)"
+                )
                 
                 st_echarts(options=pie_chart, height="400px")
             else:
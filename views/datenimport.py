@@ -7,6 +7,16 @@ import uuid
 from core.parsing import parse_date_swiss_fallback, parse_html_output
 from core.utils import chf_format
 from logic.storage_buchungen import save_buchungen, load_buchungen
+from logic.forecast import update_forecast_state
+from logic.debitoren import verzug_je_rechnung, verzug_statistik, merge_verzug
+from logic.storage_debitoren import load_debitoren_verzug, save_debitoren_verzug, load_bekannte_zahlungen, save_zahlungen
+from logic.matching import normalize_kontoauszug, plan_keys, match_transactions, find_near_duplicates
+from logic.storage_abgleich import save_abgleich, load_abgleich, delete_abgleich
+from logic.kategorien import ABGELEITETE_KATEGORIEN
+from logic.storage_kategorien import (
+    load_kategorie_regeln, save_kategorie_regel, delete_kategorie_regel, recategorize_buchungen, categorize_with_llm
+)
+from logic.ledger import build_ledger, wiederkehrende_zahlungen
 from core.auth import prüfe_session_gültigkeit, log_user_activity
 
 def show():
@@ -89,6 +99,36 @@ def show():
                             return pd.NaT
 
                         df_excel["Zahlbar bis"] = df_excel["Zahlbar bis"].apply(parse_excel_date)
+                        
+                        # Optionale Spalte "Bezahlt am": bezahlte Rechnungen trainieren das Zahlungsverhalten
+                        # je Kunde und werden nicht als offene Einnahmen importiert
+                        if "Bezahlt am" in df_excel.columns:
+                            df_excel["Bezahlt am"] = df_excel["Bezahlt am"].apply(parse_excel_date)
+                            bezahlt = df_excel["Bezahlt am"].notna()
+                            if bezahlt.any():
+                                # Nur Rechnungen zählen, die noch nicht in die Statistiken eingeflossen sind
+                                rechnungen = verzug_je_rechnung(df_excel[bezahlt]).drop_duplicates("rechnung_key")
+                                bekannt = load_bekannte_zahlungen(rechnungen["rechnung_key"].tolist())
+                                if bekannt is None:
+                                    st.warning("⚠️ Zahlungsverhalten nicht aktualisiert: bereits erfasste Zahlungen "
+                                               "konnten nicht geladen werden.")
+                                    rechnungen = rechnungen.iloc[0:0]
+                                else:
+                                    rechnungen = rechnungen[~rechnungen["rechnung_key"].isin(bekannt)]
+                                if not rechnungen.empty:
+                                    statistik = verzug_statistik(rechnungen)
+                                    if save_debitoren_verzug(merge_verzug(load_debitoren_verzug(), statistik), user_id=user_id) \
+                                            and save_zahlungen(rechnungen, user_id=user_id):
+                                        st.info(f"ℹ️ Zahlungsverhalten aus {len(rechnungen)} neuen bezahlten Rechnungen "
+                                                f"von {len(statistik)} Kunden übernommen.")
+                                        log_user_activity("Zahlungsverhalten aktualisiert", {
+                                            "rechnungen": len(rechnungen),
+                                            "kunden": len(statistik)
+                                        })
+                                elif bekannt is not None:
+                                    st.info("ℹ️ Alle bezahlten Rechnungen sind bereits im Zahlungsverhalten erfasst.")
+                            df_excel = df_excel[~bezahlt]
+                        
                         df_excel.loc[df_excel["Zahlbar bis"] < pd.to_datetime("today"), "Zahlbar bis"] = pd.to_datetime(tomorrow)
                         df_excel["Details"] = df_excel["Kunde"] + " " + df_excel["Kundennummer"].astype(str)
                         df_excel.rename(columns={"Zahlbar bis": "Date", "Brutto": "Amount"}, inplace=True)
@@ -153,16 +193,31 @@ def show():
                             df_new["created_at"] = now
                             df_new["updated_at"] = now
                             
+                            # Kategorie aus den Kategorisierungsregeln (für die ganze Spalte in einem Durchlauf),
+                            # übrige Texte optional per Sprachmodell (jeder Text höchstens einmal)
+                            df_new["kategorie"], llm_anfragen = categorize_with_llm(df_new["Details"], user_id=user_id)
+                            
                             # Buchungen speichern (mit Benutzer-ID für Audit)
                             save_buchungen(df_new, user_id=user_id)
                             
+                            # Prognosemodell der Session mit den neuen Buchungen fortschreiben
+                            if "prognose_state" in st.session_state:
+                                historie = pd.concat([d for d in [all_df, df_new] if d is not None and not d.empty],
+                                                     ignore_index=True)
+                                # Wie im Ledger: Fixkosten- und Lohnzahlungen nicht mitlernen
+                                update_forecast_state(
+                                    st.session_state.prognose_state,
+                                    historie[~wiederkehrende_zahlungen(historie, user_id=user_id)]
+                                )
+                            
                             # Aktivität protokollieren
                             html_neue = len(df_new[df_new["Direction"] == "Outgoing"])
                             excel_neue = len(df_new[df_new["Direction"] == "Incoming"])
                             log_user_activity("Daten importiert", {
                                 "ausgaben": html_neue,
                                 "einnahmen": excel_neue,
-                                "gesamt": len(df_new)
+                                "gesamt": len(df_new),
+                                "llm_anfragen": llm_anfragen
                             })
                             
                             # Erfolgs-Nachricht
@@ -173,6 +228,19 @@ def show():
                             else:
                                 st.success(f"✅ {len(df_new)} neue Einnahmen importiert.")
                             
+                            # Unscharfe Duplikate (leicht abweichender Text, gleicher Betrag) zur Prüfung melden
+                            if all_df is not None and not all_df.empty:
+                                aehnlich = find_near_duplicates(df_new, all_df)
+                                if not aehnlich.empty:
+                                    st.warning(f"⚠️ {aehnlich['index'].nunique()} importierte Buchungen ähneln "
+                                               f"bestehenden Buchungen. Bitte im Editor prüfen.")
+                                    st.dataframe(pd.DataFrame({
+                                        "Neu": df_new.loc[aehnlich["index"], "Details"].to_numpy(),
+                                        "Bestehend": all_df.loc[aehnlich["other_index"], "Details"].to_numpy(),
+                                        "Betrag": df_new.loc[aehnlich["index"], "Amount"].apply(chf_format).to_numpy(),
+                                        "Ähnlichkeit": aehnlich["Ähnlichkeit"].map(lambda a: f"{a:.0%}").to_numpy()
+                                    }), use_container_width=True, hide_index=True)
+                            
                             st.info("Du kannst den Kontostand jederzeit in der Seitenleiste anpassen.")
                             
                             # Wechsel-Button zur Planung
@@ -191,6 +259,178 @@ def show():
         else:
             st.error("❌ Bitte füge HTML-Tabelle ein oder lade eine Excel-Datei hoch.")
 
+    # Abgleich mit dem Kontoauszug: bezahlte Planeinträge schliessen
+    st.markdown("---")
+    st.subheader("🏦 Kontoauszug abgleichen")
+    st.caption("Ordnet die Bewegungen eines Kontoauszugs (CSV oder Excel mit Datum, Buchungstext und Betrag "
+               "bzw. Gutschrift/Belastung) den geplanten Rechnungen, Fixkosten und Löhnen zu. "
+               "Bestätigte Zuordnungen gelten als bezahlt und entfallen aus der Planung.")
+    
+    kontoauszug = st.file_uploader("Kontoauszug hochladen", type=["csv", "xlsx"], key="kontoauszug_upload")
+    if kontoauszug is not None:
+        try:
+            if kontoauszug.name.lower().endswith(".csv"):
+                raw = pd.read_csv(BytesIO(kontoauszug.getvalue()), sep=None, engine="python")
+            else:
+                raw = pd.read_excel(BytesIO(kontoauszug.getvalue()))
+            bank = normalize_kontoauszug(raw)
+            
+            if bank.empty:
+                st.info("Der Kontoauszug enthält keine Bewegungen.")
+            else:
+                # Planzeilen rund um den Zeitraum des Kontoauszugs (ohne Simulationen)
+                plan, _ = build_ledger(
+                    (bank["Date"].min() - timedelta(days=45)).date(),
+                    (bank["Date"].max() + timedelta(days=45)).date(),
+                    show_simulationen=False,
+                    user_id=user_id
+                )
+                plan = plan.assign(plan_key=plan_keys(plan)).dropna(subset=["plan_key"])
+                treffer = match_transactions(bank, plan)
+                
+                st.caption(f"{len(treffer)} von {len(bank)} Bewegungen einem geplanten Eintrag zugeordnet.")
+                if not treffer.empty:
+                    b = bank.loc[treffer["bank_index"]].reset_index(drop=True)
+                    p = plan.loc[treffer["plan_index"]].reset_index(drop=True)
+                    vorschlag = pd.DataFrame({
+                        "Übernehmen": True,
+                        "Bank Datum": b["Date"].dt.date,
+                        "Bank Text": b["Details"],
+                        "Bank Betrag": b["Amount"],
+                        "Plan Datum": p["Date"].dt.date,
+                        "Plan": p["Details"],
+                        "Plan Betrag": p["Amount"],
+                        "Art": p["Kategorie"].replace({"Standard": "Rechnung"}),
+                        "Score": treffer["Score"]
+                    })
+                    auswahl = st.data_editor(
+                        vorschlag,
+                        disabled=[c for c in vorschlag.columns if c != "Übernehmen"],
+                        use_container_width=True,
+                        hide_index=True,
+                        key="abgleich_editor"
+                    )
+                    
+                    if st.button("Abgleich speichern", key="abgleich_speichern"):
+                        bestaetigt = auswahl["Übernehmen"].to_numpy()
+                        zuordnungen = [
+                            {
+                                "plan_key": p.at[i, "plan_key"],
+                                "plan_datum": p.at[i, "Date"],
+                                "plan_details": p.at[i, "Details"],
+                                "plan_betrag": p.at[i, "Amount"],
+                                "bank_datum": b.at[i, "Date"],
+                                "bank_details": b.at[i, "Details"],
+                                "bank_betrag": b.at[i, "Amount"],
+                                "score": treffer.at[i, "Score"]
+                            }
+                            for i in range(len(treffer)) if bestaetigt[i]
+                        ]
+                        anzahl = save_abgleich(zuordnungen, user_id=user_id)
+                        if anzahl is None:
+                            st.error("❌ Der Abgleich konnte nicht gespeichert werden.")
+                        else:
+                            st.success(f"✅ {anzahl} geplante Einträge als bezahlt markiert.")
+                            log_user_activity("Kontoauszug abgeglichen", {
+                                "bewegungen": len(bank),
+                                "zuordnungen": anzahl
+                            })
+        except Exception as e:
+            st.error(f"❌ Fehler beim Abgleich: {e}")
+    
+    # Gespeicherte Zuordnungen anzeigen; falsche Zuordnungen lassen sich wieder aufheben
+    try:
+        abgleich = load_abgleich()
+        if not abgleich.empty:
+            with st.expander(f"Abgeglichene Einträge ({len(abgleich)})"):
+                abgleich_df = pd.DataFrame({
+                    "Aufheben": False,
+                    "Plan Datum": pd.to_datetime(abgleich["plan_datum"], errors="coerce").dt.date,
+                    "Plan": abgleich["plan_details"],
+                    "Plan Betrag": abgleich["plan_betrag"],
+                    "Bank Datum": pd.to_datetime(abgleich["bank_datum"], errors="coerce").dt.date,
+                    "Bank Text": abgleich["bank_details"],
+                    "Bank Betrag": abgleich["bank_betrag"]
+                })
+                abgleich_auswahl = st.data_editor(
+                    abgleich_df,
+                    disabled=[c for c in abgleich_df.columns if c != "Aufheben"],
+                    use_container_width=True,
+                    hide_index=True,
+                    key="abgleich_liste_editor"
+                )
+                
+                if st.button("Ausgewählte Zuordnungen aufheben", key="abgleich_aufheben"):
+                    keys = abgleich.loc[abgleich_auswahl["Aufheben"].to_numpy(), "plan_key"].tolist()
+                    aufgehoben = [key for key in keys if delete_abgleich(key, user_id=user_id)]
+                    if len(aufgehoben) < len(keys):
+                        st.error(f"❌ {len(keys) - len(aufgehoben)} Zuordnungen konnten nicht aufgehoben werden.")
+                    if aufgehoben:
+                        st.success(f"✅ {len(aufgehoben)} Einträge sind wieder offen.")
+                        log_user_activity("Abgleich aufgehoben", {"plan_keys": aufgehoben})
+    except Exception as e:
+        st.error(f"❌ Fehler beim Laden der abgeglichenen Einträge: {e}")
+    
+    # Regeln zur automatischen Kategorisierung der Buchungen
+    st.markdown("---")
+    st.subheader("🏷️ Kategorisierungsregeln")
+    st.caption("Buchungen, deren Text ein Stichwort (oder einen regulären Ausdruck) enthält, erhalten die "
+               "Kategorie der Regel. Passen mehrere Regeln, gewinnt die höchste Priorität.")
+    
+    try:
+        regeln = load_kategorie_regeln()
+        regeln_df = pd.DataFrame(regeln, columns=["id", "muster", "kategorie", "prioritaet", "regex", "aktiv"])
+        regeln_edit = st.data_editor(
+            regeln_df,
+            num_rows="dynamic",
+            use_container_width=True,
+            hide_index=True,
+            column_order=["muster", "kategorie", "prioritaet", "regex", "aktiv"],
+            key="kategorie_regeln_editor",
+            column_config={
+                "muster": st.column_config.TextColumn("Stichwort / Ausdruck", required=True),
+                "kategorie": st.column_config.TextColumn("Kategorie", required=True),
+                "prioritaet": st.column_config.NumberColumn("Priorität", step=1, default=0),
+                "regex": st.column_config.CheckboxColumn("Regex", default=False),
+                "aktiv": st.column_config.CheckboxColumn("Aktiv", default=True)
+            }
+        )
+        
+        if st.button("Regeln speichern", key="kategorie_regeln_speichern"):
+            alte_regeln = {str(r["id"]): r for r in regeln}
+            behalten, geaendert, fehler = set(), 0, []
+            for regel in regeln_edit.to_dict("records"):
+                if not str(regel.get("muster") or "").strip():
+                    continue
+                regel_id = str(regel["id"]) if pd.notna(regel.get("id")) else None
+                alt = alte_regeln.get(regel_id)
+                if regel_id:
+                    behalten.add(regel_id)
+                if alt is not None and all(alt.get(k) == regel.get(k) for k in
+                                           ["muster", "kategorie", "prioritaet", "regex", "aktiv"]):
+                    continue
+                if str(regel.get("kategorie") or "").strip() in ABGELEITETE_KATEGORIEN:
+                    fehler.append(f"{regel['muster']}: Kategorie '{regel['kategorie']}' ist reserviert")
+                    continue
+                if not save_kategorie_regel(regel, user_id=user_id):
+                    fehler.append(f"{regel['muster']}: konnte nicht gespeichert werden")
+                    continue
+                # Nur die Buchungen neu kategorisieren, auf die die alte oder neue Regel wirkt
+                geaendert += recategorize_buchungen(alt=alt, neu=regel, user_id=user_id) or 0
+            for regel_id, alt in alte_regeln.items():
+                if regel_id not in behalten and delete_kategorie_regel(regel_id, user_id=user_id):
+                    geaendert += recategorize_buchungen(alt=alt, user_id=user_id) or 0
+            
+            for meldung in fehler:
+                st.error(f"❌ {meldung}")
+            st.success(f"✅ Regeln gespeichert, {geaendert} Buchungen neu kategorisiert.")
+            log_user_activity("Kategorisierungsregeln gespeichert", {
+                "regeln": len(regeln_edit),
+                "neu_kategorisiert": geaendert
+            })
+    except Exception as e:
+        st.error(f"❌ Fehler bei den Kategorisierungsregeln: {e}")
+    
     # Abschnitt für bestehende Daten
     st.markdown("---")
     
@@ -219,7 +459,8 @@ def show():
             
             if not display_df.empty:
                 st.dataframe(
-                    display_df[["Date", "Details", "Amount", "Direction", "modified"]].sort_values("Date", ascending=False),
+                    display_df[[c for c in ["Date", "Details", "Amount", "Direction", "kategorie", "modified"]
+                                if c in display_df.columns]].sort_values("Date", ascending=False),
                     use_container_width=True
                 )
                 st.caption(f"Es werden {len(display_df)} von {len(existing_data)} Buchungen angezeigt.")
@@ -227,4 +468,21 @@ def show():
                 # Aktivität protokollieren
                 log_user_activity("Vorhandene Daten angesehen", {"filter": view_options, "anzahl": len(display_df)})
             else:
-                st.info("Keine Daten in dieser Kategorie gefunden.")
\ No newline at end of file
+                st.info("Keine Daten in dieser Kategorie gefunden.")
+        
+        # Unscharfe Duplikate im gesamten Bestand suchen
+        if st.button("Mögliche Duplikate suchen", key="duplikate_suchen"):
+            aehnlich = find_near_duplicates(existing_data)
+            if aehnlich.empty:
+                st.success("✅ Keine ähnlichen Buchungen gefunden.")
+            else:
+                st.warning(f"⚠️ {len(aehnlich)} Paare ähnlicher Buchungen gefunden.")
+                st.dataframe(pd.DataFrame({
+                    "Datum": existing_data.loc[aehnlich["index"], "Date"].dt.strftime("%d.%m.%Y").to_numpy(),
+                    "Buchung": existing_data.loc[aehnlich["index"], "Details"].to_numpy(),
+                    "Datum (ähnlich)": existing_data.loc[aehnlich["other_index"], "Date"].dt.strftime("%d.%m.%Y").to_numpy(),
+                    "Ähnliche Buchung": existing_data.loc[aehnlich["other_index"], "Details"].to_numpy(),
+                    "Betrag": existing_data.loc[aehnlich["index"], "Amount"].apply(chf_format).to_numpy(),
+                    "Ähnlichkeit": aehnlich["Ähnlichkeit"].map(lambda a: f"{a:.0%}").to_numpy()
+                }), use_container_width=True, hide_index=True)
+            log_user_activity("Duplikatsuche durchgeführt", {"paare": len(aehnlich)})
\ No newline at end of file
@@ -3,6 +3,7 @@ import pandas as pd
 from datetime import datetime, date, timedelta
 from core.parsing import parse_date_swiss_fallback
 from logic.storage_buchungen import load_buchungen, update_buchung_by_id
+from logic.ledger import patch_ledger, rebase_ledger
 from core.utils import chf_format
 from core.auth import prüfe_session_gültigkeit, log_user_activity
 
@@ -185,7 +186,7 @@ def show():
                         now = datetime.now().isoformat()
                         
                         # Datensatz aktualisieren mit Benutzer-ID für Audit
-                        update_buchung_by_id(
+                        if update_buchung_by_id(
                             id=original["id"],
                             date=edited["date"],
                             details=edited["details"],
@@ -193,7 +194,14 @@ def show():
                             direction=edited["direction"],
                             user_id=user_id,  # Benutzer-ID für Audit-Trail
                             updated_at=now  # Aktualisierungszeitstempel
-                        )
+                        ):
+                            # Prognose punktuell aktualisieren statt das Ledger neu aufzubauen
+                            patch_ledger(
+                                st.session_state.setdefault("ledger_cache", {}), "buchungen",
+                                alt={"id": original["id"]},
+                                neu={"id": original["id"], **new_data},
+                                cube_cache=st.session_state.setdefault("cube_cache", {})
+                            )
                         
                         # Aktivität protokollieren
                         log_user_activity("Buchung bearbeitet", {
@@ -223,6 +231,7 @@ def show():
                 
                 # Session-State aktualisieren
                 st.session_state.edited_df = load_buchungen()
+                rebase_ledger(st.session_state.setdefault("ledger_cache", {}), st.session_state.edited_df)
                 st.rerun()
             elif has_new_rows:
                 st.info("Neue Einträge werden derzeit nicht unterstützt.")
@@ -9,9 +9,129 @@ from logic.storage_simulation import (
     update_simulation_by_id,
     delete_simulation_by_id
 )
+from logic.storage_szenarien import load_szenarien, save_szenario, delete_szenario
+from logic.storage_fixkosten import load_fixkosten
+from logic.storage_mitarbeiter import get_aktuelle_loehne
+from logic.ledger import patch_ledger
 from core.auth import prüfe_session_gültigkeit, log_user_activity
 
 
+def _szenario_formular(szenario, key_prefix, vorlage_simulationen, fixkosten_df, aktuelle_loehne, user_id):
+    """
+    Zeigt das Formular zum Anlegen oder Bearbeiten eines Szenarios.
+    
+    Args:
+        szenario (dict): Bestehendes Szenario oder leeres Dictionary für ein neues Szenario
+        key_prefix (str): Präfix für die Widget-Keys
+        vorlage_simulationen (list): Simulationszeilen, mit denen das Formular vorbelegt wird
+        fixkosten_df (pd.DataFrame): Alle Fixkosten
+        aktuelle_loehne (list): Aktuelle Löhne je Mitarbeiter
+        user_id (str): Benutzer-ID für Audit-Trails
+    """
+    with st.form(key=f"{key_prefix}_form"):
+        name = st.text_input("Name", value=szenario.get("name", ""), key=f"{key_prefix}_name")
+        beschreibung = st.text_area("Beschreibung", value=szenario.get("beschreibung", ""),
+                                    key=f"{key_prefix}_beschreibung")
+        
+        # Simulationszeilen des Szenarios
+        st.markdown("**Simulationen im Szenario**")
+        sim_vorlage = pd.DataFrame(vorlage_simulationen, columns=["date", "details", "amount", "direction"])
+        sim_vorlage["date"] = pd.to_datetime(sim_vorlage["date"], errors="coerce").dt.date
+        sim_edit = st.data_editor(
+            sim_vorlage,
+            num_rows="dynamic",
+            use_container_width=True,
+            hide_index=True,
+            key=f"{key_prefix}_sims",
+            column_config={
+                "date": st.column_config.DateColumn("Datum", required=True),
+                "details": st.column_config.TextColumn("Beschreibung"),
+                "amount": st.column_config.NumberColumn("Betrag (CHF)", min_value=0.0, format="%.2f", required=True),
+                "direction": st.column_config.SelectboxColumn("Typ", options=["Incoming", "Outgoing"], required=True)
+            }
+        )
+        
+        # Angepasste Fixkosten (leer = unverändert, 0 = entfällt)
+        fixkosten_edit = None
+        if not fixkosten_df.empty:
+            st.markdown("**Fixkosten anpassen** (leer = unverändert, 0 = entfällt)")
+            overrides = szenario.get("fixkosten_overrides", {})
+            fixkosten_vorlage = fixkosten_df[["id", "name", "rhythmus", "betrag"]].copy()
+            fixkosten_vorlage["neuer_betrag"] = fixkosten_vorlage["id"].astype(str).map(overrides)
+            fixkosten_edit = st.data_editor(
+                fixkosten_vorlage,
+                use_container_width=True,
+                hide_index=True,
+                disabled=["id", "name", "rhythmus", "betrag"],
+                column_order=["name", "rhythmus", "betrag", "neuer_betrag"],
+                key=f"{key_prefix}_fixkosten",
+                column_config={
+                    "name": "Name",
+                    "rhythmus": "Rhythmus",
+                    "betrag": st.column_config.NumberColumn("Betrag (CHF)", format="%.2f"),
+                    "neuer_betrag": st.column_config.NumberColumn("Neuer Betrag (CHF)", min_value=0.0, format="%.2f")
+                }
+            )
+        
+        # Angepasste Löhne (leer = unverändert, 0 = entfällt)
+        loehne_edit = None
+        if aktuelle_loehne:
+            st.markdown("**Löhne anpassen** (leer = unverändert, 0 = entfällt)")
+            overrides = szenario.get("lohn_overrides", {})
+            loehne_vorlage = pd.DataFrame(aktuelle_loehne)[["Mitarbeiter", "Betrag"]]
+            loehne_vorlage["neuer_lohn"] = loehne_vorlage["Mitarbeiter"].map(overrides)
+            loehne_edit = st.data_editor(
+                loehne_vorlage,
+                use_container_width=True,
+                hide_index=True,
+                disabled=["Mitarbeiter", "Betrag"],
+                key=f"{key_prefix}_loehne",
+                column_config={
+                    "Betrag": st.column_config.NumberColumn("Lohn (CHF)", format="%.2f"),
+                    "neuer_lohn": st.column_config.NumberColumn("Neuer Lohn (CHF)", min_value=0.0, format="%.2f")
+                }
+            )
+        
+        if st.form_submit_button("💾 Szenario speichern"):
+            if not name.strip():
+                st.error("❌ Bitte gib einen Namen für das Szenario ein.")
+                return
+            
+            simulationen = sim_edit.dropna(subset=["date", "amount"]).to_dict(orient="records")
+            fixkosten_overrides = {}
+            if fixkosten_edit is not None:
+                geaendert = fixkosten_edit.dropna(subset=["neuer_betrag"])
+                fixkosten_overrides = dict(zip(geaendert["id"].astype(str), geaendert["neuer_betrag"]))
+            lohn_overrides = {}
+            if loehne_edit is not None:
+                geaendert = loehne_edit.dropna(subset=["neuer_lohn"])
+                lohn_overrides = dict(zip(geaendert["Mitarbeiter"], geaendert["neuer_lohn"]))
+            
+            szenario_id = save_szenario({
+                "id": szenario.get("id"),
+                "name": name.strip(),
+                "beschreibung": beschreibung.strip(),
+                "simulationen": simulationen,
+                "fixkosten_overrides": fixkosten_overrides,
+                "lohn_overrides": lohn_overrides
+            }, user_id=user_id)
+            
+            if szenario_id:
+                # Aktivität protokollieren
+                log_user_activity("Szenario gespeichert", {
+                    "id": szenario_id,
+                    "name": name.strip(),
+                    "simulationen": len(simulationen),
+                    "fixkosten_anpassungen": len(fixkosten_overrides),
+                    "lohn_anpassungen": len(lohn_overrides)
+                })
+                st.success("✅ Szenario gespeichert")
+                st.session_state.simulation_aktualisiert = True
+                st.rerun()
+            else:
+                st.error("❌ Fehler beim Speichern des Szenarios")
+
+
 def show():
     # Authentifizierungsprüfung
     if not prüfe_session_gültigkeit():
@@ -104,7 +224,7 @@ def show():
                     now = datetime.now().isoformat()
                     
                     # Neue Simulation hinzufügen mit Benutzer-ID
-                    if add_new_simulation(
+                    new_id = add_new_simulation(
                         date=sim_date,
                         details=sim_detail,
                         amount=sim_amount,
@@ -112,7 +232,15 @@ def show():
                         user_id=user_id,
                         created_at=now,
                         updated_at=now
-                    ):
+                    )
+                    if new_id:
+                        # Prognose punktuell aktualisieren
+                        patch_ledger(st.session_state.setdefault("ledger_cache", {}), "simulationen",
+                                     cube_cache=st.session_state.setdefault("cube_cache", {}), neu={
+                            "id": new_id, "date": sim_date, "details": sim_detail,
+                            "amount": sim_amount, "direction": sim_direction
+                        })
+                        
                         # Aktivität protokollieren
                         log_user_activity("Simulation hinzugefügt", {
                             "beschreibung": sim_detail,
@@ -218,6 +346,14 @@ def show():
                             
                             # Simulation aktualisieren über die Funktion
                             if update_simulation_by_id(sim_id, updated_sim):
+                                # Prognose punktuell aktualisieren
+                                patch_ledger(
+                                    st.session_state.setdefault("ledger_cache", {}), "simulationen",
+                                    alt={"id": sim_id},
+                                    neu={"id": sim_id, **updated_sim},
+                                    cube_cache=st.session_state.setdefault("cube_cache", {})
+                                )
+                                
                                 # Aktivität protokollieren
                                 log_user_activity("Simulation bearbeitet", {
                                     "id": sim_id,
@@ -263,6 +399,11 @@ def show():
                     with confirm_col1:
                         if st.button("❌ Ja, löschen", key=f"confirm_yes_{sim_id}"):
                             if delete_simulation_by_id(sim_id, user_id=user_id):
+                                # Prognose punktuell aktualisieren
+                                patch_ledger(st.session_state.setdefault("ledger_cache", {}), "simulationen",
+                                             alt={"id": sim_id},
+                                             cube_cache=st.session_state.setdefault("cube_cache", {}))
+                                
                                 # Aktivität protokollieren
                                 log_user_activity("Simulation gelöscht", {
                                     "id": sim_id,
@@ -316,4 +457,38 @@ def show():
                         })
             with col2:
                 if st.button("❌ Abbrechen", key="cancel_delete_all"):
-                    st.info("Löschvorgang abgebrochen")
\ No newline at end of file
+                    st.info("Löschvorgang abgebrochen")
+
+    # Benannte Szenarien für den Vergleich in der Analyse
+    st.markdown("---")
+    st.subheader("📚 Szenarien")
+    st.caption("Ein Szenario besteht aus eigenen Simulationen sowie optional angepassten Fixkosten und Löhnen. "
+               "In der Analyse können mehrere Szenarien gleichzeitig verglichen werden.")
+    
+    szenarien = load_szenarien()
+    fixkosten_df = load_fixkosten()
+    aktuelle_loehne = get_aktuelle_loehne()
+    
+    # Aktuelle Simulationen als Vorlage für neue Szenarien
+    aktuelle_simulationen = []
+    if sim_df is not None and not sim_df.empty:
+        aktuelle_simulationen = sim_df.rename(columns=str.lower).reindex(columns=["date", "details", "amount", "direction"]).to_dict(orient="records")
+    
+    with st.expander("➕ Neues Szenario anlegen", expanded=False):
+        _szenario_formular({}, "szenario_neu", aktuelle_simulationen, fixkosten_df, aktuelle_loehne, user_id)
+    
+    for szenario in szenarien:
+        anzahl = len(szenario["simulationen"])
+        anpassungen = len(szenario["fixkosten_overrides"]) + len(szenario["lohn_overrides"])
+        with st.expander(f"{szenario['name']} – {anzahl} Simulationen, {anpassungen} Anpassungen", expanded=False):
+            _szenario_formular(szenario, f"szenario_{szenario['id']}", szenario["simulationen"],
+                               fixkosten_df, aktuelle_loehne, user_id)
+            
+            if st.button("🗑️ Szenario löschen", key=f"szenario_delete_{szenario['id']}"):
+                if delete_szenario(szenario["id"], user_id=user_id):
+                    # Aktivität protokollieren
+                    log_user_activity("Szenario gelöscht", {"id": szenario["id"], "name": szenario["name"]})
+                    st.session_state.simulation_aktualisiert = True
+                    st.rerun()
+                else:
+                    st.error("❌ Löschen fehlgeschlagen")